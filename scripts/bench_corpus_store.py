@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark of corpus_store.py against the loose .txt files it is built from.
+
+  scan    every document's lines, normalized as parse_questionnaires.py does
+          (.txt: read + normalize_lines; store: Corpus.lines + clean_lines)
+  pages   random single-page reads (.txt: read the file and split it on page markers;
+          store: one slice of the mapping through the page index)
+  lines   random 20-line ranges
+
+The store is built in a temporary directory from --input first, unless --store is given.
+
+Usage:
+  python scripts/bench_corpus_store.py --input data/questionnaires/extracted
+  python scripts/bench_corpus_store.py --input data/questionnaires/extracted --store data/questionnaires/corpus --reads 5000
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from corpus_store import Corpus, build, document_name, split_pages
+from parse_questionnaires import clean_lines, normalize_lines
+
+
+def best_of(repeat: int, fn) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--input", default="data/questionnaires/extracted", help="Directory of extracted .txt files")
+    ap.add_argument("--store", help="Existing store built from --input (default: build one in a temp directory)")
+    ap.add_argument("--reads", type=int, default=2000, help="Random page and line-range reads")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    root = Path(args.input)
+    files = {document_name(p, root): p for p in sorted(root.rglob("*.txt"))}
+    if not files:
+        print(f"❌ No .txt file found in {root}", file=sys.stderr)
+        return 1
+    tmp = None
+    store = Path(args.store) if args.store else None
+    if store is None:
+        tmp = tempfile.TemporaryDirectory()
+        store = Path(tmp.name)
+        build([root], store)
+
+    with Corpus(store) as corpus:
+        names = [name for name in files if name in corpus]
+        rng = random.Random(0)
+        page_reads = [(name, rng.choice(corpus.page_numbers(name))) for name in rng.choices(names, k=args.reads)
+                      if corpus.page_numbers(name)]
+        line_reads = []
+        for name in rng.choices(names, k=args.reads):
+            start = rng.randrange(max(1, corpus.line_count(name)))
+            line_reads.append((name, start, start + 20))
+
+        def txt_page(name, number):
+            return dict(split_pages(files[name].read_text(encoding="utf-8", errors="ignore")))[number]
+
+        def txt_lines(name, start, stop):
+            text = files[name].read_text(encoding="utf-8", errors="ignore")
+            return [ln for _, lines in split_pages(text) for ln in lines][start:stop]
+
+        cases = [
+            ("scan", lambda: {n: normalize_lines(files[n].read_text(encoding="utf-8", errors="ignore")) for n in names},
+             lambda: {n: clean_lines(lines) for n, lines in corpus.iter_documents()}),
+            ("pages", lambda: [txt_page(n, p) for n, p in page_reads],
+             lambda: [corpus.page_lines(n, p) for n, p in page_reads]),
+            ("lines", lambda: [txt_lines(n, a, b) for n, a, b in line_reads],
+             lambda: [corpus.lines(n, a, b) for n, a, b in line_reads]),
+        ]
+        stats = corpus.stats()
+        print(f"{len(names)} document(s), {stats['pages']} pages, {stats['lines']} lines, {stats['live_bytes'] / 1e6:.2f} MB\n")
+        print(f"{'case':8} {'.txt ms':>10} {'store ms':>10} {'speedup':>8}")
+        for label, txt_fn, store_fn in cases:
+            if txt_fn() != store_fn():
+                print(f"❌ {label}: store and .txt results differ", file=sys.stderr)
+                return 1
+            txt_s = best_of(args.repeat, txt_fn)
+            store_s = best_of(args.repeat, store_fn)
+            print(f"{label:8} {txt_s * 1000:10.2f} {store_s * 1000:10.2f} {txt_s / store_s:7.1f}x")
+    if tmp is not None:
+        tmp.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the Tesseract backends in ocr_engines.py: pages/sec of the persistent engines
+(tesserocr, libtesseract C API) against one pytesseract process per page.
+
+Pages are rendered and preprocessed once, as ocr_pdf_pymupdf.py does, then every engine
+OCRs the same images with a pool of --workers threads. Engine start-up (model loading) is
+included in the timings, as it is in a real run. The text of each engine is compared
+with the pytesseract output: identical pages and mean similarity are reported.
+
+Usage:
+  python scripts/bench_ocr_engines.py --input "data/questionnaires/ocr" --pages 20
+  python scripts/bench_ocr_engines.py --input "data/questionnaires/raw/Mode de vie" --workers 4 --engines capi pytesseract
+"""
+import argparse
+import difflib
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ocr_engines import load_engine
+from ocr_pdf_pymupdf import preprocess, render_page
+
+
+def load_pages(inp: Path, max_pages: int, dpi: int) -> list:
+    """Render and preprocess up to max_pages pages from a PDF or a directory of PDFs."""
+    import fitz  # PyMuPDF
+    pdf_files = sorted(inp.rglob("*.pdf")) if inp.is_dir() else [inp]
+    images = []
+    for pdf_path in pdf_files:
+        with fitz.open(str(pdf_path)) as doc:
+            for page in doc:
+                if len(images) >= max_pages:
+                    return images
+                images.append(preprocess(render_page(page, dpi)))
+    return images
+
+
+def run_engine(name: str, images: list, lang: str, psm: int, oem: int, workers: int) -> tuple[float, list[str], str]:
+    """OCR all images with a fresh engine; returns (seconds, texts, engine description)."""
+    start = time.perf_counter()
+    engine = load_engine(name, lang, psm, oem, workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            texts = list(pool.map(engine.image_to_string, images))
+        description = f"{engine.name} {engine.version()}"
+    finally:
+        engine.close()
+    return time.perf_counter() - start, texts, description
+
+
+def similarity(a: str, b: str) -> float:
+    return difflib.SequenceMatcher(None, " ".join(a.split()), " ".join(b.split()), autojunk=False).ratio()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--input", default="data/questionnaires/ocr", help="PDF file or directory of PDFs")
+    ap.add_argument("--pages", type=int, default=20, help="Number of pages to OCR")
+    ap.add_argument("--dpi", type=int, default=400)
+    ap.add_argument("--lang", default="fra")
+    ap.add_argument("--psm", type=int, default=6)
+    ap.add_argument("--oem", type=int, default=1)
+    ap.add_argument("--workers", type=int, default=1, help="Concurrent OCR threads for every engine")
+    ap.add_argument("--engines", nargs="+", default=["tesserocr", "capi", "pytesseract"], help="Engines to compare")
+    args = ap.parse_args()
+
+    images = load_pages(Path(args.input), args.pages, args.dpi)
+    if not images:
+        print(f"❌ No PDF page found in {args.input}", file=sys.stderr)
+        return 1
+    print(f"{len(images)} page(s) at {args.dpi} DPI, {args.workers} worker(s), lang={args.lang}\n")
+
+    results = {}
+    for name in args.engines:
+        try:
+            results[name] = run_engine(name, images, args.lang, args.psm, args.oem, args.workers)
+        except Exception as e:
+            print(f"⏭️  {name}: unavailable ({type(e).__name__}: {e})")
+
+    reference = results.get("pytesseract")
+    print(f"\n{'engine':28} {'seconds':>8} {'pages/s':>8} {'speedup':>8} {'identical':>10} {'similarity':>10}")
+    for name, (seconds, texts, description) in results.items():
+        speedup = f"{reference[0] / seconds:7.1f}x" if reference else ""
+        identical = similar = ""
+        if reference and name != "pytesseract":
+            same = sum(1 for a, b in zip(texts, reference[1]) if a.strip() == b.strip())
+            identical = f"{same}/{len(texts)}"
+            similar = f"{sum(map(similarity, texts, reference[1])) / len(texts):.4f}"
+        print(f"{description:28} {seconds:8.2f} {len(images) / seconds:8.2f} {speedup:>8} {identical:>10} {similar:>10}")
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
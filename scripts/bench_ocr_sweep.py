@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+OCR parameter sweep: speed and quality of a grid of ocr_pdf_pymupdf.py configurations.
+
+Every (configuration, PDF) pair runs in its own worker process, across --jobs processes,
+so the wall time, CPU time (including tesseract child processes) and peak memory can be
+measured for each one. The OCR text is scored against a reference text with the same
+path relative to --input-root under --reference (by default the native-text extraction in
+data/questionnaires/extracted, or hand-corrected ground truth), or else the only reference
+with the same file stem. Scores are the character
+and word error rates (CER/WER): edit distance divided by the reference length, after
+page markers are removed and whitespace is collapsed.
+
+The summary table has one row per configuration. Rows marked * are on the Pareto front of
+time per page vs CER: no other configuration is both faster and more accurate. With
+--max-cer, the fastest configuration meeting that accuracy bar is reported.
+
+Usage:
+  python scripts/bench_ocr_sweep.py --input data/questionnaires/ocr/Cancerologie --dpi 200 300 400 --psm 4 6
+  python scripts/bench_ocr_sweep.py --input data/questionnaires/ocr --limit 5 --modes fixed adaptive --max-cer 0.05 --output sweep.json
+"""
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+PAGE_MARKER_RE = re.compile(r"^=====\s*PAGE\s+\d+\s*=====\s*$", re.MULTILINE)
+
+
+def normalize_text(text: str, ignore_case: bool = False) -> str:
+    text = unicodedata.normalize("NFC", PAGE_MARKER_RE.sub(" ", text))
+    text = " ".join(text.split())
+    return text.lower() if ignore_case else text
+
+
+def levenshtein(a, b) -> int:
+    """Edit distance between two sequences (strings or word lists).
+
+    Bit-parallel algorithm (Myers 1999, Hyyrö 2001) on Python integers: one pass over a, with
+    each column of the DP matrix held as bits, so whole-document CER stays fast without numpy.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    m = len(b)
+    if m == 0:
+        return len(a)
+    peq: dict = {}
+    for i, symbol in enumerate(b):
+        peq[symbol] = peq.get(symbol, 0) | (1 << i)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for symbol in a:
+        eq = peq.get(symbol, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+
+def peak_rss_mb() -> tuple[float | None, float | None]:
+    """(this process, largest child process) peak resident memory in MB."""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / (1024 * 1024), None
+        except (ImportError, AttributeError):
+            return None, None
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit)
+
+
+def config_label(config: dict) -> str:
+    return f"dpi={config['dpi']} psm={config['psm']} oem={config['oem']} {config['mode']}"
+
+
+def run_job(config: dict, pdf_path: str, reference: str | None, lang: str, engine_name: str, ignore_case: bool) -> dict:
+    """OCR one PDF with one configuration (in a fresh worker process) and score it."""
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    import fitz  # PyMuPDF
+    from ocr_engines import load_engine
+    from ocr_pdf_pymupdf import preprocess, render_regions
+
+    start_wall = time.perf_counter()
+    start_cpu = os.times()
+    engine = load_engine(engine_name, lang, config["psm"], config["oem"])
+    texts = []
+    pixels = 0
+    try:
+        with fitz.open(pdf_path) as doc:
+            for page in doc:
+                images, info = render_regions(page, config["dpi"], adaptive=config["mode"] == "adaptive")
+                pixels += info["pixels"]
+                texts.append("\n".join(engine.image_to_string(preprocess(img)) for img in images))
+    finally:
+        engine.close()
+    wall = time.perf_counter() - start_wall
+    end_cpu = os.times()
+    cpu = sum(end - start for end, start in zip(end_cpu[:4], start_cpu[:4]))
+    own_mb, child_mb = peak_rss_mb()
+
+    result = {"config": config, "file": pdf_path, "pages": len(texts), "wall": wall, "cpu": cpu, "pixels": pixels,
+              "peak_mb": max(filter(None, (own_mb, child_mb)), default=None),
+              "ref_chars": None, "char_edits": None, "ref_words": None, "word_edits": None}
+    if reference is not None:
+        hyp = normalize_text("\n".join(texts), ignore_case)
+        ref = normalize_text(reference, ignore_case)
+        result.update(ref_chars=len(ref), char_edits=levenshtein(hyp, ref),
+                      ref_words=len(ref.split()), word_edits=levenshtein(hyp.split(), ref.split()))
+    return result
+
+
+def summarize(results: list[dict]) -> list[dict]:
+    """Aggregate job results per configuration (error rates are micro-averaged over documents)."""
+    rows = {}
+    for r in results:
+        row = rows.setdefault(config_label(r["config"]), {
+            "config": config_label(r["config"]), "pages": 0, "wall": 0.0, "cpu": 0.0, "pixels": 0, "peak_mb": None,
+            "ref_chars": 0, "char_edits": 0, "ref_words": 0, "word_edits": 0, "scored": 0})
+        row["pages"] += r["pages"]
+        row["wall"] += r["wall"]
+        row["cpu"] += r["cpu"]
+        row["pixels"] += r["pixels"]
+        if r["peak_mb"] is not None:
+            row["peak_mb"] = max(row["peak_mb"] or 0.0, r["peak_mb"])
+        if r["ref_chars"]:
+            row["scored"] += 1
+            for key in ("ref_chars", "char_edits", "ref_words", "word_edits"):
+                row[key] += r[key]
+    for row in rows.values():
+        pages = row["pages"] or 1
+        row["wall_per_page"] = row["wall"] / pages
+        row["cpu_per_page"] = row["cpu"] / pages
+        row["mp_per_page"] = row["pixels"] / pages / 1e6
+        row["cer"] = row["char_edits"] / row["ref_chars"] if row["ref_chars"] else None
+        row["wer"] = row["word_edits"] / row["ref_words"] if row["ref_words"] else None
+    table = sorted(rows.values(), key=lambda row: row["wall_per_page"])
+    # Sorted by time: a row is on the Pareto front if it beats the CER of every faster row
+    best_cer = float("inf")
+    for row in table:
+        row["pareto"] = row["cer"] is not None and row["cer"] < best_cer
+        if row["pareto"]:
+            best_cer = row["cer"]
+    return table
+
+
+def print_table(table: list[dict], max_cer: float | None):
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else "n/a"
+
+    print(f"\n  {'configuration':32} {'pages':>5} {'s/page':>7} {'cpu/page':>8} {'MP/page':>7} {'peak MB':>8} {'CER':>7} {'WER':>7}")
+    for row in table:
+        mark = "*" if row["pareto"] else " "
+        print(f"{mark} {row['config']:32} {row['pages']:5d} {row['wall_per_page']:7.2f} {row['cpu_per_page']:8.2f} "
+              f"{row['mp_per_page']:7.1f} {fmt(row['peak_mb'], '8.0f'):>8} {fmt(row['cer'], '7.2%'):>7} {fmt(row['wer'], '7.2%'):>7}")
+    print("\n* Pareto front (time per page vs CER)")
+    if max_cer is not None:
+        ok = [row for row in table if row["cer"] is not None and row["cer"] <= max_cer]
+        if ok:
+            print(f"✅ Fastest configuration with CER <= {max_cer:.2%}: {ok[0]['config']} ({ok[0]['wall_per_page']:.2f} s/page)")
+        else:
+            print(f"❌ No configuration reaches CER <= {max_cer:.2%}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--input", nargs="+", default=["data/questionnaires/ocr"], help="PDF files or directories (searched recursively)")
+    ap.add_argument("--reference", default="data/questionnaires/extracted",
+                    help="Directory of reference .txt files mirroring the input tree")
+    ap.add_argument("--input-root", default="data/questionnaires/ocr",
+                    help="Root of the PDF tree that --reference mirrors (inputs outside it use their own directory)")
+    ap.add_argument("--limit", type=int, default=None, help="Only use the first N PDFs (sorted by path)")
+    ap.add_argument("--dpi", type=int, nargs="+", default=[300, 400])
+    ap.add_argument("--psm", type=int, nargs="+", default=[6])
+    ap.add_argument("--oem", type=int, nargs="+", default=[1])
+    ap.add_argument("--modes", nargs="+", choices=("fixed", "adaptive"), default=["fixed"],
+                    help="Whole pages at --dpi, and/or adaptive DPI text regions (--dpi as maximum)")
+    ap.add_argument("--lang", default="fra")
+    ap.add_argument("--engine", default="auto", help="Tesseract backend (see ocr_engines.py)")
+    ap.add_argument("--ignore-case", action="store_true", help="Case-insensitive CER/WER")
+    ap.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    ap.add_argument("--max-cer", type=float, default=None, help="Accuracy bar, e.g. 0.05 for 5%% CER")
+    ap.add_argument("--output", help="Write per-document results and the summary table to this JSON file")
+    args = ap.parse_args()
+
+    input_root = Path(args.input_root).resolve()
+    pdfs: list[tuple[Path, Path]] = []
+    for spec in map(Path, args.input):
+        base = spec if spec.is_dir() else spec.parent
+        if input_root == base.resolve() or input_root in base.resolve().parents:
+            base = input_root
+        files = sorted(spec.rglob("*.pdf")) if spec.is_dir() else [spec]
+        pdfs.extend((p, p.resolve().relative_to(base.resolve())) for p in files)
+    pdfs = pdfs[:args.limit] if args.limit else pdfs
+    if not pdfs:
+        print("❌ No PDF found", file=sys.stderr)
+        return 1
+
+    reference_dir = Path(args.reference)
+    by_stem: dict[str, list[Path]] = {}
+    references = {}
+    for pdf, rel in pdfs:
+        ref_path = reference_dir / rel.with_suffix(".txt")
+        if not ref_path.is_file():
+            if not by_stem and reference_dir.is_dir():
+                for txt in reference_dir.rglob("*.txt"):
+                    by_stem.setdefault(txt.stem, []).append(txt)
+            candidates = by_stem.get(pdf.stem, [])
+            if len(candidates) == 1:
+                ref_path = candidates[0]
+        references[pdf] = ref_path.read_text(encoding="utf-8", errors="ignore") if ref_path.is_file() else None
+    missing = sum(1 for ref in references.values() if ref is None)
+    if missing:
+        print(f"⚠️  {missing}/{len(pdfs)} PDF(s) have no reference text under {reference_dir}: timed but not scored")
+
+    configs = [{"dpi": dpi, "psm": psm, "oem": oem, "mode": mode}
+               for mode, dpi, psm, oem in itertools.product(args.modes, args.dpi, args.psm, args.oem)]
+    jobs = args.jobs or os.cpu_count() or 1
+    print(f"🔬 {len(configs)} configuration(s) x {len(pdfs)} PDF(s), {jobs} worker process(es)")
+
+    results = []
+    start = time.perf_counter()
+    # One process per job: peak memory and CPU time are then those of a single run
+    with ProcessPoolExecutor(max_workers=jobs, max_tasks_per_child=1) as pool:
+        futures = [pool.submit(run_job, config, str(pdf), references[pdf], args.lang, args.engine, args.ignore_case)
+                   for config in configs for pdf, _ in pdfs]
+        for future in as_completed(futures):
+            try:
+                r = future.result()
+            except Exception as e:
+                print(f"❌ {type(e).__name__}: {e}", file=sys.stderr)
+                continue
+            results.append(r)
+            cer = f", CER {r['char_edits'] / r['ref_chars']:.2%}" if r["ref_chars"] else ""
+            print(f"   {config_label(r['config'])}  {Path(r['file']).name}: {r['pages']} page(s) in {r['wall']:.1f}s{cer}")
+    print(f"⏱️  Sweep done in {time.perf_counter() - start:.1f}s")
+
+    table = summarize(results)
+    print_table(table, args.max_cer)
+    if args.output:
+        Path(args.output).write_text(json.dumps({"results": results, "summary": table}, ensure_ascii=False, indent=2),
+                                     encoding="utf-8")
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Benchmark of parse_questionnaires.parse_text (option splitting and Likert normalization).
+
+Compares the previous implementation (nested closures re-created per call, regexes compiled
+on the fly, chained substring tests per option; kept below verbatim as the reference) with
+the module-level functions and the compiled LikertNormalizer, on the extracted text corpus.
+Both must produce identical JSON.
+
+Usage:
+  python scripts/bench_option_parsing.py
+  python scripts/bench_option_parsing.py --corpus data/questionnaires/extracted --repeat 20
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+from parse_questionnaires import (
+    BULLET_RE,
+    QUESTION_MARK_RE,
+    QUESTION_NUM_RE,
+    QUESTION_START_RE,
+    SCORE_BREAKERS,
+    SECTION_RE,
+    normalize_lines,
+    parse_text,
+    slugify,
+)
+
+DEFAULT_CORPUS = [Path("data/questionnaires/extracted"), Path("data/questionnaires/ocr_txt")]
+
+
+def legacy_parse_text(lines: list[str]) -> dict:
+    data = {
+        "title": None,
+        "sections": []
+    }
+    current_section = None
+    current_question = None
+    pending_option_lines: list[str] = []
+
+    def start_section(title: str):
+        nonlocal current_section, current_question, pending_option_lines
+        if current_section:
+            # finalize any open question
+            if current_question:
+                current_section["questions"].append(current_question)
+                current_question = None
+            data["sections"].append(current_section)
+        current_section = {"title": title, "questions": []}
+        pending_option_lines = []
+
+    def start_question(q_label: str):
+        nonlocal current_question, pending_option_lines
+        # close previous
+        if current_question:
+            current_section["questions"].append(current_question)
+        current_question = {
+            "id": slugify(q_label)[:64],
+            "label": q_label,
+            "type": "select",  # default guess; manual fix later if needed
+            "options": [],
+            "rawOptions": []
+        }
+        # If we buffered option header lines before the question (common OCR artifact), attach them now
+        for ol in pending_option_lines:
+            for opt in split_options(ol):
+                current_question["rawOptions"].append(opt)
+                current_question["options"].append(opt)
+        pending_option_lines = []
+
+    def is_breaker(ln: str) -> bool:
+        low = ln.lower()
+        if not ln:
+            return False
+        return any(b.lower() in low for b in SCORE_BREAKERS)
+
+    def is_numeric_row(ln: str) -> bool:
+        # Matches rows with only digits separated by spaces/pipes (e.g., "0  1  2  3  4")
+        return bool(re.match(r"^\s*(?:[0-9]+[\s|]+){2,}[0-9]+\s*$", ln))
+
+    def is_option_header_like(ln: str) -> bool:
+        if not ln or '?' in ln:
+            return False
+        if is_breaker(ln) or SECTION_RE.match(ln):
+            return False
+        if is_numeric_row(ln):
+            return False
+        # OCR often produces rows with many spaces between tokens or pipes (Jamais | Rarement | ...)
+        if '|' in ln:
+            return True
+        # Count sequences of 2+ spaces (column gaps)
+        return len(re.findall(r"\s{2,}", ln)) >= 2
+
+    def split_options(ln: str) -> list[str]:
+        # First split by pipe if present, else by 2+ spaces
+        if '|' in ln:
+            parts = [p.strip() for p in ln.split('|')]
+        else:
+            parts = [p.strip() for p in re.split(r"\s{2,}", ln) if p.strip()]
+        cleaned = []
+        for p in parts:
+            # Strip leading bullets/dashes
+            p = re.sub(r"^[\-•–*o]\s*", "", p)
+            # Strip trailing isolated digits (score columns)
+            p = re.sub(r"\s+[0-9]+\s*$", "", p).strip()
+            # Strip leading/trailing punctuation noise
+            p = p.strip("- •–*:;.,")
+            if not p or len(p) <= 1:
+                continue
+            # remove trailing "Votre score" token often glued at end
+            if p.lower().startswith("votre score") or p.lower() == "votre score":
+                continue
+            # Skip very short fragments that are likely OCR noise
+            if len(p) <= 2 and not p.isalpha():
+                continue
+            # Normalize common French Likert options to standard forms
+            p_low = p.lower()
+            if "jamais" in p_low and len(p) < 10:
+                p = "Jamais"
+            elif "rarement" in p_low and len(p) < 12:
+                p = "Rarement"
+            elif "occasionnelle" in p_low and len(p) < 20:
+                p = "Occasionnellement"
+            elif "fréquemment" in p_low or "fréquemment" in p_low and len(p) < 18:
+                p = "Fréquemment"
+            elif "toujours" in p_low and len(p) < 12:
+                p = "Toujours"
+            elif "pas du tout" in p_low and len(p) < 15:
+                p = "Pas du tout"
+            elif "plutôt" in p_low and "satisfaisant" in p_low:
+                p = "Plutôt satisfaisant"
+            elif "tout à fait" in p_low and "satisfaisant" in p_low:
+                p = "Tout à fait satisfaisant"
+            elif "excellent" in p_low and len(p) < 12:
+                p = "Excellent"
+            cleaned.append(p)
+        # Dedup while preserving order
+        seen = set()
+        result = []
+        for c in cleaned:
+            if c.lower() not in seen:
+                seen.add(c.lower())
+                result.append(c)
+        return result
+
+    for ln in lines:
+        # Title: pick explicit questionnaire title if present
+        if data["title"] is None and "Questionnaire contextuel de mode de vie" in ln:
+            data["title"] = "Questionnaire contextuel de mode de vie"
+            continue
+        if data["title"] is None and ln.strip():
+            # fallback to first non-empty line
+            data["title"] = ln.strip()
+            continue
+        if not ln:
+            continue
+        # Section (e.g., "Votre sommeil")
+        if SECTION_RE.match(ln) and len(ln) > 3:
+            start_section(re.sub(r"\s+", " ", ln).strip())
+            continue
+        # Option header that may precede a question line (due to OCR reordering)
+        if is_option_header_like(ln) and current_question is None:
+            pending_option_lines.append(ln)
+            continue
+        # Start of question: line ending with a question mark or typical French question lead-in
+        if QUESTION_MARK_RE.search(ln) or QUESTION_START_RE.match(ln):
+            start_question(re.sub(r"\s+", " ", ln).strip())
+            continue
+        # Question with leading number (fallback)
+        m_q = QUESTION_NUM_RE.match(ln)
+        if m_q:
+            start_question(m_q.group(2))
+            continue
+        # Bullet option
+        m_b = BULLET_RE.match(ln)
+        if m_b and current_question is not None:
+            opt = m_b.group(2).strip()
+            # strip trailing isolated digits commonly mis-OCR'd as inline scores
+            opt = re.sub(r"\s+[0-9]+\s*$", "", opt).strip()
+            if opt and len(opt) > 2:
+                current_question["rawOptions"].append(opt)
+                current_question["options"].append(opt)
+            continue
+        # If we are within a question, collect option lines until a breaker
+        if current_question is not None:
+            if is_breaker(ln):
+                # End of options block
+                continue
+            # Option-like lines within a question: split into tokens
+            if is_option_header_like(ln):
+                for opt in split_options(ln):
+                    current_question["rawOptions"].append(opt)
+                    current_question["options"].append(opt)
+                continue
+            # Heuristic: treat short non-empty lines (that don't look like sections) as options, but avoid numeric-only rows
+            if not SECTION_RE.match(ln) and not is_numeric_row(ln):
+                txt = re.sub(r"\s+[0-9]+\s*$", "", ln).strip("- •–*").strip()
+                if txt and len(txt) > 2 and txt != current_question["label"] and not txt.lower().startswith("votre score"):
+                    current_question["options"].append(txt)
+                continue
+        else:
+            # If not inside a question and see a likely options header, buffer it
+            if is_option_header_like(ln):
+                pending_option_lines.append(ln)
+                continue
+        # Otherwise ignore line
+
+    # finalize
+    if current_question and current_section:
+        current_section["questions"].append(current_question)
+    if current_section:
+        data["sections"].append(current_section)
+    return data
+
+
+def load_corpus(roots: list[Path]) -> list[list[str]]:
+    documents = []
+    for root in roots:
+        paths = [root] if root.is_file() else sorted(root.rglob("*.txt")) if root.is_dir() else []
+        documents.extend(normalize_lines(p.read_text(encoding="utf-8", errors="ignore")) for p in paths)
+    return documents
+
+
+def fuzz_split_options(rounds: int = 2000, seed: int = 0):
+    """Random option rows built from Likert words, checked against the legacy normalization."""
+    words = ["Jamais", "jamais vu", "Rarement", "très rarement", "occasionnellement", "Fréquemment", "assez fréquemment",
+             "Toujours", "presque toujours", "Pas du tout", "pas du tout d'accord", "Plutôt satisfaisant",
+             "tout à fait satisfaisant", "Excellent", "excellente forme", "Votre score", "3", "-", "o Moyen"]
+    rng = random.Random(seed)
+    for _ in range(rounds):
+        sep = rng.choice(["  ", " | ", "   "])
+        row = sep.join(rng.choice(words) for _ in range(rng.randint(1, 6)))
+        doc = ["Titre", "Votre sommeil", "Comment dormez-vous ?", row]
+        assert parse_text(doc) == legacy_parse_text(doc), f"mismatch on option row {row!r}"
+
+
+def bench(fn, documents: list[list[str]], repeat: int) -> float:
+    """Best wall time of `repeat` passes of fn over the corpus."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for lines in documents:
+            fn(lines)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--corpus", nargs="*", type=Path, default=DEFAULT_CORPUS, help="Text files or directories of .txt files")
+    ap.add_argument("--repeat", type=int, default=10, help="Passes per measurement (best is reported)")
+    args = ap.parse_args()
+
+    documents = load_corpus(args.corpus)
+    if not documents:
+        print("❌ No .txt file found in corpus", file=sys.stderr)
+        return 1
+    for lines in documents:
+        assert parse_text(lines) == legacy_parse_text(lines), "parse_text mismatch"
+    fuzz_split_options()
+
+    n_lines = sum(len(lines) for lines in documents)
+    before = bench(legacy_parse_text, documents, args.repeat)
+    after = bench(parse_text, documents, args.repeat)
+    print(f"Corpus: {len(documents)} files, {n_lines} lines, best of {args.repeat}\n")
+    print(f"{'':8} {'µs/line':>10} {'lines/s':>12}")
+    print(f"{'before':8} {before / n_lines * 1e6:10.2f} {n_lines / before:12,.0f}")
+    print(f"{'after':8} {after / n_lines * 1e6:10.2f} {n_lines / after:12,.0f}")
+    print(f"speedup: {before / after:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
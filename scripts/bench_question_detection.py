@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of question/option detection in extract_questionnaires.py.
+
+Compares the previous implementation (uncompiled patterns re-run per line, kept below
+verbatim as the reference) with the precompiled single-pass line classifier, on the
+extracted text corpus. Also checks that both produce identical results.
+
+It first parses a generated --synthetic-lines document (100000 lines by default: long
+option blocks, free text, numbered rows) and fails if that takes longer than --max-seconds:
+a regression guard for the linear question/option sweep, run on every invocation
+(--synthetic-lines 0 skips it).
+
+Usage:
+  python scripts/bench_question_detection.py
+  python scripts/bench_question_detection.py --corpus data/questionnaires/extracted --repeat 20
+  python scripts/bench_question_detection.py --synthetic-lines 200000 --max-seconds 4
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from extract_questionnaires import detect_questions_french, parse_questions
+
+DEFAULT_CORPUS = [Path("data/questionnaires/extracted"), Path("data/questionnaires/ocr_txt")]
+
+
+def legacy_detect_questions_french(text: str) -> List[str]:
+    patterns = [
+        r'^\d+[\.\)]\s*([^\n]+\?)',
+        r'^\d+[\.\)]\s*\*\*([^\n]+)\*\*',
+        r'^[A-ZÀÉÈÊË][^\.!?\n]{10,100}\?',
+        r'(?:Comment|Combien|Pourquoi|Quand|Où|Quel|Quelle|Quels|Quelles|Est-ce que|Avez-vous|Êtes-vous)[^\.!?\n]+\?',
+    ]
+    questions = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        for pattern in patterns:
+            if re.findall(pattern, line, re.MULTILINE | re.IGNORECASE):
+                questions.append(line)
+                break
+    return questions
+
+
+def legacy_extract_options(text: str, question_line_index: int, lines: List[str]) -> List[Dict]:
+    options = []
+    i = question_line_index + 1
+    while i < len(lines):
+        line = lines[i].strip()
+        if re.match(r'^\d+[\.\)]', line) or line.endswith('?'):
+            break
+        match = re.match(r'^[-•]\s*(.+?)\s*\((\d+)\s*pts?\)', line, re.IGNORECASE)
+        if match:
+            options.append({'label': match.group(1).strip(), 'points': int(match.group(2))})
+            i += 1
+            continue
+        match = re.match(r'^[□○☐]\s*(.+)', line)
+        if match:
+            options.append({'label': match.group(1).strip()})
+            i += 1
+            continue
+        if line.startswith('-') or line.startswith('•'):
+            options.append({'label': line[1:].strip()})
+            i += 1
+            continue
+        if line and not line[0].isdigit():
+            i += 1
+        else:
+            break
+    return options
+
+
+def legacy_parse_questions(text: str, lines: List[str]) -> List[Dict]:
+    questions = []
+    for i, line in enumerate(lines):
+        line = line.strip()
+        match = re.match(r'^(\d+)[\.\)]\s*(.+)', line)
+        if match:
+            options = legacy_extract_options(text, i, lines)
+            questions.append({
+                'id': f'q{match.group(1)}',
+                'label': match.group(2).strip(),
+                'type': 'select' if options else 'textarea',
+                'options': [opt['label'] for opt in options] if options else None,
+                'points': [opt.get('points') for opt in options] if options and any('points' in opt for opt in options) else None
+            })
+    return questions
+
+
+def load_corpus(roots: List[Path]) -> List[str]:
+    texts = []
+    for root in roots:
+        if root.is_file():
+            texts.append(root.read_text(encoding="utf-8", errors="ignore"))
+        elif root.is_dir():
+            texts.extend(p.read_text(encoding="utf-8", errors="ignore") for p in sorted(root.rglob("*.txt")))
+    return texts
+
+
+def synthetic_document(n_lines: int) -> str:
+    """Questionnaire-like text of n_lines lines mixing every kind of line the parser handles."""
+    block = [
+        "{n}. Avez-vous des troubles du sommeil ?",
+        "- Jamais (0 pts)",
+        "- Parfois (1 pt)",
+        "□ Souvent",
+        "• Toujours",
+        "Cochez la case qui convient",
+        "Commentaire libre sur la question précédente",
+        "",
+        "{n}) Je me sens fatigué(e) le matin",
+    ] + ["Texte explicatif sans numéro ni puce"] * 20 + ["- Option {k}".format(k=k) for k in range(20)]
+    lines = []
+    n = 1
+    while len(lines) < n_lines:
+        for template in block:
+            lines.append(template.format(n=n))
+            if "{n}" in template:
+                n += 1
+    return "\n".join(lines[:n_lines])
+
+
+def check_synthetic(n_lines: int, max_seconds: float) -> bool:
+    text = synthetic_document(n_lines)
+    lines = text.split('\n')
+    start = time.perf_counter()
+    questions = parse_questions(text, lines)
+    elapsed = time.perf_counter() - start
+    assert questions == legacy_parse_questions(text, lines), "parse_questions mismatch on synthetic document"
+    ok = elapsed <= max_seconds
+    status = "✅" if ok else "❌"
+    print(f"{status} Synthetic document: {n_lines} lines, {len(questions)} questions parsed in {elapsed:.3f}s (limit {max_seconds}s)")
+    return ok
+
+
+def bench(fn, texts: List[str], repeat: int) -> float:
+    """Best wall time of `repeat` passes of fn over the corpus."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--corpus", nargs="*", type=Path, default=DEFAULT_CORPUS, help="Text files or directories of .txt files")
+    ap.add_argument("--repeat", type=int, default=10, help="Passes per measurement (best is reported)")
+    ap.add_argument("--synthetic-lines", type=int, default=100_000,
+                    help="Time parse_questions on a generated document of this many lines first (0: skip)")
+    ap.add_argument("--max-seconds", type=float, default=2.0, help="Time limit for the synthetic document")
+    args = ap.parse_args()
+
+    if args.synthetic_lines and not check_synthetic(args.synthetic_lines, args.max_seconds):
+        return 1
+
+    texts = load_corpus(args.corpus)
+    if not texts:
+        print("❌ No .txt file found in corpus", file=sys.stderr)
+        return 1
+    n_lines = sum(text.count("\n") + 1 for text in texts)
+
+    for text in texts:
+        lines = text.split('\n')
+        assert detect_questions_french(text) == legacy_detect_questions_french(text), "detect_questions_french mismatch"
+        assert parse_questions(text, lines) == legacy_parse_questions(text, lines), "parse_questions mismatch"
+
+    cases = [
+        ("detect_questions_french", legacy_detect_questions_french, detect_questions_french),
+        ("questions + options", lambda t: legacy_parse_questions(t, t.split('\n')), lambda t: parse_questions(t, t.split('\n'))),
+    ]
+    print(f"Corpus: {len(texts)} files, {n_lines} lines, best of {args.repeat}\n")
+    print(f"{'stage':28} {'before (lines/s)':>18} {'after (lines/s)':>18} {'speedup':>8}")
+    for name, before_fn, after_fn in cases:
+        before = bench(before_fn, texts, args.repeat)
+        after = bench(after_fn, texts, args.repeat)
+        print(f"{name:28} {n_lines / before:18,.0f} {n_lines / after:18,.0f} {before / after:7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark of score_questionnaires.py against scoring one respondent at a time in Python.
+
+Random responses (about 5% unanswered) are generated for the scored questions of the
+questionnaire. The per-respondent loop is the plain dict walk (sum the points of each
+chosen option, per section); it runs on --loop-rows rows only and is extrapolated.
+Both give the same scores on those rows, or the benchmark fails.
+
+Usage:
+  python scripts/bench_scoring.py
+  python scripts/bench_scoring.py --questionnaire data/questionnaires/generated/mode-de-vie-clean.json --rows 5000000
+"""
+import argparse
+import sys
+import time
+
+from score_questionnaires import compile_questionnaire, get_numpy, load_questionnaire, scored_sections
+
+
+def score_loop(groups, rows) -> list[tuple[float, list[float]]]:
+    results = []
+    for row in rows:
+        sections, q = [], 0
+        for _, questions in groups:
+            subtotal = 0.0
+            for question in questions:
+                choice = row[q]
+                if choice >= 0:
+                    subtotal += question["points"][choice] or 0
+                q += 1
+            sections.append(subtotal)
+        results.append((sum(sections), sections))
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--questionnaire", default="data/questionnaires/generated/mode-de-vie-clean.json")
+    ap.add_argument("--rows", type=int, default=1_000_000, help="Respondents scored by the vectorized engine")
+    ap.add_argument("--loop-rows", type=int, default=20_000, help="Respondents scored by the Python loop")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    np = get_numpy()
+    questionnaire = load_questionnaire(args.questionnaire)
+    start = time.perf_counter()
+    scorer = compile_questionnaire(questionnaire)
+    compile_s = time.perf_counter() - start
+    print(scorer.describe())
+    print(f"compiled in {compile_s * 1000:.2f} ms\n")
+
+    rng = np.random.default_rng(0)
+    responses = (rng.random((args.rows, len(scorer))) * scorer.counts).astype(np.int8)
+    responses[rng.random(responses.shape) < 0.05] = -1
+
+    groups = scored_sections(questionnaire)
+    loop_rows = responses[:args.loop_rows].tolist()
+    expected = score_loop(groups, loop_rows)
+    got = scorer.score(responses[:args.loop_rows])
+    if not (np.allclose(got["total"], [t for t, _ in expected])
+            and np.allclose(got["sections"], [s for _, s in expected])):
+        print("❌ vectorized and per-respondent scores differ", file=sys.stderr)
+        return 1
+
+    loop_s = min(_timed(lambda: score_loop(groups, loop_rows)) for _ in range(args.repeat))
+    engine_s = min(_timed(lambda: scorer.score(responses)) for _ in range(args.repeat))
+    loop_rate = len(loop_rows) / loop_s
+    engine_rate = args.rows / engine_s
+    print(f"{'method':12} {'rows':>10} {'seconds':>9} {'rows/s':>12}")
+    print(f"{'python loop':12} {len(loop_rows):10} {loop_s:9.3f} {loop_rate:12,.0f}")
+    print(f"{'vectorized':12} {args.rows:10} {engine_s:9.3f} {engine_rate:12,.0f}")
+    print(f"\nspeedup {engine_rate / loop_rate:.0f}x")
+    return 0
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark of the questionnaire CLI scripts, based on `python -X importtime`.
+
+Each target is imported in a fresh interpreter (so the cost measured is what a shell loop
+or pre-commit hook pays per call), best of --repeat runs. For every target it reports the
+wall time of the process, the cumulative import time of the module, and the heaviest
+imports pulled in. Targets marked as text workflows (.txt/.md/.json input, no PDF) fail
+the run when their wall time exceeds --target-ms.
+
+Usage:
+  python scripts/bench_startup.py
+  python scripts/bench_startup.py --repeat 10 --top 8 --target-ms 100
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# (module, text workflow?) -- text workflows must start without any PDF/OCR backend
+TARGETS = [
+    ("generate_review_markdown", True),
+    ("convert_mode_de_vie_to_json", True),
+    ("parse_questionnaires", True),
+    ("extract_questionnaires", True),
+    ("ocr_pdf_pymupdf", False),
+    ("watch_questionnaires", True),
+    ("corpus_store", True),
+    ("score_questionnaires", True),
+    ("export_catalog", True),
+    ("dedupe_questions", True),
+]
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_importtime(module: str) -> tuple[float, dict[str, tuple[int, int, int]]]:
+    """Import module in a fresh interpreter; returns (wall seconds, {name: (self_us, cumulative_us, depth)})."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(SCRIPTS_DIR), os.environ.get("PYTHONPATH")])))
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, env=env)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}")
+    imports = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            depth = (len(match.group(3)) - 1) // 2
+            imports[match.group(4)] = (int(match.group(1)), int(match.group(2)), depth)
+    return wall, imports
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("modules", nargs="*", help="Modules to measure (default: the questionnaire scripts)")
+    ap.add_argument("--repeat", type=int, default=5, help="Runs per module (best is reported)")
+    ap.add_argument("--top", type=int, default=5, help="Heaviest imports listed per module")
+    ap.add_argument("--target-ms", type=float, default=100.0, help="Startup budget for text workflows")
+    args = ap.parse_args()
+
+    targets = [(m, True) for m in args.modules] if args.modules else TARGETS
+    baseline, _ = min((run_importtime("sys") for _ in range(args.repeat)), key=lambda r: r[0])
+    print(f"Interpreter baseline: {baseline * 1000:.1f} ms (python -c 'import sys'), best of {args.repeat}\n")
+
+    failed = False
+    for module, text_workflow in targets:
+        try:
+            wall, imports = min((run_importtime(module) for _ in range(args.repeat)), key=lambda r: r[0])
+        except RuntimeError as e:
+            print(f"❌ {module}: {e}\n")
+            failed = True
+            continue
+        total_ms = imports.get(module, (0, 0, 0))[1] / 1000
+        over = text_workflow and wall * 1000 > args.target_ms
+        failed |= over
+        status = "❌" if over else "✅" if text_workflow else "  "
+        print(f"{status} {module}: {wall * 1000:.1f} ms wall, {total_ms:.1f} ms importing {module}")
+        heaviest = sorted(((cum, name) for name, (_, cum, depth) in imports.items() if depth == 1 and name != module),
+                          reverse=True)[:args.top]
+        for cum, name in heaviest:
+            print(f"     {cum / 1000:8.1f} ms  {name}")
+        print()
+
+    if failed:
+        print(f"❌ Some text workflows exceed the {args.target_ms:.0f} ms startup budget", file=sys.stderr)
+        return 1
+    print(f"✅ All text workflows start within {args.target_ms:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,11 @@ import json
 import re
 from pathlib import Path
 
+# Markdown structures this converter understands -> (JSON, review markdown) output names
+OUTPUT_NAMES = {
+    "questionnaire-mode-de-vie-structure.md": ("mode-de-vie-clean.json", "mode-de-vie-review.md"),
+}
+
 def parse_markdown_to_json(md_content: str) -> dict:
     """Parse the markdown structure into a clean questionnaire JSON."""
     questionnaire = {
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped store of extracted questionnaire text, indexed by document, page and line.
+
+Instead of a tree of .txt files with ===== PAGE n ===== markers that every tool reads whole
+and splits again, a store keeps the corpus in two files:
+
+  <store>/corpus.bin   UTF-8 text of every page, as "\\n"-terminated lines (append-only)
+  <store>/corpus.idx   offset index: a JSON document table followed by uint64 arrays of
+                       page byte ranges, first line of each page and line start offsets
+
+Corpus maps both files. A page or a line range is located through the index and read as
+one slice of the mapping (page_bytes() returns a memoryview, without copying), so random
+access never reads whole files, and iter_documents() scans corpus.bin sequentially.
+
+A document's pages are the sections between the page markers of its .txt; lines before
+the first marker (e.g. the Source:/Chemin: header of extract-pdf-text.py) are page 0. Lines
+are those of str.splitlines() without the markers, so a document's lines are exactly what
+parse_questionnaires.normalize_lines() reads from the .txt file.
+
+CorpusWriter adds or replaces documents: new pages are appended to corpus.bin and the
+index is replaced atomically on close, so open readers keep a consistent view. Only one
+writer may update a store at a time. Unchanged documents are not appended again; text of
+replaced documents stays in corpus.bin until `compact`.
+
+Written by extract-pdf-text.py and ocr_pdf_pymupdf.py (--corpus), read by
+parse_questionnaires.py (--corpus).
+
+Usage:
+  python scripts/corpus_store.py build data/questionnaires/extracted --store data/questionnaires/corpus
+  python scripts/corpus_store.py ls --store data/questionnaires/corpus
+  python scripts/corpus_store.py cat --store data/questionnaires/corpus "Mode de vie/questionnaire-contextuel-mode-de-vie-pro-def" --page 2 --lines 0:20
+  python scripts/corpus_store.py compact --store data/questionnaires/corpus
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+STORE_FORMAT = 1
+MAGIC = b"QCORPUS\0"
+BIN_NAME = "corpus.bin"
+INDEX_NAME = "corpus.idx"
+
+PAGE_MARKER_RE = re.compile(r"^===== PAGE (\d+) =====$")
+
+PageContent = Union[str, Sequence[str]]
+
+
+def split_pages(text: str) -> List[Tuple[int, List[str]]]:
+    """Split marked text into (page number, lines) pairs; lines before the first marker are page 0."""
+    pages: List[Tuple[int, List[str]]] = []
+    number, lines = 0, []
+    for line in text.splitlines():
+        match = PAGE_MARKER_RE.match(line.strip())
+        if match is None:
+            lines.append(line)
+            continue
+        if number or lines:
+            pages.append((number, lines))
+        number, lines = int(match.group(1)), []
+    if number or lines:
+        pages.append((number, lines))
+    return pages
+
+
+def document_name(path: Path, root: Optional[Path] = None) -> str:
+    """Store name of a source file: its path relative to root, without suffix, with / separators."""
+    rel = path.relative_to(root) if root is not None else Path(path.name)
+    return rel.with_suffix("").as_posix()
+
+
+class Corpus:
+    """Read-only view of a store, see module docstring. Line numbers are 0-based within a document."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path / INDEX_NAME, "rb") as f:
+            self._index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._index_map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path / INDEX_NAME} is not a corpus index")
+        (header_size,) = struct.unpack_from("<Q", self._index_map, len(MAGIC))
+        offset = len(MAGIC) + 8
+        header = json.loads(self._index_map[offset:offset + header_size])
+        if header["format"] != STORE_FORMAT:
+            raise ValueError(f"Unsupported corpus format {header['format']} in {self.path}")
+        offset += header_size + (-header_size % 8)
+        swap = header["byteorder"] != sys.byteorder
+        self._page_ranges, offset = self._array(offset, 2 * header["pages"], swap)
+        self._page_lines, offset = self._array(offset, header["pages"] + 1, swap)
+        self._line_starts, offset = self._array(offset, header["lines"], swap)
+
+        self._documents: Dict[str, Dict] = {doc["name"]: doc for doc in header["documents"]}
+        self._bin_file = open(self.path / BIN_NAME, "rb")
+        size = os.fstat(self._bin_file.fileno()).st_size
+        self._data_map = mmap.mmap(self._bin_file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._data = memoryview(self._data_map) if self._data_map is not None else memoryview(b"")
+
+    def _array(self, offset: int, count: int, swap: bool):
+        view = memoryview(self._index_map)[offset:offset + 8 * count]
+        if swap:
+            values = array("Q", view)
+            values.byteswap()
+            view.release()
+            return values, offset + 8 * count
+        return view.cast("Q"), offset + 8 * count
+
+    def close(self) -> None:
+        for view in (self._page_ranges, self._page_lines, self._line_starts, self._data):
+            if isinstance(view, memoryview):
+                view.release()
+        try:
+            for mapping in (self._data_map, self._index_map):
+                if mapping is not None:
+                    mapping.close()
+        except BufferError:
+            pass  # page views handed out are still alive; the mappings go with them
+        self._bin_file.close()
+
+    def __enter__(self) -> "Corpus":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._documents
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._documents)
+
+    def names(self) -> List[str]:
+        return list(self._documents)
+
+    def meta(self, name: str) -> Dict:
+        return self._documents[name]["meta"]
+
+    def digest(self, name: str) -> str:
+        return self._documents[name]["sha256"]
+
+    def page_numbers(self, name: str) -> List[int]:
+        return self._documents[name]["page_numbers"]
+
+    def _page(self, name: str, number: int) -> int:
+        doc = self._documents[name]
+        try:
+            return doc["first_page"] + doc["page_numbers"].index(number)
+        except ValueError:
+            raise KeyError(f"{name} has no page {number}") from None
+
+    def _document_span(self, name: str) -> Tuple[int, int, int, int]:
+        """(first line, line stop, first byte, byte stop) of a document, global offsets."""
+        doc = self._documents[name]
+        first, count = doc["first_page"], len(doc["page_numbers"])
+        if not count:
+            return 0, 0, 0, 0
+        return (self._page_lines[first], self._page_lines[first + count],
+                self._page_ranges[2 * first], self._page_ranges[2 * (first + count) - 1])
+
+    def page_bytes(self, name: str, number: int) -> memoryview:
+        """UTF-8 text of one page, as a view of the mapped file (no copy)."""
+        k = self._page(name, number)
+        return self._data[self._page_ranges[2 * k]:self._page_ranges[2 * k + 1]]
+
+    def page_text(self, name: str, number: int) -> str:
+        return str(self.page_bytes(name, number), "utf-8")
+
+    def page_lines(self, name: str, number: int) -> List[str]:
+        k = self._page(name, number)
+        first_line = self._page_lines[k] - self._document_span(name)[0]
+        return self.lines(name, first_line, first_line + self._page_lines[k + 1] - self._page_lines[k])
+
+    def line_count(self, name: str) -> int:
+        first, stop, _, _ = self._document_span(name)
+        return stop - first
+
+    def size(self, name: str) -> int:
+        _, _, start, end = self._document_span(name)
+        return end - start
+
+    def document_bytes(self, name: str) -> memoryview:
+        _, _, start, end = self._document_span(name)
+        return self._data[start:end]
+
+    def lines(self, name: str, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """Lines [start, stop) of a document, decoded from a single slice of the mapping."""
+        first, line_stop, _, end = self._document_span(name)
+        count = line_stop - first
+        stop = count if stop is None else max(0, min(stop, count))
+        start = max(0, min(start, stop))
+        if start == stop:
+            return []
+        byte_start = self._line_starts[first + start]
+        byte_stop = self._line_starts[first + stop] if first + stop < line_stop else end
+        return str(self._data[byte_start:byte_stop], "utf-8").split("\n")[:-1]
+
+    def iter_documents(self) -> Iterator[Tuple[str, List[str]]]:
+        """(name, lines) of every document, in file order so corpus.bin is read sequentially."""
+        for name in sorted(self._documents, key=lambda n: self._document_span(n)[2]):
+            yield name, self.lines(name)
+
+    def stats(self) -> Dict:
+        live = sum(self.size(name) for name in self._documents)
+        return {"documents": len(self._documents), "pages": len(self._page_ranges) // 2,
+                "lines": len(self._line_starts), "bytes": len(self._data), "live_bytes": live}
+
+
+class CorpusWriter:
+    """Adds or replaces documents in a store (created if needed); the index is written on close().
+
+    With rebuild=True the store is written from scratch and replaces the old one on close.
+    """
+
+    def __init__(self, path: Path, rebuild: bool = False):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.added = 0
+        self.unchanged = 0
+        # name -> {"meta", "sha256", "pages": [(number, start, end, line starts)]}
+        self._documents: Dict[str, Dict] = {}
+        bin_path = self.path / BIN_NAME
+        if not rebuild and (self.path / INDEX_NAME).exists():
+            with Corpus(self.path) as corpus:
+                for name in corpus:
+                    self._documents[name] = self._load_document(corpus, name)
+            self._bin_tmp = None
+            self._bin = open(bin_path, "ab")
+        else:
+            self._bin_tmp = bin_path.with_name(f"{BIN_NAME}.{os.getpid()}.tmp")
+            self._bin = open(self._bin_tmp, "wb")
+        self._size = self._bin.tell()
+
+    @staticmethod
+    def _load_document(corpus: Corpus, name: str) -> Dict:
+        doc = corpus._documents[name]
+        pages = []
+        for k in range(doc["first_page"], doc["first_page"] + len(doc["page_numbers"])):
+            starts = list(corpus._line_starts[corpus._page_lines[k]:corpus._page_lines[k + 1]])
+            pages.append((doc["page_numbers"][k - doc["first_page"]], corpus._page_ranges[2 * k],
+                          corpus._page_ranges[2 * k + 1], starts))
+        return {"meta": doc["meta"], "sha256": doc["sha256"], "pages": pages}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._documents
+
+    def add_document(self, name: str, pages: Iterable[Tuple[int, PageContent]], meta: Optional[Dict] = None) -> None:
+        """Add or replace a document; pages are (number, text or list of lines) pairs, in order."""
+        encoded = []
+        digest = hashlib.sha256()
+        for number, content in pages:
+            lines = content.splitlines() if isinstance(content, str) else content
+            data = "".join(line + "\n" for line in lines).encode("utf-8")
+            digest.update(f"{number}:{len(data)}\n".encode("ascii"))
+            digest.update(data)
+            encoded.append((number, data))
+        sha256 = digest.hexdigest()
+        previous = self._documents.get(name)
+        if previous is not None and previous["sha256"] == sha256:
+            previous["meta"] = meta or {}
+            self.unchanged += 1
+            return
+
+        stored = []
+        for number, data in encoded:
+            start = self._size
+            starts = []
+            pos = 0
+            while pos < len(data):
+                starts.append(start + pos)
+                pos = data.index(b"\n", pos) + 1
+            self._bin.write(data)
+            self._size += len(data)
+            stored.append((number, start, self._size, starts))
+        self._documents[name] = {"meta": meta or {}, "sha256": sha256, "pages": stored}
+        self.added += 1
+
+    def add_text(self, name: str, text: str, meta: Optional[Dict] = None) -> None:
+        """Add a document from text with ===== PAGE n ===== markers (the .txt format)."""
+        self.add_document(name, split_pages(text), meta)
+
+    def remove(self, name: str) -> bool:
+        return self._documents.pop(name, None) is not None
+
+    def close(self) -> None:
+        """Flush the text and atomically replace the index."""
+        self._bin.close()
+        documents = []
+        page_ranges = array("Q")
+        page_lines = array("Q")
+        line_starts = array("Q")
+        for name in sorted(self._documents):
+            doc = self._documents[name]
+            documents.append({"name": name, "meta": doc["meta"], "sha256": doc["sha256"],
+                              "first_page": len(page_lines), "page_numbers": [p[0] for p in doc["pages"]]})
+            for _, start, end, starts in doc["pages"]:
+                page_ranges.extend((start, end))
+                page_lines.append(len(line_starts))
+                line_starts.extend(starts)
+        page_lines.append(len(line_starts))
+
+        header = json.dumps({"format": STORE_FORMAT, "byteorder": sys.byteorder, "pages": len(page_lines) - 1,
+                             "lines": len(line_starts), "documents": documents}, ensure_ascii=False).encode("utf-8")
+        index_tmp = self.path / f"{INDEX_NAME}.{os.getpid()}.tmp"
+        with open(index_tmp, "wb") as f:
+            f.write(MAGIC + struct.pack("<Q", len(header)) + header + b"\0" * (-len(header) % 8))
+            for values in (page_ranges, page_lines, line_starts):
+                values.tofile(f)
+        if self._bin_tmp is not None:
+            os.replace(self._bin_tmp, self.path / BIN_NAME)
+        os.replace(index_tmp, self.path / INDEX_NAME)
+
+    def __enter__(self) -> "CorpusWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._bin.close()
+
+
+def build(sources: List[Path], store: Path) -> Tuple[int, int]:
+    """Rebuild a store from .txt files and directories (searched recursively); returns (documents, bytes)."""
+    with CorpusWriter(store, rebuild=True) as writer:
+        for source in sources:
+            files = sorted(source.rglob("*.txt")) if source.is_dir() else [source]
+            for txt in files:
+                name = document_name(txt, source if source.is_dir() else None)
+                if name in writer:
+                    print(f"⚠️  {txt}: {name} already added, skipped", file=sys.stderr)
+                    continue
+                writer.add_text(name, txt.read_text(encoding="utf-8", errors="ignore"), {"source": str(txt)})
+        size = writer._size
+    return len(writer._documents), size
+
+
+def compact(store: Path) -> Tuple[int, int]:
+    """Rewrite corpus.bin with only the text of current documents; returns (bytes before, after)."""
+    writer = CorpusWriter(store, rebuild=True)
+    # Everything is copied before the new files replace the mapped ones
+    with Corpus(store) as corpus:
+        before = corpus.stats()["bytes"]
+        for name in sorted(corpus, key=lambda n: corpus._document_span(n)[2]):
+            writer.add_document(name, [(number, corpus.page_lines(name, number))
+                                       for number in corpus.page_numbers(name)], corpus.meta(name))
+    writer.close()
+    return before, writer._size
+
+
+def parse_line_range(spec: str) -> Tuple[int, Optional[int]]:
+    start, _, stop = spec.partition(":")
+    return int(start or 0), int(stop) if stop else None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build", help="(Re)build a store from extracted .txt files")
+    p.add_argument("sources", nargs="+", help=".txt files or directories (names are paths relative to each directory)")
+    p.add_argument("--store", required=True)
+    p = sub.add_parser("ls", help="List documents")
+    p.add_argument("--store", required=True)
+    p = sub.add_parser("cat", help="Print a document, one of its pages, or a line range")
+    p.add_argument("--store", required=True)
+    p.add_argument("name")
+    p.add_argument("--page", type=int, help="Page number (0: text before the first page marker)")
+    p.add_argument("--lines", help="Line range START:STOP, within the page if --page is given")
+    p = sub.add_parser("compact", help="Drop replaced text from corpus.bin")
+    p.add_argument("--store", required=True)
+    args = ap.parse_args(argv)
+
+    store = Path(args.store)
+    if args.command == "build":
+        count, size = build([Path(s) for s in args.sources], store)
+        print(f"📦 {count} document(s), {size / 1e6:.2f} MB written to {store}")
+        return 0
+    if args.command == "compact":
+        before, after = compact(store)
+        print(f"🧹 {store}: {before / 1e6:.2f} MB -> {after / 1e6:.2f} MB")
+        return 0
+
+    with Corpus(store) as corpus:
+        if args.command == "ls":
+            for name in corpus:
+                pages = corpus.page_numbers(name)
+                print(f"{len(pages):5d} pages {corpus.line_count(name):7d} lines {corpus.size(name):9d} B  {name}")
+            stats = corpus.stats()
+            print(f"\n{stats['documents']} document(s), {stats['pages']} pages, {stats['lines']} lines, "
+                  f"{stats['live_bytes'] / 1e6:.2f} MB ({stats['bytes'] / 1e6:.2f} MB in {BIN_NAME})")
+            return 0
+        if args.name not in corpus:
+            print(f"❌ No document {args.name!r} in {store}", file=sys.stderr)
+            return 1
+        if args.page is not None and args.page not in corpus.page_numbers(args.name):
+            print(f"❌ {args.name} has no page {args.page}", file=sys.stderr)
+            return 1
+        lines = corpus.page_lines(args.name, args.page) if args.page is not None else None
+        if args.lines:
+            start, stop = parse_line_range(args.lines)
+            lines = lines[start:stop] if lines is not None else corpus.lines(args.name, start, stop)
+        if lines is None:
+            sys.stdout.write(str(corpus.document_bytes(args.name), "utf-8"))
+        else:
+            sys.stdout.write("".join(line + "\n" for line in lines))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate question detection across the questionnaire catalog (MinHash + LSH).
+
+Every question of the inputs becomes up to two items: its label, and its option set (the
+option texts without their "(N pts)" suffix, when it has at least two options). Item text
+is normalized for French like search_index.py does (lowercased, accents folded, split on
+non-letters) and cut into character shingles, which keeps OCR variants ("sornmeil" /
+"sommeil") close. Each shingle set gets a MinHash signature; signatures are split into
+bands and items sharing a band bucket become candidate pairs, so the catalog is never
+compared pairwise. Candidates are kept when the Jaccard similarity of their shingle sets
+reaches --threshold, and connected pairs form the clusters reported for review.
+
+Items with the same normalized text are collapsed first (one exact-duplicate group is
+one LSH entry), so repeated boilerplate does not make buckets quadratic.
+
+Inputs are questionnaire JSON/JSONL files (extract_questionnaires.py, parse_questionnaires.py
+outputs) or extracted .txt files, parsed on the fly with parse_questionnaires.parse_text.
+Signatures use numpy when it is installed and pure Python otherwise (same results).
+
+Usage:
+  python scripts/dedupe_questions.py packages/shared-questionnaires/extracted
+  python scripts/dedupe_questions.py packages/shared-questionnaires/extracted data/questionnaires/generated --threshold 0.6 --output data/questionnaires/duplicates.json
+  python scripts/dedupe_questions.py data/questionnaires/extracted --kind options --min-size 3
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+import zlib
+from pathlib import Path
+
+from search_index import TOKEN_RE, expand_json_inputs, fold, load_questionnaires
+
+PRIME = (1 << 31) - 1
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE = 5
+DEFAULT_THRESHOLD = 0.7
+LSH_MARGIN = 0.1
+POINTS_SUFFIX_RE = re.compile(r"\(\s*\d+\s*pts?\s*\)|\b\d+\s*pts?\b", re.IGNORECASE)
+
+
+def normalize(text: str) -> str:
+    return " ".join(TOKEN_RE.findall(fold(text or "")))
+
+
+def option_set_text(options: list) -> str:
+    """Normalized option texts (points stripped), sorted so option order does not matter."""
+    texts = []
+    for option in options:
+        label = option.get("label", "") if isinstance(option, dict) else str(option)
+        text = normalize(POINTS_SUFFIX_RE.sub(" ", label))
+        if text:
+            texts.append(text)
+    return " | ".join(sorted(texts)) if len(texts) >= 2 else ""
+
+
+def shingles(text: str, size: int = DEFAULT_SHINGLE) -> set[int]:
+    """CRC32 hashes (mod PRIME) of the character shingles of a normalized text."""
+    if len(text) <= size:
+        return {zlib.crc32(text.encode("utf-8")) % PRIME}
+    return {zlib.crc32(text[i:i + size].encode("utf-8")) % PRIME for i in range(len(text) - size + 1)}
+
+
+def lsh_bands(num_perm: int, threshold: float) -> tuple[int, int]:
+    """(bands, rows) with bands * rows == num_perm for this Jaccard threshold.
+
+    The S-curve midpoint (1/bands)^(1/rows) is kept LSH_MARGIN below the threshold, so pairs just
+    above it are still very likely candidates (recall first, the exact check drops the rest);
+    among those layouts, the most selective one.
+    """
+    layouts = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    recall_first = [br for br in layouts if (1 / br[0]) ** (1 / br[1]) <= threshold - LSH_MARGIN]
+    return max(recall_first, key=lambda br: br[1]) if recall_first else layouts[0]
+
+
+class MinHasher:
+    """MinHash signatures with num_perm universal hash functions (a * x + b) mod PRIME."""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1):
+        rng = random.Random(seed)
+        self.params = [(rng.randrange(1, PRIME), rng.randrange(PRIME)) for _ in range(num_perm)]
+        try:
+            import numpy as np
+        except ImportError:
+            self._np = None
+        else:
+            self._np = np
+            self._a = np.array([a for a, _ in self.params], dtype=np.uint64)[:, None]
+            self._b = np.array([b for _, b in self.params], dtype=np.uint64)[:, None]
+
+    def signature(self, hashes: set[int]) -> tuple[int, ...]:
+        if self._np is not None:
+            np = self._np
+            xs = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+            # a, x < 2^31: a * x + b fits in uint64
+            return tuple(((self._a * xs + self._b) % PRIME).min(axis=1).tolist())
+        xs = list(hashes)
+        return tuple(min([(a * x + b) % PRIME for x in xs]) for a, b in self.params)
+
+
+def read_questionnaires(paths: list[Path]) -> list[tuple[str, dict]]:
+    """(source, questionnaire) for every JSON/JSONL record and .txt file."""
+    result = []
+    for path in paths:
+        if path.suffix.lower() == ".txt":
+            from parse_questionnaires import normalize_lines, parse_text
+
+            data = parse_text(normalize_lines(path.read_text(encoding="utf-8", errors="ignore")))
+            data.setdefault("id", path.stem)
+            result.append((path.as_posix(), data))
+        else:
+            result.extend((key, data) for key, _, data in load_questionnaires(path))
+    return result
+
+
+def question_items(questionnaires: list[tuple[str, dict]], kinds: tuple[str, ...]) -> list[dict]:
+    """Dedup items (kind, normalized text and where the question comes from) of every question."""
+    items = []
+    for source, data in questionnaires:
+        if "sections" in data:
+            questions = [(sec.get("title"), q) for sec in data["sections"] for q in sec.get("questions") or []]
+        else:
+            questions = [(None, q) for q in data.get("questions") or []]
+        for section, q in questions:
+            where = {"source": source, "questionnaire": data.get("id"), "section": section,
+                     "question_id": q.get("id"), "label": q.get("label") or ""}
+            if "question" in kinds:
+                text = normalize(q.get("label") or "")
+                if text:
+                    items.append({"kind": "question", "text": text, **where})
+            if "options" in kinds:
+                text = option_set_text(q.get("options") or [])
+                if text:
+                    items.append({"kind": "options", "text": text, **where})
+    return items
+
+
+class _DisjointSet:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> None:
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+def find_clusters(items: list[dict], threshold: float = DEFAULT_THRESHOLD, num_perm: int = DEFAULT_NUM_PERM,
+                  shingle_size: int = DEFAULT_SHINGLE) -> tuple[list[dict], dict]:
+    """Clusters of near-duplicate items (of the same kind) and run statistics."""
+    start = time.perf_counter()
+    # Exact duplicates share one LSH entry
+    groups: dict[tuple[str, str], list[int]] = {}
+    for i, item in enumerate(items):
+        groups.setdefault((item["kind"], item["text"]), []).append(i)
+    keys = list(groups)
+    sets = [shingles(text, shingle_size) for _, text in keys]
+
+    hasher = MinHasher(num_perm)
+    signatures = [hasher.signature(s) for s in sets]
+    signed = time.perf_counter()
+
+    bands, rows = lsh_bands(num_perm, threshold)
+    candidates: set[tuple[int, int]] = set()
+    for band in range(bands):
+        buckets: dict[tuple, list[int]] = {}
+        for g, sig in enumerate(signatures):
+            buckets.setdefault((keys[g][0], sig[band * rows:(band + 1) * rows]), []).append(g)
+        for members in buckets.values():
+            for a in range(len(members)):
+                for b in range(a + 1, len(members)):
+                    candidates.add((members[a], members[b]))
+
+    dsu = _DisjointSet(len(keys))
+    edges: dict[tuple[int, int], float] = {}
+    for a, b in candidates:
+        similarity = len(sets[a] & sets[b]) / len(sets[a] | sets[b])
+        if similarity >= threshold:
+            edges[(a, b)] = similarity
+            dsu.union(a, b)
+
+    components: dict[int, list[int]] = {}
+    for g in range(len(keys)):
+        components.setdefault(dsu.find(g), []).append(g)
+    clusters = []
+    for members in components.values():
+        size = sum(len(groups[keys[g]]) for g in members)
+        if size < 2:
+            continue
+        # Representative: the variant with the most occurrences, then the shortest text
+        rep = min(members, key=lambda g: (-len(groups[keys[g]]), len(keys[g][1])))
+        scores = [s for (a, b), s in edges.items() if a in members and b in members] if len(members) > 1 else []
+        entries = []
+        for g in members:
+            similarity = 1.0 if g == rep else len(sets[g] & sets[rep]) / len(sets[g] | sets[rep])
+            for i in groups[keys[g]]:
+                item = items[i]
+                entries.append({"similarity": round(similarity, 3),
+                                **{k: item[k] for k in ("source", "questionnaire", "section", "question_id", "label")}})
+        entries.sort(key=lambda e: (-e["similarity"], e["questionnaire"] or "", e["question_id"] or ""))
+        clusters.append({
+            "kind": keys[rep][0],
+            "text": keys[rep][1],
+            "size": size,
+            "variants": len(members),
+            "questionnaires": len({e["source"] for e in entries}),
+            "min_similarity": round(min(scores), 3) if scores else 1.0,
+            "members": entries,
+        })
+    clusters.sort(key=lambda c: (-c["size"], -c["variants"], c["text"]))
+    stats = {"items": len(items), "distinct": len(keys), "bands": bands, "rows": rows,
+             "candidates": len(candidates), "edges": len(edges), "clusters": len(clusters),
+             "signature_seconds": signed - start, "total_seconds": time.perf_counter() - start}
+    return clusters, stats
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("inputs", nargs="+", help="Questionnaire JSON/JSONL or extracted .txt files or directories")
+    ap.add_argument("--kind", choices=["question", "options", "both"], default="both",
+                    help="Compare question labels, option sets or both (default)")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Jaccard similarity of shingle sets")
+    ap.add_argument("--num-perm", type=int, default=DEFAULT_NUM_PERM, help="MinHash signature length")
+    ap.add_argument("--shingle", type=int, default=DEFAULT_SHINGLE, help="Shingle size in characters")
+    ap.add_argument("--min-size", type=int, default=2, help="Smallest cluster reported")
+    ap.add_argument("--cross-only", action="store_true", help="Only clusters spanning several questionnaires")
+    ap.add_argument("--output", help="Write the clusters as JSON")
+    ap.add_argument("--top", type=int, default=15, help="Clusters printed")
+    args = ap.parse_args(argv)
+
+    specs = [Path(p) for p in args.inputs]
+    missing = [str(p) for p in specs if not p.exists()]
+    if missing:
+        print(f"❌ Not found: {', '.join(missing)}", file=sys.stderr)
+        return 1
+    paths = []
+    for spec in specs:
+        paths.extend(expand_json_inputs([str(spec)]))
+        paths.extend(sorted(spec.rglob("*.txt")) if spec.is_dir() else [])
+    kinds = ("question", "options") if args.kind == "both" else (args.kind,)
+    items = question_items(read_questionnaires(sorted(set(paths))), kinds)
+    clusters, stats = find_clusters(items, args.threshold, args.num_perm, args.shingle)
+    clusters = [c for c in clusters if c["size"] >= args.min_size and (not args.cross_only or c["questionnaires"] > 1)]
+
+    print(f"🔎 {stats['items']} item(s), {stats['distinct']} distinct, LSH {stats['bands']} bands x {stats['rows']} rows: "
+          f"{stats['candidates']} candidate pair(s), {stats['edges']} above {args.threshold}")
+    print(f"⏱️  {stats['total_seconds']:.2f}s (signatures {stats['signature_seconds']:.2f}s)")
+    print(f"📦 {len(clusters)} cluster(s)\n")
+    for cluster in clusters[:args.top]:
+        print(f"[{cluster['kind']}] x{cluster['size']} in {cluster['questionnaires']} file(s), "
+              f"{cluster['variants']} variant(s), min similarity {cluster['min_similarity']:.2f}")
+        print(f"  {cluster['text'][:110]}")
+        for member in cluster["members"][:5]:
+            print(f"    {member['similarity']:.2f}  {member['questionnaire']} / {member['question_id']}")
+        if len(cluster["members"]) > 5:
+            print(f"    ... {len(cluster['members']) - 5} more")
+    if args.output:
+        out = Path(args.output)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps({"threshold": args.threshold, "stats": stats, "clusters": clusters},
+                                  ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n✅ Clusters written to {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
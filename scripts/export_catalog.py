@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Columnar export of the questionnaire catalog for analytics.
+
+Flattens the questionnaire JSON (extract_questionnaires.py <id>.json files or --jsonl
+stream, parse_questionnaires.py and convert_mode_de_vie_to_json.py outputs) and the
+extraction .meta.json files (extract_pdf_hybrid.py) into five tables:
+
+  documents       document_key, path, file, pages, ocr_pages
+  questionnaires  questionnaire_key, document_key, source, id, title, category, description,
+                  sections, questions
+  sections        section_key, questionnaire_key, position, id, title, questions
+  questions       question_key, questionnaire_key, section_key, position, id, label, type,
+                  options, scored
+  options         option_key, question_key, questionnaire_key, position, label, points
+
+Keys are int64 hashes of natural keys (source path relative to the working directory,
+questionnaire id, section/question id, plus the position within the source file or the
+parent when an id is missing or repeats), so they stay the same from one export to the
+next, whatever other inputs are exported with them, and tables exported at different times
+still join. Primary keys are checked for uniqueness before writing. A questionnaire is
+linked to the document whose file stem matches its id, or else its source file stem
+(case-insensitive); the questionnaires left without a document are listed.
+
+Tables are written as Parquet or Arrow IPC (pyarrow; .arrow files can be memory-mapped
+with load_table) or, without pyarrow, as CSV (empty cell = null), next to a manifest.json
+giving the format, schema and row counts.
+
+Usage:
+  python scripts/export_catalog.py
+  python scripts/export_catalog.py packages/shared-questionnaires/extracted data/questionnaires/generated --output data/questionnaires/catalog --format arrow
+  python scripts/export_catalog.py --format csv
+"""
+import argparse
+import csv
+import hashlib
+import json
+import sys
+from pathlib import Path, PurePosixPath
+
+from search_index import expand_json_inputs, load_questionnaires
+
+DEFAULT_INPUTS = ["packages/shared-questionnaires/extracted", "data/questionnaires/generated",
+                  "data/questionnaires/extracted"]
+DEFAULT_OUTPUT = "data/questionnaires/catalog"
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+
+SCHEMA = {
+    "documents": [("document_key", "int64"), ("path", "string"), ("file", "string"), ("pages", "int32"),
+                  ("ocr_pages", "int32")],
+    "questionnaires": [("questionnaire_key", "int64"), ("document_key", "int64"), ("source", "string"),
+                       ("id", "string"), ("title", "string"), ("category", "string"), ("description", "string"),
+                       ("sections", "int32"), ("questions", "int32")],
+    "sections": [("section_key", "int64"), ("questionnaire_key", "int64"), ("position", "int32"), ("id", "string"),
+                 ("title", "string"), ("questions", "int32")],
+    "questions": [("question_key", "int64"), ("questionnaire_key", "int64"), ("section_key", "int64"),
+                  ("position", "int32"), ("id", "string"), ("label", "string"), ("type", "string"),
+                  ("options", "int32"), ("scored", "bool")],
+    "options": [("option_key", "int64"), ("question_key", "int64"), ("questionnaire_key", "int64"),
+                ("position", "int32"), ("label", "string"), ("points", "float64")],
+}
+
+
+def stable_key(*parts) -> int:
+    """Non-negative int64 from a natural key (63 bits of BLAKE2b)."""
+    digest = hashlib.blake2b("\x1f".join(str(p) for p in parts).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 1
+
+
+def source_path(path: Path) -> str:
+    """Path of a source file relative to the working directory (absolute if outside it), the same whatever input named it."""
+    path = path.resolve()
+    try:
+        return path.relative_to(Path.cwd().resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def natural_id(value, position: int, seen: set) -> tuple:
+    """Natural key part of a child: its id, or its position if it has none; the position is added when the id repeats."""
+    if not value:
+        return (position,)
+    if value in seen:
+        return (value, position)
+    seen.add(value)
+    return (value,)
+
+
+def option_fields(option, points) -> tuple[str, float | None]:
+    """(label, points) of an option given as a string or a {label, points} dict."""
+    if isinstance(option, dict):
+        return str(option.get("label", "")), option.get("points", points)
+    return str(option), points
+
+
+class CatalogTables:
+    """Column lists of the catalog tables, filled questionnaire by questionnaire."""
+
+    def __init__(self):
+        self.columns = {table: {name: [] for name, _ in schema} for table, schema in SCHEMA.items()}
+        self._documents: dict[str, int] = {}
+        self._ids: dict[str, set] = {}
+        self.unlinked: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.columns["questionnaires"]["questionnaire_key"])
+
+    def rows(self, table: str) -> int:
+        return len(next(iter(self.columns[table].values())))
+
+    def _append(self, table: str, **values) -> None:
+        for name, column in self.columns[table].items():
+            column.append(values.get(name))
+
+    def add_document(self, path: str, meta: dict) -> None:
+        methods = meta.get("page_methods") or []
+        key = stable_key("document", path)
+        self._append("documents", document_key=key, path=path, file=meta.get("file"), pages=meta.get("pages"),
+                     ocr_pages=sum(1 for m in methods if m.get("method") == "ocr") if methods else None)
+        self._documents.setdefault(Path(path).name.removesuffix(".meta.json").casefold(), key)
+
+    def add_questionnaire(self, source: str, data: dict, record: int = 1) -> None:
+        """Add one questionnaire; record is its position within its source file (JSONL line order)."""
+        qid = data.get("id")
+        qkey = stable_key("questionnaire", source, *natural_id(qid, record, self._ids.setdefault(source, set())))
+        if "sections" in data:
+            groups = [(sec, sec.get("questions") or []) for sec in data["sections"]]
+        else:
+            groups = [(None, data.get("questions") or [])]
+        position = 0
+        section_ids: set = set()
+        question_ids: set = set()
+        for s, (section, questions) in enumerate(groups, 1):
+            skey = None
+            if section is not None:
+                skey = stable_key("section", qkey, *natural_id(section.get("id"), s, section_ids))
+                self._append("sections", section_key=skey, questionnaire_key=qkey, position=s, id=section.get("id"),
+                             title=section.get("title"), questions=len(questions))
+            for question in questions:
+                position += 1
+                key = stable_key("question", qkey, *natural_id(question.get("id"), position, question_ids))
+                options = question.get("options") or []
+                points = question.get("points") or []
+                self._append("questions", question_key=key, questionnaire_key=qkey, section_key=skey,
+                             position=position, id=question.get("id"), label=question.get("label"),
+                             type=question.get("type"), options=len(options),
+                             scored=any(p is not None for p in points))
+                for o, option in enumerate(options, 1):
+                    label, value = option_fields(option, points[o - 1] if o <= len(points) else None)
+                    self._append("options", option_key=stable_key("option", key, o), question_key=key,
+                                 questionnaire_key=qkey, position=o, label=label, points=value)
+        self._append("questionnaires", questionnaire_key=qkey, document_key=None, source=source, id=qid,
+                     title=data.get("title"), category=data.get("category"), description=data.get("description"),
+                     sections=len(groups) if "sections" in data else 0, questions=position)
+
+    def check_keys(self) -> None:
+        """Raise ValueError if a primary key (first column of a table) is not unique."""
+        for table, schema in SCHEMA.items():
+            column = self.columns[table][schema[0][0]]
+            duplicates = len(column) - len(set(column))
+            if duplicates:
+                raise ValueError(f"{table}: {duplicates} duplicate {schema[0][0]} value(s)")
+
+    def link_documents(self) -> list[str]:
+        """Fill questionnaires.document_key from the documents whose stem matches the questionnaire id
+        (or else its source file stem); returns the sources of the questionnaires left unlinked."""
+        table = self.columns["questionnaires"]
+        table["document_key"] = [
+            self._documents.get(str(qid or "").casefold(),
+                                self._documents.get(PurePosixPath(source).stem.casefold()))
+            for qid, source in zip(table["id"], table["source"])]
+        return [source for source, key in zip(table["source"], table["document_key"]) if key is None]
+
+
+def collect(inputs: list[str]) -> CatalogTables:
+    """Catalog tables of every questionnaire JSON/JSONL and .meta.json file under the inputs."""
+    tables = CatalogTables()
+    seen = set()
+    for spec in map(Path, inputs):
+        for path in expand_json_inputs([str(spec)]):
+            relative = source_path(path)
+            if relative in seen:
+                continue  # named by several inputs
+            seen.add(relative)
+            if path.name.endswith(".meta.json"):
+                try:
+                    meta = json.loads(path.read_text(encoding="utf-8"))
+                except ValueError:
+                    continue
+                if isinstance(meta, dict):
+                    tables.add_document(relative, meta)
+                continue
+            for record, (_, _, data) in enumerate(load_questionnaires(path), 1):
+                tables.add_questionnaire(relative, data, record)
+    tables.unlinked = tables.link_documents()
+    return tables
+
+
+def _arrow_table(columns: dict, schema: list):
+    import pyarrow as pa
+
+    types = {"int64": pa.int64(), "int32": pa.int32(), "float64": pa.float64(), "bool": pa.bool_(),
+             "string": pa.string()}
+    return pa.table({name: pa.array(columns[name], type=types[kind]) for name, kind in schema})
+
+
+def write_tables(tables: CatalogTables, output: Path, fmt: str) -> dict:
+    """Write every table in this format to output; returns the manifest."""
+    tables.check_keys()
+    output.mkdir(parents=True, exist_ok=True)
+    manifest = {"format": fmt, "tables": {}}
+    for name, schema in SCHEMA.items():
+        path = output / f"{name}{FORMATS[fmt]}"
+        tmp = path.with_name(path.name + ".tmp")
+        columns = tables.columns[name]
+        if fmt == "csv":
+            with open(tmp, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow([column for column, _ in schema])
+                writer.writerows(zip(*(columns[column] for column, _ in schema)))
+        elif fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            pq.write_table(_arrow_table(columns, schema), tmp, compression="zstd")
+        else:
+            import pyarrow as pa
+
+            table = _arrow_table(columns, schema)
+            with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        tmp.replace(path)
+        manifest["tables"][name] = {"file": path.name, "rows": tables.rows(name), "schema": dict(schema)}
+    (output / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    return manifest
+
+
+def _csv_value(text: str, kind: str):
+    if text == "":
+        return None
+    if kind in ("int64", "int32"):
+        return int(text)
+    if kind == "float64":
+        return float(text)
+    if kind == "bool":
+        return text == "True"
+    return text
+
+
+def load_table(output, name: str, columns: list[str] | None = None):
+    """One exported table: a pyarrow Table (Arrow IPC files are memory-mapped) or, for CSV, {column: list}."""
+    output = Path(output)
+    manifest = json.loads((output / "manifest.json").read_text(encoding="utf-8"))
+    entry = manifest["tables"][name]
+    path = output / entry["file"]
+    if manifest["format"] == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path, columns=columns, memory_map=True)
+    if manifest["format"] == "arrow":
+        import pyarrow as pa
+
+        table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        return table.select(columns) if columns else table
+    schema = entry["schema"]
+    wanted = columns or list(schema)
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        picks = [(header.index(column), column) for column in wanted]
+        result = {column: [] for column in wanted}
+        for row in reader:
+            for i, column in picks:
+                result[column].append(_csv_value(row[i], schema[column]))
+    return result
+
+
+def default_format() -> str:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "csv"
+    return "parquet"
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("inputs", nargs="*", default=DEFAULT_INPUTS,
+                    help="Questionnaire JSON/JSONL and .meta.json files or directories (default: the catalog)")
+    ap.add_argument("--output", default=DEFAULT_OUTPUT, help=f"Output directory (default: {DEFAULT_OUTPUT})")
+    ap.add_argument("--format", choices=["auto", *FORMATS], default="auto",
+                    help="parquet or arrow (needs pyarrow), csv; auto = parquet if pyarrow is installed, else csv")
+    args = ap.parse_args(argv)
+
+    missing = [p for p in args.inputs if not Path(p).exists()]
+    if missing:
+        print(f"❌ Not found: {', '.join(missing)}", file=sys.stderr)
+        return 1
+    fmt = default_format() if args.format == "auto" else args.format
+    if fmt != "csv" and default_format() == "csv":
+        print(f"❌ --format {fmt} needs pyarrow (pip install pyarrow), or use --format csv", file=sys.stderr)
+        return 1
+
+    tables = collect(args.inputs)
+    if not len(tables):
+        print("⚠️  No questionnaire found")
+    manifest = write_tables(tables, Path(args.output), fmt)
+    print(f"✅ Catalog exported to {args.output} ({fmt})")
+    for name, entry in manifest["tables"].items():
+        print(f"  {name:15} {entry['rows']:7} row(s)  {entry['file']}")
+    if tables.unlinked:
+        print(f"⚠️  {len(tables.unlinked)} questionnaire(s) without a source document (document_key is null):")
+        for source in tables.unlinked:
+            print(f"  {source}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,19 +2,28 @@
 """
 Script d'extraction OCR depuis PDF avec Tesseract.
 Pour les PDF scannés ou avec peu de texte natif.
+
+Les pages sont rendues et OCRisées par fenêtres de quelques pages (--window), et le texte
+est écrit au fur et à mesure: la mémoire maximale ne dépend pas du nombre de pages.
+
+Par défaut (--engine auto), Tesseract reste chargé en mémoire (tesserocr ou libtesseract,
+voir ocr_engines.py) au lieu d'être relancé par pytesseract pour chaque page.
 """
 
 import os
 import sys
+import argparse
 from pathlib import Path
+from typing import Iterator, Optional, TextIO, Tuple
+
+from ocr_engines import ENGINES, make_engine
 
 try:
-    import pytesseract
-    from pdf2image import convert_from_path
+    from pdf2image import convert_from_path, pdfinfo_from_path
     from PIL import Image
 except ImportError:
     print("❌ Bibliothèques manquantes. Installation...")
-    print("   pip install pytesseract pdf2image pillow")
+    print("   pip install pdf2image pillow tesserocr   (ou pytesseract)")
     print("\n⚠️  Tesseract doit aussi être installé:")
     print("   Windows: https://github.com/UB-Mannheim/tesseract/wiki")
     print("   Ubuntu: sudo apt install tesseract-ocr tesseract-ocr-fra")
@@ -22,16 +31,45 @@ except ImportError:
     sys.exit(1)
 
 
-def ocr_pdf(pdf_path: Path, lang='fra+eng') -> str:
+def iter_ocr_pages(pdf_path: Path, lang: str = 'fra+eng', dpi: int = 300, window: int = 1,
+                   engine=None) -> Iterator[Tuple[int, int, str]]:
+    """Rend et OCRise le PDF par fenêtres de `window` pages, en produisant (page, nb_pages, texte).
+
+    `engine` vient de ocr_engines.make_engine (par défaut: un processus pytesseract par page).
+    """
+    engine = engine or make_engine("pytesseract", lang)
+    page_count = pdfinfo_from_path(str(pdf_path))["Pages"]
+    for first in range(1, page_count + 1, window):
+        last = min(first + window - 1, page_count)
+        images = convert_from_path(pdf_path, dpi=dpi, first_page=first, last_page=last)
+        for offset, image in enumerate(images):
+            yield first + offset, page_count, engine.image_to_string(image)
+        # Libérer la fenêtre avant de rendre la suivante
+        del images
+
+
+def ocr_pdf_to_file(pdf_path: Path, out: TextIO, lang: str = 'fra+eng', dpi: int = 300, window: int = 1,
+                    engine=None) -> int:
+    """OCRise un PDF en écrivant chaque page dans `out` dès qu'elle est reconnue. Retourne le nombre de caractères."""
+    char_count = 0
+    first_part = True
+    for i, page_count, page_text in iter_ocr_pages(pdf_path, lang, dpi, window, engine):
+        print(f"   📄 OCR page {i}/{page_count}...")
+        if page_text.strip():
+            out.write(("" if first_part else "\n") + f"===== PAGE {i} =====\n\n{page_text}\n")
+            out.flush()
+            first_part = False
+            char_count += len(page_text.strip())
+    return char_count
+
+
+def ocr_pdf(pdf_path: Path, lang='fra+eng', dpi: int = 300, window: int = 1) -> str:
     """Effectue l'OCR d'un PDF."""
     try:
-        print(f"   🔍 Conversion PDF en images (DPI=300)...")
-        images = convert_from_path(pdf_path, dpi=300)
-        
+        print(f"   🔍 Conversion PDF en images (DPI={dpi}, {window} page(s) à la fois)...")
         text_parts = []
-        for i, image in enumerate(images, 1):
-            print(f"   📄 OCR page {i}/{len(images)}...")
-            page_text = pytesseract.image_to_string(image, lang=lang)
+        for i, page_count, page_text in iter_ocr_pages(pdf_path, lang, dpi, window):
+            print(f"   📄 OCR page {i}/{page_count}...")
             if page_text.strip():
                 text_parts.append(f"===== PAGE {i} =====\n\n{page_text}\n")
         
@@ -40,30 +78,56 @@ def ocr_pdf(pdf_path: Path, lang='fra+eng') -> str:
         return f"❌ ERREUR OCR: {str(e)}"
 
 
+def peak_rss_mb() -> Optional[float]:
+    """Pic de mémoire résidente du processus en Mo (None si indisponible)."""
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss est en octets sur macOS, en Ko sur Linux
+        return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except (ImportError, AttributeError):
+        return None
+
+
 def main():
     """Point d'entrée principal."""
-    if len(sys.argv) < 2:
-        print("Usage: python extract-pdf-ocr.py <pdf_file> [output_file] [lang]")
-        print("\nExemples:")
-        print('  python extract-pdf-ocr.py "questionnaire.pdf"')
-        print('  python extract-pdf-ocr.py "questionnaire.pdf" "output.txt"')
-        print('  python extract-pdf-ocr.py "questionnaire.pdf" "output.txt" "fra"')
-        sys.exit(1)
+    ap = argparse.ArgumentParser(
+        description="Extraction OCR depuis un PDF (Tesseract), page par page.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""Exemples:
+  python extract-pdf-ocr.py "questionnaire.pdf"
+  python extract-pdf-ocr.py "questionnaire.pdf" "output.txt"
+  python extract-pdf-ocr.py "questionnaire.pdf" "output.txt" "fra"
+  python extract-pdf-ocr.py "questionnaire.pdf" --window 4""",
+    )
+    ap.add_argument("pdf_file", help="Fichier PDF à OCRiser")
+    ap.add_argument("output_file", nargs="?", help="Fichier texte de sortie (défaut: <pdf>.ocr.txt)")
+    ap.add_argument("lang", nargs="?", default="fra+eng", help="Langue(s) Tesseract (défaut: fra+eng)")
+    ap.add_argument("--dpi", type=int, default=300, help="Résolution de rendu (défaut: 300)")
+    ap.add_argument("--window", type=int, default=1, help="Nombre de pages rendues en mémoire à la fois (défaut: 1)")
+    ap.add_argument("--engine", choices=ENGINES, default="auto",
+                    help="Moteur Tesseract: tesserocr/libtesseract chargé une fois, ou pytesseract (un processus par page)")
+    args = ap.parse_args()
     
-    pdf_path = Path(sys.argv[1])
+    pdf_path = Path(args.pdf_file)
     
     if not pdf_path.exists():
         print(f"❌ Le fichier {pdf_path} n'existe pas")
         sys.exit(1)
     
     # Fichier de sortie
-    if len(sys.argv) > 2:
-        output_path = Path(sys.argv[2])
+    if args.output_file:
+        output_path = Path(args.output_file)
     else:
         output_path = pdf_path.with_suffix('.ocr.txt')
     
     # Langue
-    lang = sys.argv[3] if len(sys.argv) > 3 else 'fra+eng'
+    lang = args.lang
     
     print("=" * 60)
     print("📄 EXTRACTION OCR DEPUIS PDF (Tesseract)")
@@ -75,8 +139,9 @@ def main():
     
     # Vérifier Tesseract
     try:
-        version = pytesseract.get_tesseract_version()
-        print(f"✅ Tesseract {version} détecté\n")
+        engine = make_engine(args.engine, lang)
+        version = engine.version()
+        print(f"✅ Tesseract {version} détecté (moteur: {engine.name})\n")
     except:
         print("❌ Tesseract non trouvé. Installation requise:")
         print("   Windows: https://github.com/UB-Mannheim/tesseract/wiki")
@@ -84,27 +149,37 @@ def main():
         sys.exit(1)
     
     print(f"🔄 Traitement de {pdf_path.name}...")
-    text = ocr_pdf(pdf_path, lang)
+    print(f"   🔍 Conversion PDF en images (DPI={args.dpi}, {args.window} page(s) à la fois)...")
     
-    # Sauvegarder
+    # Écrire le texte au fur et à mesure de l'OCR
     try:
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(f"Source: {pdf_path.name}\n")
             f.write(f"Méthode: OCR Tesseract\n")
             f.write(f"Langue: {lang}\n")
             f.write("=" * 80 + "\n\n")
-            f.write(text)
+            f.flush()
+            try:
+                char_count = ocr_pdf_to_file(pdf_path, f, lang, dpi=args.dpi, window=args.window, engine=engine)
+            except Exception as e:
+                f.write(f"❌ ERREUR OCR: {str(e)}")
+                char_count = None
+            finally:
+                engine.close()
         
-        if "❌ ERREUR" in text:
+        if char_count is None:
             print(f"\n❌ Échec de l'OCR")
         else:
-            char_count = len(text.strip())
             print(f"\n✅ OCR terminé: {char_count} caractères extraits")
             print(f"📁 Fichier sauvegardé: {output_path}")
     
     except Exception as e:
         print(f"\n❌ Erreur d'écriture: {e}")
         sys.exit(1)
+    
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"📈 Pic mémoire (RSS): {peak:.1f} Mo")
 
 
 if __name__ == "__main__":
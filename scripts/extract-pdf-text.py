@@ -7,7 +7,15 @@ Pour les PDF scannés, il faudrait utiliser OCRmyPDF ou Tesseract.
 
 import os
 import sys
+import argparse
+from contextlib import nullcontext
 from pathlib import Path
+from typing import List, Optional
+
+import stage_timing
+from corpus_store import CorpusWriter, document_name
+from pdf_document import PdfDocument
+from pdf_text_cache import ExtractionCache, extractor_signature
 
 try:
     import PyPDF2
@@ -17,25 +25,56 @@ except ImportError:
     sys.exit(1)
 
 
+EXTRACTOR_SIGNATURE = extractor_signature("PyPDF2", PyPDF2.__version__)
+
+
+def open_document(pdf_path: Path) -> Optional[PdfDocument]:
+    """Ouvre le PDF une seule fois (voir pdf_document.py), None s'il est illisible (vide...)."""
+    try:
+        return PdfDocument(pdf_path, "pypdf2")
+    except (OSError, ValueError):
+        return None
+
+
+def extract_page_texts(pdf_path: Path, doc: Optional[PdfDocument] = None) -> List[str]:
+    """Extrait le texte brut de chaque page d'un fichier PDF (lève une exception en cas d'erreur).
+
+    Avec doc (le PDF déjà ouvert), le fichier n'est pas relu.
+    """
+    with (nullcontext(doc) if doc is not None else PdfDocument(pdf_path, "pypdf2")) as doc:
+        pages = []
+        for i in range(doc.page_count):
+            with stage_timing.stage("text_extract", file=pdf_path, page=i + 1) as timing:
+                pages.append(doc.page_text(i))
+                timing["bytes"] = len(pages[-1].encode("utf-8"))
+        return pages
+
+
+def format_pages(pages: List[str]) -> str:
+    """Assemble les pages non vides avec les marqueurs ===== PAGE i =====."""
+    text_parts = []
+    for i, page_text in enumerate(pages, 1):
+        if page_text.strip():
+            text_parts.append(f"===== PAGE {i} =====\n\n{page_text}\n")
+    return "\n".join(text_parts)
+
+
 def extract_text_from_pdf(pdf_path: Path) -> str:
     """Extrait le texte d'un fichier PDF."""
     try:
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text_parts = []
-            
-            for i, page in enumerate(reader.pages, 1):
-                page_text = page.extract_text()
-                if page_text.strip():
-                    text_parts.append(f"===== PAGE {i} =====\n\n{page_text}\n")
-            
-            return "\n".join(text_parts)
+        return format_pages(extract_page_texts(pdf_path))
     except Exception as e:
         return f"❌ ERREUR lors de l'extraction: {str(e)}"
 
 
-def process_directory(input_dir: Path, output_dir: Path):
-    """Traite tous les PDF d'un répertoire."""
+def process_directory(input_dir: Path, output_dir: Path, cache: Optional[ExtractionCache] = None,
+                      corpus: Optional[CorpusWriter] = None):
+    """Traite tous les PDF d'un répertoire.
+
+    Avec un cache, les PDF inchangés (même contenu, même extracteur) ne sont pas réanalysés,
+    et leur fichier texte n'est pas réécrit s'il existe déjà.
+    Avec un corpus (voir corpus_store.py), le texte de chaque fichier y est aussi ajouté.
+    """
     input_dir = Path(input_dir)
     output_dir = Path(output_dir)
     
@@ -47,12 +86,19 @@ def process_directory(input_dir: Path, output_dir: Path):
     
     if not pdf_files:
         print(f"⚠️  Aucun fichier PDF trouvé dans {input_dir}")
+        # Les PDF supprimés ne doivent pas laisser d'entrées dans le cache
+        if cache:
+            removed = cache.prune(input_dir)
+            cache.save()
+            if removed:
+                print(f"🧹 Entrées de cache supprimées: {removed}")
         return
     
     print(f"📄 {len(pdf_files)} fichier(s) PDF trouvé(s)\n")
     
     success_count = 0
     error_count = 0
+    skipped_count = 0
     
     for pdf_path in pdf_files:
         # Construire le chemin relatif pour garder la structure
@@ -62,18 +108,47 @@ def process_directory(input_dir: Path, output_dir: Path):
         txt_path = output_dir / relative_path.with_suffix('.txt')
         txt_path.parent.mkdir(parents=True, exist_ok=True)
         
+        # Un seul accès au PDF pour l'empreinte du cache et l'extraction
+        doc = open_document(pdf_path)
+        digest = (lambda: doc.sha256) if doc is not None else None
+        
+        # PDF inchangé depuis la dernière extraction: rien à faire
+        with stage_timing.stage("cache_lookup", file=pdf_path):
+            pages = cache.get(pdf_path, EXTRACTOR_SIGNATURE, digest) if cache else None
+        if pages is not None and txt_path.exists():
+            if doc is not None:
+                doc.close()
+            if corpus is not None and document_name(pdf_path, input_dir) not in corpus:
+                corpus.add_text(document_name(pdf_path, input_dir), txt_path.read_text(encoding='utf-8', errors='ignore'))
+            skipped_count += 1
+            continue
+        
         print(f"🔄 Traitement: {relative_path}")
         
-        # Extraire le texte
-        text = extract_text_from_pdf(pdf_path)
+        # Extraire le texte (ou le reprendre du cache si seul le .txt manque)
+        if pages is not None:
+            text = format_pages(pages)
+        else:
+            try:
+                pages = extract_page_texts(pdf_path, doc)
+                text = format_pages(pages)
+                if cache:
+                    with stage_timing.stage("cache_store", file=pdf_path):
+                        cache.put(pdf_path, EXTRACTOR_SIGNATURE, pages, digest)
+            except Exception as e:
+                text = f"❌ ERREUR lors de l'extraction: {str(e)}"
+        if doc is not None:
+            doc.close()
         
         # Sauvegarder
         try:
-            with open(txt_path, 'w', encoding='utf-8') as f:
-                f.write(f"Source: {pdf_path.name}\n")
-                f.write(f"Chemin: {relative_path}\n")
-                f.write("=" * 80 + "\n\n")
-                f.write(text)
+            content = f"Source: {pdf_path.name}\nChemin: {relative_path}\n" + "=" * 80 + "\n\n" + text
+            with stage_timing.stage("write", file=pdf_path) as timing, open(txt_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+                timing["bytes"] = f.tell()
+            if corpus is not None:
+                with stage_timing.stage("corpus_write", file=pdf_path):
+                    corpus.add_text(document_name(pdf_path, input_dir), content)
             
             # Vérifier si du texte a été extrait
             if "❌ ERREUR" in text:
@@ -90,34 +165,58 @@ def process_directory(input_dir: Path, output_dir: Path):
             print(f"   ❌ Erreur d'écriture: {e}")
             error_count += 1
     
+    if cache:
+        removed = cache.prune(input_dir)
+        cache.save()
+    
     print(f"\n{'=' * 60}")
     print(f"✅ Réussis: {success_count}")
     print(f"❌ Erreurs: {error_count}")
+    if cache:
+        print(f"⏭️  Inchangés (cache): {skipped_count}")
+        if removed:
+            print(f"🧹 Entrées de cache supprimées: {removed}")
     print(f"📁 Fichiers texte dans: {output_dir}")
 
 
 def main():
     """Point d'entrée principal."""
-    if len(sys.argv) < 2:
-        print("Usage: python extract-pdf-text.py <input_dir> [output_dir]")
-        print("\nExemples:")
-        print('  python extract-pdf-text.py "data/questionnaires/raw"')
-        print('  python extract-pdf-text.py "data/questionnaires/raw" "data/questionnaires/extracted"')
-        print('  python extract-pdf-text.py "data/questionnaires/raw/Mode de vie"')
-        sys.exit(1)
+    ap = argparse.ArgumentParser(
+        description="Extraction de texte depuis les PDF d'un répertoire (PyPDF2).",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""Exemples:
+  python extract-pdf-text.py "data/questionnaires/raw"
+  python extract-pdf-text.py "data/questionnaires/raw" "data/questionnaires/extracted"
+  python extract-pdf-text.py "data/questionnaires/raw/Mode de vie"
+  python extract-pdf-text.py "data/questionnaires/raw" --force
+  python extract-pdf-text.py "data/questionnaires/raw" --corpus data/questionnaires/corpus""",
+    )
+    ap.add_argument("input_dir", help="Répertoire contenant les PDF (parcouru récursivement)")
+    ap.add_argument("output_dir", nargs="?", help="Répertoire de sortie (défaut: <parent>/extracted/<nom>)")
+    ap.add_argument("--cache-dir", help="Répertoire du cache d'extraction (défaut: <output_dir>/.extract-cache)")
+    ap.add_argument("--no-cache", action="store_true", help="Désactive le cache d'extraction")
+    ap.add_argument("--force", action="store_true", help="Réextrait tous les PDF, même inchangés")
+    ap.add_argument("--corpus", help="Ajoute aussi les textes à ce corpus indexé (voir corpus_store.py)")
+    stage_timing.add_arguments(ap)
+    args = ap.parse_args()
     
-    input_dir = Path(sys.argv[1])
+    input_dir = Path(args.input_dir)
     
     if not input_dir.exists():
         print(f"❌ Le répertoire {input_dir} n'existe pas")
         sys.exit(1)
     
     # Dossier de sortie par défaut
-    if len(sys.argv) > 2:
-        output_dir = Path(sys.argv[2])
+    if args.output_dir:
+        output_dir = Path(args.output_dir)
     else:
         output_dir = input_dir.parent / "extracted" / input_dir.name
     
+    cache = None
+    if not args.no_cache:
+        cache_dir = Path(args.cache_dir) if args.cache_dir else output_dir / ".extract-cache"
+        cache = ExtractionCache(cache_dir, force=args.force)
+    
     print("=" * 60)
     print("📄 EXTRACTION DE TEXTE DEPUIS PDF")
     print("=" * 60)
@@ -125,7 +224,12 @@ def main():
     print(f"📁 Destination: {output_dir}")
     print("=" * 60 + "\n")
     
-    process_directory(input_dir, output_dir)
+    corpus = CorpusWriter(Path(args.corpus)) if args.corpus else None
+    with stage_timing.instrumented(args):
+        process_directory(input_dir, output_dir, cache, corpus)
+    if corpus is not None:
+        corpus.close()
+        print(f"📦 Corpus {args.corpus}: {corpus.added} document(s) ajouté(s), {corpus.unchanged} inchangé(s)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Unified PDF text extraction: native text layer first, OCR only where needed.
+
+Each page's embedded text layer is read with PyMuPDF. Pages whose text is empty, too short
+or mostly garbage (unmapped glyphs, replacement characters) are rasterized and OCR'd with
+Tesseract, reusing the rendering/preprocessing of ocr_pdf_pymupdf.py. The method used for
+each page is recorded in a .meta.json next to the .txt output.
+
+Usage:
+  python scripts/extract_pdf_hybrid.py --input "data/questionnaires/raw" --output "data/questionnaires/extracted"
+  python scripts/extract_pdf_hybrid.py --input "data/questionnaires/raw/Cancerologie/questionnaire-cancero-qlq-c30-def-pro.pdf" --output "data/questionnaires/extracted/Cancerologie"
+
+Requires: pymupdf, pillow, and tesserocr, libtesseract or pytesseract (the OCR dependencies are only exercised for pages without usable text)
+"""
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from contextlib import nullcontext
+from pathlib import Path
+
+import stage_timing
+from ocr_engines import ENGINES, LazyOcr
+from ocr_pdf_pymupdf import preprocess, render_page
+from pdf_document import PdfDocument
+
+GARBAGE_MARKERS = ("(cid:", "�")
+
+
+def text_quality(text: str) -> float:
+    """Share of non-space characters that look like real text (0.0 for empty text)."""
+    chars = [c for c in text if not c.isspace()]
+    if not chars:
+        return 0.0
+    good = sum(1 for c in chars if c.isalnum() or c in ".,;:!?'’\"()[]/%-–—+=°€«»•□○☐*")
+    bad = sum(text.count(m) for m in GARBAGE_MARKERS)
+    return max(0.0, (good - bad * 5) / len(chars))
+
+
+def needs_ocr(text: str, min_chars: int, min_quality: float) -> bool:
+    stripped = text.strip()
+    return len(stripped) < min_chars or text_quality(stripped) < min_quality
+
+
+def format_text(texts: list[str]) -> str:
+    """Join page texts with the ===== PAGE i ===== markers the parsers expect."""
+    return "".join(f"===== PAGE {i} =====\n\n{t}\n" for i, t in enumerate(texts, start=1))
+
+
+def recognize_page(engine, img, pdf_path: Path, page: int) -> str:
+    with stage_timing.stage("tesseract", file=pdf_path, page=page, pixels=img.width * img.height) as timing:
+        text = engine.image_to_string(img)
+        timing["bytes"] = len(text.encode("utf-8"))
+    return text
+
+
+def extract_pdf(pdf_path: Path, ocr, workers: int, dpi: int = 300, min_chars: int = 50, min_quality: float = 0.8,
+                force_ocr: bool = False, doc: PdfDocument | None = None) -> tuple[list[str], list[dict]]:
+    """Return (page_texts, page_records) for one PDF, OCR'ing the pages without usable text.
+
+    ocr() returns the (thread pool, engine) pair to OCR with (see ocr_engines.make_engine). It is
+    only called when a page needs OCR, so PDFs with a usable text layer never load an engine.
+    At most 2 * workers rendered pages are in flight at once, so memory does not grow with page count.
+    The text layer and the rasterized pages come from the same PyMuPDF document: doc if given
+    (see pdf_document.py), else the PDF is opened here.
+    """
+    texts: list[str] = []
+    records: list[dict] = []
+    in_flight: deque = deque()
+
+    def collect_one():
+        page_index, future = in_flight.popleft()
+        texts[page_index] = future.result()
+        records[page_index]["chars"] = len(texts[page_index].strip())
+
+    with (nullcontext(doc) if doc is not None else PdfDocument(pdf_path, "pymupdf")) as doc:
+        for i in range(1, doc.page_count + 1):
+            with stage_timing.stage("text_extract", file=pdf_path, page=i) as timing:
+                native = doc.page_text(i - 1)
+                timing["bytes"] = len(native.encode("utf-8"))
+            quality = text_quality(native.strip())
+            record = {"page": i, "method": "text", "chars": len(native.strip()), "quality": round(quality, 3)}
+            texts.append(native)
+            records.append(record)
+            if force_ocr or needs_ocr(native, min_chars, min_quality):
+                record["method"] = "ocr"
+                pool, engine = ocr()
+                with stage_timing.stage("rasterize", file=pdf_path, page=i):
+                    img = render_page(doc.fitz_page(i - 1), dpi)
+                with stage_timing.stage("preprocess", file=pdf_path, page=i):
+                    img = preprocess(img)
+                in_flight.append((i - 1, pool.submit(recognize_page, engine, img, pdf_path, i)))
+                if len(in_flight) >= 2 * workers:
+                    collect_one()
+    while in_flight:
+        collect_one()
+    return texts, records
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Extract PDF text from the native text layer, OCR'ing only pages without usable text.")
+    ap.add_argument("--input", default="data/questionnaires/raw", help="PDF file or directory of PDFs (searched recursively)")
+    ap.add_argument("--output", default="data/questionnaires/extracted", help="Output directory (.txt + .meta.json per PDF)")
+    ap.add_argument("--min-chars", type=int, default=50, help="Pages with fewer native characters are OCR'd")
+    ap.add_argument("--min-quality", type=float, default=0.8, help="Pages whose native text quality is below this ratio are OCR'd")
+    ap.add_argument("--force-ocr", action="store_true", help="OCR every page regardless of its text layer")
+    ap.add_argument("--dpi", type=int, default=300)
+    ap.add_argument("--lang", default="fra")
+    ap.add_argument("--psm", type=int, default=6, help="Tesseract page segmentation mode")
+    ap.add_argument("--oem", type=int, default=1, help="Tesseract OCR engine mode")
+    ap.add_argument("--workers", type=int, default=None, help="Concurrent Tesseract workers (default: CPU count)")
+    ap.add_argument("--engine", choices=ENGINES, default="auto", help="Tesseract backend (see ocr_engines.py)")
+    args = ap.parse_args()
+
+    inp = Path(args.input)
+    outdir = Path(args.output)
+    if not inp.exists():
+        print(f"❌ Input not found: {inp}", file=sys.stderr)
+        return 1
+    root = inp if inp.is_dir() else inp.parent
+    pdf_files = sorted(inp.rglob("*.pdf")) if inp.is_dir() else [inp]
+
+    workers = args.workers or os.cpu_count() or 1
+    # Thread pool and Tesseract engine, created when the first page needs OCR
+    ocr = LazyOcr(args.engine, args.lang, args.psm, args.oem, workers)
+
+    total_pages = 0
+    ocr_pages = 0
+    failures = 0
+    try:
+        for pdf_path in pdf_files:
+            rel = pdf_path.relative_to(root)
+            try:
+                texts, records = extract_pdf(pdf_path, ocr, workers, dpi=args.dpi, min_chars=args.min_chars,
+                                             min_quality=args.min_quality, force_ocr=args.force_ocr)
+            except Exception as e:
+                print(f"❌ {rel}: {e}", file=sys.stderr)
+                failures += 1
+                continue
+
+            txt_path = outdir / rel.with_suffix(".txt")
+            txt_path.parent.mkdir(parents=True, exist_ok=True)
+            txt_path.write_text(format_text(texts), encoding="utf-8")
+            meta = {"file": rel.as_posix(), "pages": len(records), "page_methods": records}
+            txt_path.with_suffix(".meta.json").write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+
+            n_ocr = sum(1 for r in records if r["method"] == "ocr")
+            total_pages += len(records)
+            ocr_pages += n_ocr
+            print(f"✅ {rel}: {len(records)} page(s), {len(records) - n_ocr} native, {n_ocr} OCR")
+    finally:
+        ocr.close()
+
+    print("\n" + "=" * 60)
+    print(f"📄 PDFs: {len(pdf_files) - failures}/{len(pdf_files)}")
+    print(f"📝 Pages: {total_pages} ({total_pages - ocr_pages} native text, {ocr_pages} OCR)")
+    print(f"📁 Output: {outdir}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,114 +7,178 @@ import os
 import sys
 import json
 import re
+import argparse
+from contextlib import nullcontext
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
-try:
-    import pdfplumber
-    PDF_LIBRARY = 'pdfplumber'
-except ImportError:
+import stage_timing
+from pdf_document import PdfDocument
+from pdf_text_cache import ExtractionCache, extractor_signature
+
+DEFAULT_OCR_DIR = 'c:/Dev/data/questionnaires/ocr'
+DEFAULT_OUTPUT_DIR = 'c:/Dev/packages/shared-questionnaires/extracted'
+
+# PDF backends in order of preference: (name, module, distribution)
+PDF_BACKENDS = (('pdfplumber', 'pdfplumber', 'pdfplumber'), ('pymupdf', 'fitz', 'PyMuPDF'))
+_pdf_backend = None
+
+def pdf_backend_info() -> Optional[Tuple[str, str, str]]:
+    """The PDF backend that would be used, found without importing it (None if none is installed)."""
+    for backend in PDF_BACKENDS:
+        if find_spec(backend[1]) is not None:
+            return backend
+    return None
+
+def pdf_backend():
+    """Import the PDF backend on first use; returns (name, module)."""
+    global _pdf_backend
+    if _pdf_backend is None:
+        info = pdf_backend_info()
+        if info is None:
+            raise ImportError("No PDF library found. Please install: pip install pdfplumber")
+        _pdf_backend = (info[0], __import__(info[1]))
+    return _pdf_backend
+
+def backend_signature() -> str:
+    """Extraction cache signature of the PDF backend, computed from package metadata only."""
+    from importlib import metadata
+
+    name, _, distribution = pdf_backend_info()
     try:
-        import PyMuPDF as fitz
-        PDF_LIBRARY = 'pymupdf'
-    except ImportError:
-        print("❌ No PDF library found. Please install: pip install pdfplumber", file=sys.stderr)
-        sys.exit(1)
+        version = metadata.version(distribution)
+    except metadata.PackageNotFoundError:
+        version = 'unknown'
+    return extractor_signature(name, version)
+
+def open_pdf(pdf_path) -> PdfDocument:
+    """Open a PDF with the PDF backend (see pdf_document.py); the handle is shared by every stage of the run."""
+    library, _ = pdf_backend()
+    return PdfDocument(pdf_path, library)
 
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """Extract all text from a PDF file."""
+def extract_page_texts(pdf_path: str, page_range: Optional[Tuple[int, int]] = None,
+                       doc: Optional[PdfDocument] = None) -> List[str]:
+    """Extract the text of each page of a PDF file, or only pages [start, stop) if page_range is given.
+
+    Joining the returned list gives the document text. Raises on unreadable PDFs.
+    With doc (an open handle on pdf_path), the PDF is not opened again.
+    """
+    with (nullcontext(doc) if doc is not None else open_pdf(pdf_path)) as doc:
+        count = doc.page_count
+        start, stop = page_range if page_range is not None else (0, count)
+        page_texts = []
+        for index in range(start, min(stop, count)):
+            with stage_timing.stage('text_extract', file=pdf_path, page=index + 1) as timing:
+                page_text = doc.page_text(index)
+                if doc.backend == 'pdfplumber':
+                    page_text = page_text + "\n" if page_text else ""
+                page_texts.append(page_text)
+                timing['bytes'] = len(page_texts[-1].encode('utf-8'))
+        return page_texts
+
+def extract_text_from_pdf(pdf_path: str, page_range: Optional[Tuple[int, int]] = None) -> str:
+    """Extract all text from a PDF file, or only pages [start, stop) if page_range is given."""
     try:
-        if PDF_LIBRARY == 'pdfplumber':
-            with pdfplumber.open(pdf_path) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                return text
-        else:  # pymupdf
-            doc = fitz.open(pdf_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text
+        return "".join(extract_page_texts(pdf_path, page_range))
     except Exception as e:
         print(f"Error extracting text from {pdf_path}: {e}", file=sys.stderr)
         return ""
 
+def count_pdf_pages(pdf_path: str, doc: Optional[PdfDocument] = None) -> int:
+    """Return the number of pages of a PDF file (0 if it cannot be opened)."""
+    try:
+        if doc is not None:
+            return doc.page_count
+        with open_pdf(pdf_path) as doc:
+            return doc.page_count
+    except Exception as e:
+        print(f"Error reading page count of {pdf_path}: {e}", file=sys.stderr)
+        return 0
+
+# French question patterns, combined into one alternation so each line is scanned once
+FRENCH_QUESTION_RE = re.compile(
+    r'^\d+[\.\)]\s*[^\n]+\?'  # 1. Question?
+    r'|^\d+[\.\)]\s*\*\*[^\n]+\*\*'  # 1. **Question**
+    r'|^[A-ZÀÉÈÊË][^\.!?\n]{10,100}\?'  # Capitalized sentence ending with ?
+    r'|(?:Comment|Combien|Pourquoi|Quand|Où|Quel|Quelle|Quels|Quelles|Est-ce que|Avez-vous|Êtes-vous)[^\.!?\n]+\?',  # French question starters
+    re.MULTILINE | re.IGNORECASE
+)
+
+# Line classifier used by process_pdf/extract_options: the first alternative that matches wins
+LINE_KIND_RE = re.compile(
+    r'^(?:'
+    r'(?P<num>\d+)[\.\)]\s*(?P<qtext>.+)?'  # 1. Question (no text: numbered line only)
+    r'|[-•]\s*(?P<plabel>.+?)\s*\((?P<points>\d+)\s*(?i:pts?)\)'  # - Option text (X pts)
+    r'|[□○☐]\s*(?P<blabel>.+)'  # □ Option text / ○ Option text
+    r'|(?P<bullet>[-•])'  # - Option text / • Option text
+    r')'
+)
+
+QUESTION, NUMBERED, OPTION_POINTS, OPTION_BOX, OPTION_BULLET, TEXT = (
+    'question', 'numbered', 'option_points', 'option_box', 'option_bullet', 'text'
+)
+
+def classify_line(line: str) -> Tuple[str, Optional[re.Match]]:
+    """Classify a stripped line with a single regex match, returning (kind, match)."""
+    match = LINE_KIND_RE.match(line)
+    if match is None:
+        return TEXT, None
+    if match.group('num') is not None:
+        return (QUESTION if match.group('qtext') is not None else NUMBERED), match
+    if match.group('points') is not None:
+        return OPTION_POINTS, match
+    if match.group('blabel') is not None:
+        return OPTION_BOX, match
+    return OPTION_BULLET, match
+
 def detect_questions_french(text: str) -> List[str]:
     """Detect French questions in text."""
-    # Patterns for French questions
-    patterns = [
-        r'^\d+[\.\)]\s*([^\n]+\?)',  # 1. Question?
-        r'^\d+[\.\)]\s*\*\*([^\n]+)\*\*',  # 1. **Question**
-        r'^[A-ZÀÉÈÊË][^\.!?\n]{10,100}\?',  # Capitalized sentence ending with ?
-        r'(?:Comment|Combien|Pourquoi|Quand|Où|Quel|Quelle|Quels|Quelles|Est-ce que|Avez-vous|Êtes-vous)[^\.!?\n]+\?',  # French question starters
-    ]
-    
     questions = []
     lines = text.split('\n')
     
     for line in lines:
         line = line.strip()
-        if not line:
-            continue
-            
-        for pattern in patterns:
-            matches = re.findall(pattern, line, re.MULTILINE | re.IGNORECASE)
-            if matches:
-                questions.append(line)
-                break
+        if line and FRENCH_QUESTION_RE.search(line):
+            questions.append(line)
     
     return questions
 
+_SKIP = object()
+
+def option_from_line(line: str, kind: str, match: Optional[re.Match]):
+    """Interpret a stripped line that follows a question.
+
+    Returns the option dict for option lines, _SKIP for text lines that do not end the
+    options block, or None when the block ends (next question, blank or digit-led line).
+    """
+    # Stop if we hit another question
+    if kind in (QUESTION, NUMBERED) or line.endswith('?'):
+        return None
+    # Pattern 1: "- Option text (X pts)"
+    if kind == OPTION_POINTS:
+        return {'label': match.group('plabel').strip(), 'points': int(match.group('points'))}
+    # Pattern 2: "□ Option text" or "○ Option text"
+    if kind == OPTION_BOX:
+        return {'label': match.group('blabel').strip()}
+    # Pattern 3: Simple list items
+    if kind == OPTION_BULLET:
+        return {'label': line[1:].strip()}
+    # Stop if line doesn't look like an option
+    if not line or line[0].isdigit():
+        return None
+    return _SKIP
+
 def extract_options(text: str, question_line_index: int, lines: List[str]) -> List[Dict[str, any]]:
     """Extract options following a question."""
     options = []
-    i = question_line_index + 1
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Stop if we hit another question
-        if re.match(r'^\d+[\.\)]', line) or line.endswith('?'):
-            break
-        
-        # Check for option patterns
-        # Pattern 1: "- Option text (X pts)"
-        match = re.match(r'^[-•]\s*(.+?)\s*\((\d+)\s*pts?\)', line, re.IGNORECASE)
-        if match:
-            options.append({
-                'label': match.group(1).strip(),
-                'points': int(match.group(2))
-            })
-            i += 1
-            continue
-        
-        # Pattern 2: "□ Option text" or "○ Option text"
-        match = re.match(r'^[□○☐]\s*(.+)', line)
-        if match:
-            options.append({
-                'label': match.group(1).strip()
-            })
-            i += 1
-            continue
-        
-        # Pattern 3: Simple list items
-        if line.startswith('-') or line.startswith('•'):
-            options.append({
-                'label': line[1:].strip()
-            })
-            i += 1
-            continue
-        
-        # Stop if line doesn't look like an option
-        if line and not line[0].isdigit():
-            i += 1
-        else:
+    for line in lines[question_line_index + 1:]:
+        line = line.strip()
+        option = option_from_line(line, *classify_line(line))
+        if option is None:
             break
-    
+        if option is not _SKIP:
+            options.append(option)
     return options
 
 def categorize_pdf(filename: str) -> str:
@@ -144,17 +208,58 @@ def categorize_pdf(filename: str) -> str:
     
     return 'other'
 
-def process_pdf(pdf_path: Path, category: str) -> Optional[Dict]:
-    """Process a single PDF and extract structured data."""
+def parse_questions(text: str, lines: List[str]) -> List[Dict]:
+    """Detect numbered questions and their options in one sweep over the extracted lines.
+
+    Each line is classified once; option lines are attached to the question they follow
+    until the options block ends, so the cost is linear in the number of lines.
+    """
+    parsed = []
+    options = None  # options of the question being read, None outside an options block
+    
+    for line in lines:
+        line = line.strip()
+        kind, match = classify_line(line)
+        
+        # Pattern: numbered question
+        if kind == QUESTION:
+            options = []
+            parsed.append((match.group('num'), match.group('qtext').strip(), options))
+            continue
+        
+        if options is None:
+            continue
+        option = option_from_line(line, kind, match)
+        if option is None:
+            options = None
+        elif option is not _SKIP:
+            options.append(option)
+    
+    return [
+        {
+            'id': f'q{question_num}',
+            'label': question_text,
+            'type': 'select' if options else 'textarea',
+            'options': [opt['label'] for opt in options] if options else None,
+            'points': [opt.get('points') for opt in options] if options and any('points' in opt for opt in options) else None
+        }
+        for question_num, question_text, options in parsed
+    ]
+
+def process_pdf(pdf_path: Path, category: str, text: Optional[str] = None) -> Optional[Dict]:
+    """Process a single PDF and extract structured data.
+
+    If `text` is given (already extracted, e.g. by a worker process), the PDF is not reopened.
+    """
     print(f"Processing: {pdf_path.name}")
     
-    text = extract_text_from_pdf(str(pdf_path))
+    if text is None:
+        text = extract_text_from_pdf(str(pdf_path))
     if not text or len(text) < 100:
         print(f"  ⚠️  No text extracted or text too short", file=sys.stderr)
         return None
     
     lines = text.split('\n')
-    questions = []
     
     # Try to detect title
     title = pdf_path.stem.replace('-', ' ').replace('_', ' ').title()
@@ -164,26 +269,8 @@ def process_pdf(pdf_path: Path, category: str) -> Optional[Dict]:
             title = line
             break
     
-    # Detect questions
-    for i, line in enumerate(lines):
-        line = line.strip()
-        
-        # Pattern: numbered question
-        match = re.match(r'^(\d+)[\.\)]\s*(.+)', line)
-        if match:
-            question_num = match.group(1)
-            question_text = match.group(2).strip()
-            
-            # Extract options
-            options = extract_options(text, i, lines)
-            
-            questions.append({
-                'id': f'q{question_num}',
-                'label': question_text,
-                'type': 'select' if options else 'textarea',
-                'options': [opt['label'] for opt in options] if options else None,
-                'points': [opt.get('points') for opt in options] if options and any('points' in opt for opt in options) else None
-            })
+    with stage_timing.stage('parse', file=pdf_path, bytes=len(text.encode('utf-8'))):
+        questions = parse_questions(text, lines)
     
     if not questions:
         print(f"  ⚠️  No questions detected", file=sys.stderr)
@@ -201,73 +288,332 @@ def process_pdf(pdf_path: Path, category: str) -> Optional[Dict]:
         'source': 'ocr'
     }
 
-def main():
+def _extract_job(job: Tuple[str, Optional[Tuple[int, int]], bool]) -> Tuple[Optional[List[str]], List[Dict]]:
+    """Worker entry point: extract the page texts of one PDF (or one page range of it), None on error.
+
+    Returns (pages, stage timing events); events are only collected when the job asks for
+    them, i.e. when it runs in a worker process of a traced run.
+    """
+    pdf_path, page_range, trace = job
+    if trace:
+        stage_timing.enable()
+    try:
+        pages = extract_page_texts(pdf_path, page_range)
+    except Exception as e:
+        print(f"Error extracting text from {pdf_path}: {e}", file=sys.stderr)
+        pages = None
+    return pages, stage_timing.collect() if trace else []
+
+def extract_document(pdf_file: Path, cache: Optional[ExtractionCache], signature: Optional[str]) -> str:
+    """Text of one PDF, from the cache or extracted in this process ("" on error).
+
+    One handle serves the cache lookup (hashing its mapping when the file changed) and the extraction.
+    """
+    try:
+        doc = open_pdf(pdf_file)
+    except Exception as e:
+        print(f"Error extracting text from {pdf_file}: {e}", file=sys.stderr)
+        return ""
+    with doc:
+        if cache is not None:
+            with stage_timing.stage('cache_lookup', file=pdf_file):
+                pages = cache.get(pdf_file, signature, lambda: doc.sha256)
+            if pages is not None:
+                return "".join(pages)
+        try:
+            pages = extract_page_texts(str(pdf_file), doc=doc)
+        except Exception as e:
+            print(f"Error extracting text from {pdf_file}: {e}", file=sys.stderr)
+            return ""
+        if cache is not None:
+            with stage_timing.stage('cache_store', file=pdf_file):
+                cache.put(pdf_file, signature, pages, lambda: doc.sha256)
+        return "".join(pages)
+
+def iter_extracted_texts(pdf_files: List[Path], workers: int, pages_per_job: int = 0,
+                         cache: Optional[ExtractionCache] = None) -> Iterator[Tuple[Path, str]]:
+    """Yield (pdf_path, text) pairs in the order of `pdf_files`.
+
+    PDFs found in the extraction cache are not reopened. The others are extracted inline
+    when workers <= 1, or fanned out over a process pool otherwise: one job per PDF, or one
+    job per chunk of `pages_per_job` pages for PDFs larger than that. Chunks are joined back
+    in page order, so the text is identical to a sequential extraction.
+    Inline, each PDF is opened once for its cache lookup and extraction; with a pool, the
+    parent opens it once for the lookup and page count, and each job in its worker.
+    """
+    signature = backend_signature() if cache is not None else None
+    if workers <= 1:
+        for pdf_file in pdf_files:
+            yield pdf_file, extract_document(pdf_file, cache, signature)
+        return
+
+    # Worker processes send their stage timings back with their results
+    trace = stage_timing.is_enabled()
+    cached = {}
+    digests: Dict[int, str] = {}  # SHA-256 computed during the lookup, reused when storing
+    jobs = []
+    owners = []
+    for index, pdf_file in enumerate(pdf_files):
+        doc = None
+        if cache is not None or pages_per_job > 0:
+            try:
+                doc = open_pdf(pdf_file)
+            except Exception:
+                pass  # the worker reports the error
+        with nullcontext() if doc is None else doc:
+            if cache is not None:
+                def digest(doc=doc, index=index) -> str:
+                    digests[index] = doc.sha256
+                    return digests[index]
+                with stage_timing.stage('cache_lookup', file=pdf_file):
+                    pages = cache.get(pdf_file, signature, digest if doc is not None else None)
+                if pages is not None:
+                    cached[index] = pages
+                    continue
+            page_count = count_pdf_pages(str(pdf_file), doc) if pages_per_job > 0 and doc is not None else 0
+        if page_count > pages_per_job > 0:
+            for start in range(0, page_count, pages_per_job):
+                jobs.append((str(pdf_file), (start, min(start + pages_per_job, page_count)), trace))
+                owners.append(index)
+        else:
+            jobs.append((str(pdf_file), None, trace))
+            owners.append(index)
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() yields results in submission order, whatever order the workers finish in
+        results = zip(owners, pool.map(_extract_job, jobs))
+        pending = next(results, None)
+        for index, pdf_file in enumerate(pdf_files):
+            if index in cached:
+                yield pdf_file, "".join(cached[index])
+                continue
+            pages: List[str] = []
+            failed = False
+            while pending is not None and pending[0] == index:
+                job_pages, events = pending[1]
+                stage_timing.merge(events)
+                if job_pages is None:
+                    failed = True
+                else:
+                    pages.extend(job_pages)
+                pending = next(results, None)
+            if failed:
+                yield pdf_file, ""
+                continue
+            if cache is not None:
+                with stage_timing.stage('cache_store', file=pdf_file):
+                    cache.put(pdf_file, signature, pages, (lambda: digests[index]) if index in digests else None)
+            yield pdf_file, "".join(pages)
+
+def summarize(result: Dict) -> Dict:
+    """Index entry of a questionnaire."""
+    return {
+        'id': result['id'],
+        'title': result['title'],
+        'category': result['category'],
+        'question_count': len(result['questions'])
+    }
+
+def build_index(summaries: List[Dict], categories_stats: Dict) -> Dict:
+    """Master index content from questionnaire summaries (in index order)."""
+    return {
+        'total_questionnaires': len(summaries),
+        'categories': categories_stats,
+        'questionnaires': summaries
+    }
+
+def read_jsonl_records(jsonl_file: Path) -> Tuple[List[Dict], int]:
+    """Read the complete records of a streaming JSONL file.
+
+    Returns (records, committed_size): reading stops at the first incomplete or corrupt line
+    (e.g. a record cut by a crash), and committed_size is the byte offset where it starts.
+    """
+    records = []
+    committed_size = 0
+    with open(jsonl_file, 'rb') as f:
+        for raw in f:
+            if not raw.endswith(b'\n'):
+                break
+            try:
+                records.append(json.loads(raw))
+            except ValueError:
+                break
+            committed_size += len(raw)
+    return records, committed_size
+
+def collect_pdfs(ocr_dir: Path) -> Tuple[List[Path], Dict[Path, str], Dict[str, Dict]]:
+    """List the PDFs of each category directory in a deterministic order.
+
+    Returns (pdf_files, pdf_categories, categories_stats) with 'processed' counts at 0.
+    """
+    pdf_files = []
+    pdf_categories = {}
+    categories_stats = {}
+    for category_dir in sorted(ocr_dir.iterdir()):
+        if not category_dir.is_dir():
+            continue
+        
+        category = category_dir.name.lower()
+        category_pdfs = sorted(category_dir.glob('*.pdf'))
+        categories_stats[category] = {'total': len(category_pdfs), 'processed': 0}
+        for pdf_file in category_pdfs:
+            pdf_files.append(pdf_file)
+            pdf_categories[pdf_file] = category
+    return pdf_files, pdf_categories, categories_stats
+
+def write_index(index_file: Path, pdf_files: List[Path], pdf_categories: Dict[Path, str],
+                categories_stats: Dict, summaries: Dict[Tuple[str, str], Dict]) -> int:
+    """Write index.json with the summaries ordered like pdf_files; returns the questionnaire count."""
+    ordered = []
+    for pdf_file in pdf_files:
+        summary = summaries.get((pdf_categories[pdf_file], pdf_file.name))
+        if summary is not None:
+            ordered.append(summary)
+    for category, stats in categories_stats.items():
+        stats['processed'] = sum(1 for s in ordered if s['category'] == category)
+    with open(index_file, 'w', encoding='utf-8') as f:
+        json.dump(build_index(ordered, categories_stats), f, ensure_ascii=False, indent=2)
+    return len(ordered)
+
+def rebuild_index(ocr_dir: Path, output_dir: Path, jsonl_file: Path) -> int:
+    """Rebuild index.json from the streaming JSONL file in one pass."""
+    pdf_files, pdf_categories, categories_stats = collect_pdfs(ocr_dir)
+    records, _ = read_jsonl_records(jsonl_file)
+    summaries = {(r['category'], r['filename']): summarize(r) for r in records}
+    count = write_index(output_dir / 'index.json', pdf_files, pdf_categories, categories_stats, summaries)
+    print(f"✅ index.json rebuilt from {jsonl_file}: {count} questionnaires")
+    return 0
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Extract questionnaires from the OCR PDF library.")
+    ap.add_argument("--ocr-dir", default=DEFAULT_OCR_DIR, help="Root of the OCR library (one sub-directory per category)")
+    ap.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="Output directory for questionnaire JSON files")
+    ap.add_argument("--workers", type=int, default=1, help="Number of worker processes for PDF text extraction (default: 1, sequential)")
+    ap.add_argument("--pages-per-job", type=int, default=0, help="Split PDFs with more pages than this into per-page-range jobs (0: one job per PDF)")
+    ap.add_argument("--cache-dir", help="Extraction cache directory (default: <output-dir>/.extract-cache)")
+    ap.add_argument("--no-cache", action="store_true", help="Disable the extraction cache")
+    ap.add_argument("--force", action="store_true", help="Re-extract every PDF, even unchanged ones")
+    ap.add_argument("--jsonl", help="Streaming mode: append one JSON record per questionnaire to this file as soon as it is parsed")
+    ap.add_argument("--resume", action="store_true", help="Skip questionnaires already committed to the JSONL file (default file: <output-dir>/questionnaires.jsonl)")
+    ap.add_argument("--rebuild-index", action="store_true", help="Only rebuild index.json from the JSONL file, then exit")
+    stage_timing.add_arguments(ap)
+    return ap.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
     """Main extraction process."""
-    ocr_dir = Path('c:/Dev/data/questionnaires/ocr')
-    output_dir = Path('c:/Dev/packages/shared-questionnaires/extracted')
+    args = parse_args(argv)
+    with stage_timing.instrumented(args):
+        return run(args)
+
+def run(args: argparse.Namespace):
+    ocr_dir = Path(args.ocr_dir)
+    output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
     
     if not ocr_dir.exists():
         print(f"❌ OCR directory not found: {ocr_dir}", file=sys.stderr)
         return 1
     
+    jsonl_file = Path(args.jsonl) if args.jsonl else None
+    if jsonl_file is None and (args.resume or args.rebuild_index):
+        jsonl_file = output_dir / 'questionnaires.jsonl'
+    
+    if args.rebuild_index:
+        return rebuild_index(ocr_dir, output_dir, jsonl_file)
+    
+    if pdf_backend_info() is None:
+        print("❌ No PDF library found. Please install: pip install pdfplumber", file=sys.stderr)
+        return 1
+    
     print("🚀 Starting PDF extraction from OCR library...\n")
     
-    results = []
-    categories_stats = {}
+    pdf_files, pdf_categories, categories_stats = collect_pdfs(ocr_dir)
+    # Index entries by (category, filename); only these small summaries are kept in memory
+    summaries: Dict[Tuple[str, str], Dict] = {}
     
-    # Process all PDFs in OCR directory
-    for category_dir in sorted(ocr_dir.iterdir()):
-        if not category_dir.is_dir():
-            continue
-        
-        category = category_dir.name.lower()
-        print(f"\n📁 Category: {category}")
-        
-        pdf_files = list(category_dir.glob('*.pdf'))
-        categories_stats[category] = {'total': len(pdf_files), 'processed': 0}
-        
-        for pdf_file in sorted(pdf_files):
-            result = process_pdf(pdf_file, category)
+    # Resume: keep the records committed by a previous run, drop a trailing partial one
+    jsonl_out = None
+    if jsonl_file is not None:
+        resumed = 0
+        if args.resume and jsonl_file.exists():
+            records, committed_size = read_jsonl_records(jsonl_file)
+            with open(jsonl_file, 'r+b') as f:
+                f.truncate(committed_size)
+            for record in records:
+                summaries[(record['category'], record['filename'])] = summarize(record)
+            resumed = len(records)
+            pdf_files_todo = [p for p in pdf_files if (pdf_categories[p], p.name) not in summaries]
+            print(f"⏩ Resuming: {resumed} questionnaires already in {jsonl_file}")
+        else:
+            pdf_files_todo = pdf_files
+        jsonl_file.parent.mkdir(parents=True, exist_ok=True)
+        jsonl_out = open(jsonl_file, 'a' if args.resume else 'w', encoding='utf-8')
+    else:
+        pdf_files_todo = pdf_files
+    
+    if args.workers > 1:
+        print(f"⚙️  Extracting with {args.workers} worker processes")
+    
+    cache = None
+    if not args.no_cache:
+        cache = ExtractionCache(Path(args.cache_dir) if args.cache_dir else output_dir / '.extract-cache', force=args.force)
+    
+    # Process all PDFs, results come back in the same order as pdf_files
+    created = 0
+    current_category = None
+    try:
+        for pdf_file, text in iter_extracted_texts(pdf_files_todo, args.workers, args.pages_per_job, cache):
+            category = pdf_categories[pdf_file]
+            if category != current_category:
+                print(f"\n📁 Category: {category}")
+                current_category = category
+            
+            result = process_pdf(pdf_file, category, text)
             if result:
-                results.append(result)
-                categories_stats[category]['processed'] += 1
+                summaries[(category, pdf_file.name)] = summarize(result)
+                created += 1
                 
-                # Save individual questionnaire
-                questionnaire_file = output_dir / f"{result['id']}.json"
-                with open(questionnaire_file, 'w', encoding='utf-8') as f:
-                    json.dump(result, f, ensure_ascii=False, indent=2)
+                with stage_timing.stage('json_write', file=pdf_file) as timing:
+                    # Save individual questionnaire
+                    questionnaire_file = output_dir / f"{result['id']}.json"
+                    with open(questionnaire_file, 'w', encoding='utf-8') as f:
+                        json.dump(result, f, ensure_ascii=False, indent=2)
+                        timing['bytes'] = f.tell()
+                    
+                    # Commit the record: a complete line means a complete questionnaire
+                    if jsonl_out is not None:
+                        jsonl_out.write(json.dumps(result, ensure_ascii=False) + '\n')
+                        jsonl_out.flush()
+    finally:
+        if jsonl_out is not None:
+            jsonl_out.close()
+    
+    if cache is not None:
+        cache.prune(ocr_dir)
+        cache.save()
     
     # Save master index
-    index_file = output_dir / 'index.json'
-    with open(index_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            'total_questionnaires': len(results),
-            'categories': categories_stats,
-            'questionnaires': [
-                {
-                    'id': r['id'],
-                    'title': r['title'],
-                    'category': r['category'],
-                    'question_count': len(r['questions'])
-                }
-                for r in results
-            ]
-        }, f, ensure_ascii=False, indent=2)
+    with stage_timing.stage('index_write'):
+        total = write_index(output_dir / 'index.json', pdf_files, pdf_categories, categories_stats, summaries)
     
     # Print summary
     print("\n" + "=" * 60)
     print("📊 EXTRACTION SUMMARY")
     print("=" * 60)
-    print(f"\n✅ Total questionnaires extracted: {len(results)}")
+    print(f"\n✅ Total questionnaires extracted: {total}")
+    if cache is not None:
+        print(f"♻️  Extraction cache: {cache.hits} unchanged, {cache.misses} (re)extracted")
     print(f"📁 Output directory: {output_dir}")
     print(f"\n📈 By category:")
     for cat, stats in sorted(categories_stats.items()):
         print(f"   • {cat:30} {stats['processed']:2}/{stats['total']:2} PDFs")
     
     print(f"\n💾 Files created:")
-    print(f"   • {len(results)} individual JSON files")
+    print(f"   • {created} individual JSON files")
     print(f"   • 1 master index.json")
+    if jsonl_file is not None:
+        print(f"   • {jsonl_file} ({created} records appended)")
     
     return 0
 
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Content-addressed, size-bounded cache of OCR results, for ocr_pdf_pymupdf.py.
+
+An entry holds the text and mean confidence that Tesseract produced for one page image
+(or page region). Its key combines the SHA-256 of the image pixels with the engine
+signature: Tesseract version, SHA-256 of each traineddata file used, and the config
+(lang, psm, oem, variables). The DPI and preprocessing are covered by the pixels, so
+a parameter sweep only OCRs the page/config combinations it has not seen yet.
+
+Layout:
+  <cache_dir>/objects/ab/abcdef....json   {"text": "...", "confidence": 91.0}
+
+Reading an entry refreshes its mtime. evict() removes the least recently used entries
+until the cache is under max_bytes.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pdf_text_cache import file_sha256
+
+CACHE_FORMAT = 1
+
+TESSDATA_DIRS = [
+    "/usr/share/tesseract-ocr/5/tessdata",
+    "/usr/share/tesseract-ocr/4.00/tessdata",
+    "/usr/share/tessdata",
+    "/usr/local/share/tessdata",
+    "/opt/homebrew/share/tessdata",
+    "C:/Program Files/Tesseract-OCR/tessdata",
+]
+
+
+def find_traineddata(lang: str) -> Optional[Path]:
+    """Locate <lang>.traineddata the way tesseract does: TESSDATA_PREFIX first, then the usual install dirs."""
+    dirs = [os.environ["TESSDATA_PREFIX"]] if os.environ.get("TESSDATA_PREFIX") else []
+    for directory in dirs + TESSDATA_DIRS:
+        for candidate in (Path(directory) / f"{lang}.traineddata", Path(directory) / "tessdata" / f"{lang}.traineddata"):
+            if candidate.is_file():
+                return candidate
+    return None
+
+
+def engine_signature(engine) -> str:
+    """Stable string identifying what determines an engine's output (see module docstring)."""
+    traineddata = {}
+    for lang in engine.lang.split("+"):
+        path = find_traineddata(lang)
+        traineddata[lang] = file_sha256(path) if path else "unknown"
+    return json.dumps({
+        "format": CACHE_FORMAT,
+        "tesseract": engine.version(),
+        "traineddata": traineddata,
+        "lang": engine.lang,
+        "psm": engine.psm,
+        "oem": engine.oem,
+        "variables": engine.variables,
+    }, sort_keys=True)
+
+
+def image_sha256(img) -> str:
+    digest = hashlib.sha256(f"{img.mode}:{img.width}x{img.height}:".encode("ascii"))
+    digest.update(img.tobytes())
+    return digest.hexdigest()
+
+
+class OcrCache:
+    """On-disk OCR result cache, see module docstring. Safe to use from several threads.
+
+    With force=True lookups always miss, but fresh results are still stored.
+    """
+
+    def __init__(self, cache_dir: Path, signature: str, max_bytes: int = 1 << 30, force: bool = False):
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / "objects"
+        self.max_bytes = max_bytes
+        self.force = force
+        self.hits = 0
+        self.misses = 0
+        self._signature = hashlib.sha256(signature.encode("utf-8")).hexdigest()
+        self._lock = threading.Lock()
+
+    def key(self, img) -> str:
+        return hashlib.sha256(f"{self._signature}\0{image_sha256(img)}".encode("ascii")).hexdigest()
+
+    def _object_path(self, key: str) -> Path:
+        return self.objects_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached {"text", "confidence"} entry, or None on a miss."""
+        if not self.force:
+            path = self._object_path(key)
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+                os.utime(path)  # mark as recently used
+                with self._lock:
+                    self.hits += 1
+                return entry
+            except (OSError, ValueError):
+                pass
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, text: str, confidence: Optional[float]) -> None:
+        path = self._object_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({"text": text, "confidence": confidence}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def evict(self) -> Tuple[int, int]:
+        """Delete least recently used entries until the cache fits in max_bytes.
+
+        Returns (entries removed, bytes freed).
+        """
+        entries: List[Tuple[int, int, str]] = []
+        total = 0
+        if self.objects_dir.exists():
+            for shard in os.scandir(self.objects_dir):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    st = entry.stat()
+                    entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                    total += st.st_size
+        removed = freed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total - freed <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            removed += 1
+            freed += size
+        return removed, freed
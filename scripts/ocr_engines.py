@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Tesseract OCR engines that stay loaded for the whole run.
+
+pytesseract.image_to_string writes every page image to a temp file and starts a new
+tesseract process, which loads fra.traineddata again each time. The persistent engines
+below instead keep one initialized TessBaseAPI per thread and hand it the image buffer
+in memory:
+
+  tesserocr    the tesserocr binding (pip install tesserocr)
+  capi         libtesseract's C API through ctypes (no extra Python package needed)
+  pytesseract  one tesseract process per page (the previous behaviour)
+
+Every engine has image_to_string(img) and recognize(img) -> (text, mean word confidence).
+The confidence is None with pytesseract, where it would cost a second tesseract run.
+make_engine("auto", ...) picks the first of these that is available. Every engine is
+thread-safe: each thread initializes its own TessBaseAPI on first use. Both bindings
+release the GIL while recognizing, so a thread pool scales across cores.
+
+load_engine() also prepares the environment first (tessdata folder, one OpenMP thread per
+engine), and LazyOcr creates that engine and the thread pool feeding it on first use.
+
+Used by ocr_pdf_pymupdf.py, extract_pdf_hybrid.py and extract-pdf-ocr.py.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+from pathlib import Path
+
+ENGINES = ("auto", "tesserocr", "capi", "pytesseract")
+
+# Try to set tesseract path if not in PATH
+DEFAULT_TESS_PATHS = [
+    r"C:\\Program Files\\Tesseract-OCR\\tesseract.exe",
+    r"C:\\Program Files (x86)\\Tesseract-OCR\\tesseract.exe",
+]
+_pytesseract = None
+
+
+def get_pytesseract():
+    """Import pytesseract on first use, pointing it to a default install if tesseract is not on PATH."""
+    global _pytesseract
+    if _pytesseract is None:
+        import pytesseract
+        if not shutil.which("tesseract"):
+            for p in DEFAULT_TESS_PATHS:
+                if os.path.exists(p):
+                    pytesseract.pytesseract.tesseract_cmd = p
+                    break
+        _pytesseract = pytesseract
+    return _pytesseract
+
+
+def tesseract_config(psm: int | None, oem: int | None, variables: dict | None) -> str:
+    """Command-line config string equivalent to the engine settings."""
+    parts = []
+    if oem is not None:
+        parts.append(f"--oem {oem}")
+    if psm is not None:
+        parts.append(f"--psm {psm}")
+    parts.extend(f"-c {name}={value}" for name, value in (variables or {}).items())
+    return " ".join(parts)
+
+
+class PytesseractEngine:
+    """One tesseract process per image, through pytesseract."""
+
+    name = "pytesseract"
+
+    def __init__(self, lang: str, psm: int | None = None, oem: int | None = None, variables: dict | None = None):
+        self.lang = lang
+        self.psm = psm
+        self.oem = oem
+        self.variables = {name: str(value) for name, value in (variables or {}).items()}
+        self.config = tesseract_config(psm, oem, variables)
+        self._pytesseract = get_pytesseract()
+
+    def version(self) -> str:
+        return str(self._pytesseract.get_tesseract_version())
+
+    def image_to_string(self, img) -> str:
+        return self._pytesseract.image_to_string(img, lang=self.lang, config=self.config)
+
+    def recognize(self, img) -> tuple[str, float | None]:
+        return self.image_to_string(img), None
+
+    def close(self):
+        pass
+
+
+class _PerThreadEngine:
+    """Base class of the persistent engines: one TessBaseAPI per thread, created on first use."""
+
+    name = ""
+
+    def __init__(self, lang: str, psm: int | None = None, oem: int | None = None, variables: dict | None = None):
+        self.lang = lang
+        self.psm = psm
+        self.oem = oem
+        self.variables = {name: str(value) for name, value in (variables or {}).items()}
+        self._local = threading.local()
+        self._apis = []
+        self._lock = threading.Lock()
+
+    def image_to_string(self, img) -> str:
+        return self.recognize(img)[0]
+
+    def _api(self):
+        api = getattr(self._local, "api", None)
+        if api is None:
+            api = self._create()
+            self._local.api = api
+            with self._lock:
+                self._apis.append(api)
+        return api
+
+    def close(self):
+        """Release the engines of every thread; call once all recognition is done."""
+        with self._lock:
+            apis, self._apis = self._apis, []
+        for api in apis:
+            self._destroy(api)
+
+
+class TesserocrEngine(_PerThreadEngine):
+    name = "tesserocr"
+
+    def __init__(self, *args, **kwargs):
+        import tesserocr
+        self._tesserocr = tesserocr
+        super().__init__(*args, **kwargs)
+
+    def _create(self):
+        kwargs = {"lang": self.lang}
+        if self.psm is not None:
+            kwargs["psm"] = self.psm
+        if self.oem is not None:
+            kwargs["oem"] = self.oem
+        api = self._tesserocr.PyTessBaseAPI(**kwargs)
+        for name, value in self.variables.items():
+            api.SetVariable(name, value)
+        return api
+
+    def _destroy(self, api):
+        api.End()
+
+    def version(self) -> str:
+        return self._tesserocr.tesseract_version().split()[1]
+
+    def recognize(self, img) -> tuple[str, float | None]:
+        api = self._api()
+        api.SetImage(img)
+        return api.GetUTF8Text(), float(api.MeanTextConf())
+
+
+def load_libtesseract():
+    """Load libtesseract (its C API) from the library path or a default Windows install."""
+    import ctypes
+    import ctypes.util
+
+    candidates = [ctypes.util.find_library("tesseract"), ctypes.util.find_library("libtesseract-5")]
+    for exe in DEFAULT_TESS_PATHS:
+        candidates.extend(str(p) for p in sorted(Path(exe).parent.glob("libtesseract*.dll")))
+    for candidate in filter(None, candidates):
+        try:
+            lib = ctypes.CDLL(candidate)
+            break
+        except OSError:
+            continue
+    else:
+        raise OSError("libtesseract not found")
+    handle, text = ctypes.c_void_p, ctypes.c_void_p
+    lib.TessVersion.restype = ctypes.c_char_p
+    lib.TessBaseAPICreate.restype = handle
+    lib.TessBaseAPIInit2.argtypes = [handle, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+    lib.TessBaseAPIInit3.argtypes = [handle, ctypes.c_char_p, ctypes.c_char_p]
+    lib.TessBaseAPISetPageSegMode.argtypes = [handle, ctypes.c_int]
+    lib.TessBaseAPISetVariable.argtypes = [handle, ctypes.c_char_p, ctypes.c_char_p]
+    lib.TessBaseAPISetImage.argtypes = [handle, ctypes.c_char_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+    lib.TessBaseAPIGetUTF8Text.argtypes = [handle]
+    lib.TessBaseAPIGetUTF8Text.restype = text
+    lib.TessDeleteText.argtypes = [text]
+    lib.TessBaseAPIMeanTextConf.argtypes = [handle]
+    lib.TessBaseAPIClear.argtypes = [handle]
+    lib.TessBaseAPIEnd.argtypes = [handle]
+    lib.TessBaseAPIDelete.argtypes = [handle]
+    return lib
+
+
+class CApiEngine(_PerThreadEngine):
+    """libtesseract through ctypes; ctypes releases the GIL during each foreign call."""
+
+    name = "capi"
+
+    def __init__(self, *args, **kwargs):
+        self._lib = load_libtesseract()
+        super().__init__(*args, **kwargs)
+
+    def _create(self):
+        lib = self._lib
+        api = lib.TessBaseAPICreate()
+        # A None datapath makes Tesseract use TESSDATA_PREFIX, like the tesseract command
+        lang = self.lang.encode()
+        status = lib.TessBaseAPIInit3(api, None, lang) if self.oem is None else lib.TessBaseAPIInit2(api, None, lang, self.oem)
+        if status != 0:
+            lib.TessBaseAPIDelete(api)
+            raise RuntimeError(f"Tesseract could not load language '{self.lang}' (check TESSDATA_PREFIX)")
+        if self.psm is not None:
+            lib.TessBaseAPISetPageSegMode(api, self.psm)
+        for name, value in self.variables.items():
+            lib.TessBaseAPISetVariable(api, name.encode(), value.encode())
+        return api
+
+    def _destroy(self, api):
+        self._lib.TessBaseAPIEnd(api)
+        self._lib.TessBaseAPIDelete(api)
+
+    def version(self) -> str:
+        return self._lib.TessVersion().decode()
+
+    def recognize(self, img) -> tuple[str, float | None]:
+        if img.mode not in ("L", "RGB"):
+            img = img.convert("RGB")
+        bpp = 1 if img.mode == "L" else 3
+        import ctypes
+
+        lib = self._lib
+        api = self._api()
+        lib.TessBaseAPISetImage(api, img.tobytes(), img.width, img.height, bpp, img.width * bpp)
+        ptr = lib.TessBaseAPIGetUTF8Text(api)
+        try:
+            text = ctypes.string_at(ptr).decode("utf-8") if ptr else ""
+            return text, float(lib.TessBaseAPIMeanTextConf(api))
+        finally:
+            if ptr:
+                lib.TessDeleteText(ptr)
+            lib.TessBaseAPIClear(api)
+
+
+_ENGINE_CLASSES = {"tesserocr": TesserocrEngine, "capi": CApiEngine, "pytesseract": PytesseractEngine}
+
+
+def make_engine(name: str = "auto", lang: str = "fra", psm: int | None = None, oem: int | None = None,
+                variables: dict | None = None):
+    """Create an OCR engine; "auto" returns the first available of tesserocr, capi, pytesseract.
+
+    Nothing is initialized here: each thread loads its model the first time it recognizes an image.
+    """
+    if name != "auto":
+        return _ENGINE_CLASSES[name](lang, psm, oem, variables)
+    for candidate in ("tesserocr", "capi"):
+        try:
+            return _ENGINE_CLASSES[candidate](lang, psm, oem, variables)
+        except (ImportError, OSError):
+            continue
+    return PytesseractEngine(lang, psm, oem, variables)
+
+
+def configure_tessdata():
+    """Ensure TESSDATA_PREFIX points to a valid tessdata folder if user provided one."""
+    user_tess = Path("C:/Dev/tessdata")
+    if user_tess.exists():
+        os.environ["TESSDATA_PREFIX"] = str(user_tess)
+
+
+def load_engine(name: str = "auto", lang: str = "fra", psm: int | None = None, oem: int | None = None,
+                workers: int = 1):
+    """make_engine() with the interword spaces kept, for `workers` threads recognizing at once.
+
+    Must run before libtesseract is loaded: OpenMP reads OMP_THREAD_LIMIT only once.
+    """
+    configure_tessdata()
+    if workers > 1:
+        # One tesseract engine per worker: keep each one single-threaded to avoid oversubscription
+        os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    return make_engine(name, lang, psm, oem, {"preserve_interword_spaces": 1})
+
+
+class LazyOcr:
+    """Thread pool and engine shared by every page of a run, created on the first call.
+
+    Calling it returns the (pool, engine) pair, so PDFs that never need OCR never load
+    Tesseract (see extract_pdf_hybrid.extract_pdf). close() shuts both down.
+    """
+
+    def __init__(self, name: str = "auto", lang: str = "fra", psm: int | None = None, oem: int | None = None,
+                 workers: int = 1):
+        self.name = name
+        self.lang = lang
+        self.psm = psm
+        self.oem = oem
+        self.workers = workers
+        self._pool = None
+        self._engine = None
+
+    def __call__(self):
+        if self._pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._engine = load_engine(self.name, self.lang, self.psm, self.oem, self.workers)
+            self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        return self._pool, self._engine
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._engine.close()
+            self._pool = None
+            self._engine = None
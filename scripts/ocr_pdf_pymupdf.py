@@ -1,35 +1,66 @@
 #!/usr/bin/env python3
 """
-OCR a PDF using PyMuPDF for rasterization and pytesseract for text recognition.
+OCR a PDF using PyMuPDF for rasterization and Tesseract for text recognition.
 Writes a .txt file with page markers preserving order.
 
+Pages are processed by a pipeline: one thread rasterizes pages (across all input PDFs)
+into a bounded queue, and a pool of worker threads runs Tesseract on them concurrently.
+Results are written back in page order. Rendering stays in one thread: PyMuPDF documents
+must not be used from several threads at once. It is not the bottleneck for a typical
+machine: measured on 15 pages of data/questionnaires/ocr at 400 DPI (fra, psm 6, tesserocr
+with Tesseract 5.5.1), rendering takes 107 ms/page against 1713 ms/page of preprocessing +
+Tesseract in a worker, so one rasterizer keeps about 16 workers busy. Beyond that, split
+the input between several processes. With --engine auto (the default), each worker
+keeps its own Tesseract engine loaded through tesserocr or libtesseract (see ocr_engines.py).
+Only when neither is available does it fall back to one pytesseract process per page.
+
+With --adaptive, each page is first rendered at --probe-dpi (72) in grayscale to measure
+its text line height and find its text blocks. Only those blocks are then rendered,
+directly in grayscale, at a DPI that makes a text line about --target-line-px pixels
+high, between --min-dpi and --dpi. Blank margins and large print are therefore not
+OCR'd at full resolution. The DPI, region count and pixels of every page are printed,
+and written to --report if given.
+
+OCR results are cached on disk (see ocr_cache.py), keyed on the preprocessed page image,
+the Tesseract version, the traineddata files and the config. Re-runs and parameter sweeps
+only OCR the page/config combinations they have not seen before (--no-cache disables it).
+
+--trace/--timings record how long each page spends in every stage (rasterize, preprocess,
+tesseract, cache, write) across the threads, see stage_timing.py. With --corpus, the text
+of every PDF is also added to a memory-mapped corpus store (see corpus_store.py).
+
 Usage:
   C:/Python314/python.exe scripts/ocr_pdf_pymupdf.py --input "data/questionnaires/raw/Mode de vie/questionnaire-contextuel-mode-de-vie-pro-def.pdf" --output "data/questionnaires/ocr_txt/Mode de vie/questionnaire-contextuel-mode-de-vie-pro-def.txt" --dpi 400 --psm 6 --oem 1
+  C:/Python314/python.exe scripts/ocr_pdf_pymupdf.py --input "data/questionnaires/raw" --output "data/questionnaires/ocr_txt" --workers 8
+  C:/Python314/python.exe scripts/ocr_pdf_pymupdf.py --input "data/questionnaires/ocr" --output "data/questionnaires/ocr_txt" --adaptive --report ocr-pixels.json
+  C:/Python314/python.exe scripts/ocr_pdf_pymupdf.py --input "data/questionnaires/ocr" --output "data/questionnaires/ocr_txt" --trace ocr-trace.json --timings
 
-Requires: pymupdf, pytesseract, pillow
+Requires: pymupdf, pillow, and tesserocr, libtesseract or pytesseract (imported on first use, so --help and importers stay fast)
 Assumes tesseract.exe is on PATH.
 """
+from __future__ import annotations
+
 import argparse
+import json
 import os
+import queue
+import sys
+import threading
 from pathlib import Path
-import fitz  # PyMuPDF
-import pytesseract
-from PIL import Image, ImageOps, ImageFilter
-import shutil
-
-# Try to set tesseract path if not in PATH
-DEFAULT_TESS_PATHS = [
-    r"C:\\Program Files\\Tesseract-OCR\\tesseract.exe",
-    r"C:\\Program Files (x86)\\Tesseract-OCR\\tesseract.exe",
-]
-if not shutil.which("tesseract"):
-    for p in DEFAULT_TESS_PATHS:
-        if os.path.exists(p):
-            pytesseract.pytesseract.tesseract_cmd = p
-            break
+from typing import TYPE_CHECKING
+
+import stage_timing
+from corpus_store import CorpusWriter, document_name
+from ocr_cache import OcrCache, engine_signature
+from ocr_engines import ENGINES, load_engine
+from pdf_document import PdfDocument
+
+if TYPE_CHECKING:
+    from PIL import Image  # annotations only: PIL is imported on first use
 
 def preprocess(img: Image.Image) -> Image.Image:
     """Basic preprocessing to improve OCR: grayscale, contrast boost, light denoise/binarize."""
+    from PIL import ImageOps, ImageFilter
     # Convert to grayscale
     g = ImageOps.grayscale(img)
     # Slight sharpen to improve edges
@@ -41,38 +72,331 @@ def preprocess(img: Image.Image) -> Image.Image:
     # bw = g.point(lambda x: 0 if x < 160 else 255, mode='1')
     return g
 
-def ocr_pdf(input_pdf: Path, output_txt: Path, dpi: int = 400, lang: str = "fra", psm: int = 6, oem: int = 1):
-    # Ensure TESSDATA_PREFIX points to a valid tessdata folder if user provided one
-    user_tess = Path("C:/Dev/tessdata")
-    if user_tess.exists():
-        os.environ["TESSDATA_PREFIX"] = str(user_tess)
-
-    output_txt.parent.mkdir(parents=True, exist_ok=True)
-    with fitz.open(str(input_pdf)) as doc:
-        with output_txt.open("w", encoding="utf-8") as out:
-            for i, page in enumerate(doc, start=1):
-                # Render page to image
-                zoom = dpi / 72.0
-                mat = fitz.Matrix(zoom, zoom)
-                pix = page.get_pixmap(matrix=mat, alpha=False)
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                proc = preprocess(img)
-                config = f"--oem {oem} --psm {psm} -c preserve_interword_spaces=1"
-                text = pytesseract.image_to_string(proc, lang=lang, config=config)
-                out.write(f"===== PAGE {i} =====\n\n{text}\n")
-                print(f"OCR page {i}/{len(doc)} (psm={psm}, oem={oem}, dpi={dpi})")
+def render_page(page, dpi: int, gray: bool = False, clip=None) -> Image.Image:
+    """Render a PyMuPDF page (or the clip rectangle of it) to a PIL image at the given DPI.
+
+    With gray=True MuPDF renders straight to 8-bit grayscale, a third of the RGB samples.
+    """
+    import fitz  # PyMuPDF
+    from PIL import Image
+    zoom = dpi / 72.0
+    mat = fitz.Matrix(zoom, zoom)
+    if gray:
+        pix = page.get_pixmap(matrix=mat, alpha=False, colorspace=fitz.csGRAY, clip=clip)
+        return Image.frombytes("L", [pix.width, pix.height], pix.samples)
+    pix = page.get_pixmap(matrix=mat, alpha=False, clip=clip)
+    return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+
+def ink_runs(profile: list[int], min_ink: int, max_gap: int) -> list[tuple[int, int]]:
+    """[start, end) index ranges where profile >= min_ink, merging runs separated by at most max_gap."""
+    runs: list[list[int]] = []
+    for i, count in enumerate(profile):
+        if count < min_ink:
+            continue
+        if runs and i - runs[-1][1] <= max_gap:
+            runs[-1][1] = i + 1
+        else:
+            runs.append([i, i + 1])
+    return [(a, b) for a, b in runs]
+
+def probe_layout(page, probe_dpi: int = 72, regions: str = "blocks", threshold: int = 160):
+    """Fast low-resolution pass over a page to size its text and locate it.
+
+    Returns (line_height_pt, rects): the median height of the text lines in points (None on a
+    blank page) and the page rectangles holding text, top to bottom then left to right.
+    regions is "page" (one box around all the ink), "blocks" (boxes split on blank bands
+    taller than two lines) or "columns" (blocks further split on wide vertical gutters).
+    """
+    import fitz  # PyMuPDF
+    pix = page.get_pixmap(matrix=fitz.Matrix(probe_dpi / 72.0, probe_dpi / 72.0), alpha=False, colorspace=fitz.csGRAY)
+    width, height, stride = pix.width, pix.height, getattr(pix, "stride", pix.width)
+    # Map every gray level to 1 (ink) or 0 so that counting ink is a C-level bytes.count()
+    ink = pix.samples.translate(bytes(1 if v < threshold else 0 for v in range(256)))
+    rows = [ink[y * stride:y * stride + width].count(1) for y in range(height)]
+    min_ink = max(1, width // 400)  # ignore scanner speckle
+    lines = [b - a for a, b in ink_runs(rows, min_ink, 0) if b - a >= 2]
+    if not lines:
+        return None, []
+    line_px = sorted(lines)[len(lines) // 2]
+    scale = 72.0 / probe_dpi
+    pad = max(2, line_px // 3)
+
+    bands = ink_runs(rows, min_ink, height if regions == "page" else 2 * line_px)
+    rects = []
+    for y0, y1 in bands:
+        band = b"".join(ink[y * stride:y * stride + width] for y in range(y0, y1))
+        cols = [band[x::width].count(1) for x in range(width)]
+        spans = ink_runs(cols, 1, 3 * line_px if regions == "columns" else width)
+        for x0, x1 in spans:
+            rects.append(fitz.Rect(
+                page.rect.x0 + max(0, x0 - pad) * scale, page.rect.y0 + max(0, y0 - pad) * scale,
+                page.rect.x0 + min(width, x1 + pad) * scale, page.rect.y0 + min(height, y1 + pad) * scale,
+            ))
+    return line_px * scale, rects
+
+def choose_dpi(line_height_pt: float, target_line_px: int, min_dpi: int, max_dpi: int) -> int:
+    """DPI at which a text line is about target_line_px pixels high, rounded to 25 and clamped."""
+    dpi = round(target_line_px * 72.0 / line_height_pt / 25) * 25
+    return max(min_dpi, min(max_dpi, dpi))
+
+def render_regions(page, dpi: int, adaptive: bool = False, gray: bool = False, regions: str = "blocks",
+                   min_dpi: int = 150, probe_dpi: int = 72, target_line_px: int = 40):
+    """Images to OCR for one page, plus a report of the DPI used and the pixels rendered.
+
+    Without adaptive, the whole page at dpi. With adaptive, the text regions found by
+    probe_layout, in grayscale, at a DPI picked from the text size (never above dpi).
+    """
+    full_page_pixels = round(page.rect.width * dpi / 72.0) * round(page.rect.height * dpi / 72.0)
+    if not adaptive:
+        img = render_page(page, dpi, gray=gray)
+        return [img], {"dpi": dpi, "regions": 1, "pixels": img.width * img.height, "full_page_pixels": full_page_pixels}
+    if getattr(page, "rotation", 0):
+        # Clip rectangles are in unrotated page space: keep rotated pages whole
+        line_height, rects = probe_layout(page, probe_dpi, "page")
+        rects = [None] if rects else []
+    else:
+        line_height, rects = probe_layout(page, probe_dpi, regions)
+    page_dpi = choose_dpi(line_height, target_line_px, min_dpi, dpi) if line_height else dpi
+    images = [render_page(page, page_dpi, gray=True, clip=rect) for rect in rects]
+    return images, {"dpi": page_dpi, "regions": len(images), "pixels": sum(img.width * img.height for img in images),
+                    "full_page_pixels": full_page_pixels}
+
+def ocr_documents(jobs: list[tuple[Path, Path]], dpi: int = 400, lang: str = "fra", psm: int = 6, oem: int = 1,
+                  workers: int | None = None, queue_size: int | None = None, render_options: dict | None = None,
+                  engine: str = "auto", cache_dir: Path | None = None, cache_max_mb: int = 1024,
+                  refresh_cache: bool = False, corpus: CorpusWriter | None = None, corpus_root: Path | None = None):
+    """OCR several PDFs through the rasterize -> Tesseract pipeline.
+
+    jobs is a list of (input_pdf, output_txt) pairs. At most queue_size rendered pages
+    (default: workers) wait in the queue, so memory stays bounded whatever the page count.
+    render_options are passed to render_regions (adaptive DPI, grayscale, text regions).
+    engine is one of ocr_engines.ENGINES. With cache_dir, results are looked up in and added
+    to an OcrCache bounded to cache_max_mb (refresh_cache re-OCRs and overwrites entries).
+    With corpus, the text of every PDF is also added to that corpus store, named after its
+    path relative to corpus_root (see corpus_store.document_name).
+    A PDF that cannot be read or OCR'd is reported and skipped (its partial .txt removed);
+    the other PDFs are still processed.
+    Returns the per-page render reports (DPI, regions, pixels), in output order.
+    """
+    workers = workers or os.cpu_count() or 1
+    ocr = load_engine(engine, lang, psm, oem, workers)
+    print(f"🔧 OCR engine: {ocr.name}, {workers} worker(s)")
+    cache = None
+    if cache_dir is not None:
+        cache = OcrCache(cache_dir, engine_signature(ocr), max_bytes=cache_max_mb * 1024 * 1024, force=refresh_cache)
+
+    def ocr_image(img, input_pdf: Path, page: int) -> tuple[str, float | None]:
+        with stage_timing.stage("preprocess", file=input_pdf, page=page):
+            img = preprocess(img)
+        if cache is not None:
+            with stage_timing.stage("cache_lookup", file=input_pdf, page=page):
+                key = cache.key(img)
+                entry = cache.get(key)
+            if entry is not None:
+                return entry["text"], entry["confidence"]
+        with stage_timing.stage("tesseract", file=input_pdf, page=page, pixels=img.width * img.height) as timing:
+            text, confidence = ocr.recognize(img)
+            timing["bytes"] = len(text.encode("utf-8"))
+        if cache is not None:
+            with stage_timing.stage("cache_store", file=input_pdf, page=page):
+                cache.put(key, text, confidence)
+        return text, confidence
+
+    pages_q: queue.Queue = queue.Queue(maxsize=queue_size or workers)
+    results_q: queue.Queue = queue.Queue()
+    stop = threading.Event()
+    # Documents with a failed page: their remaining pages are neither rendered nor OCR'd
+    abandoned: set[int] = set()
+
+    def rasterize():
+        try:
+            for doc_index, (input_pdf, _) in enumerate(jobs):
+                try:
+                    with PdfDocument(input_pdf, "pymupdf") as doc:
+                        # Announced before any of its pages can be recognized
+                        results_q.put(("doc", doc_index, doc.page_count))
+                        for i, page in enumerate(doc.fitz, start=1):
+                            if stop.is_set():
+                                return
+                            if doc_index in abandoned:
+                                break
+                            with stage_timing.stage("rasterize", file=input_pdf, page=i) as timing:
+                                images, info = render_regions(page, dpi, **(render_options or {}))
+                                timing["bytes"] = sum(len(img.mode) * img.width * img.height for img in images)
+                            pages_q.put((doc_index, i, images, info))
+                except Exception as e:
+                    # Only this PDF fails: move on to the next one
+                    abandoned.add(doc_index)
+                    results_q.put(("error", doc_index, e))
+        finally:
+            for _ in range(workers):
+                pages_q.put(None)
+
+    def recognize():
+        while True:
+            item = pages_q.get()
+            if item is None:
+                return
+            if stop.is_set():
+                continue
+            doc_index, i, images, info = item
+            if doc_index in abandoned:
+                continue
+            try:
+                results = [ocr_image(img, jobs[doc_index][0], i) for img in images]
+            except Exception as e:
+                abandoned.add(doc_index)
+                results_q.put(("error", doc_index, e))
+                continue
+            text = "\n".join(text for text, _ in results)
+            confidences = [c for _, c in results if c is not None]
+            info = {**info, "confidence": round(sum(confidences) / len(confidences), 1) if confidences else None}
+            results_q.put(("page", doc_index, (i, text, info)))
+
+    threads = [threading.Thread(target=rasterize, daemon=True)]
+    threads += [threading.Thread(target=recognize, daemon=True) for _ in range(workers)]
+    for t in threads:
+        t.start()
+
+    page_counts: dict[int, int] = {}
+    done: dict[int, dict[int, str]] = {}
+    next_page: dict[int, int] = {}
+    outputs = {}
+    written: dict[int, list[str]] = {}
+    reports: list[dict] = []
+    failed: set[int] = set()
+    remaining = len(jobs)
+    try:
+        while remaining:
+            kind, doc_index, payload = results_q.get()
+            if kind == "error":
+                if doc_index not in failed:
+                    failed.add(doc_index)
+                    print(f"❌ {jobs[doc_index][0]}: {type(payload).__name__}: {payload}", file=sys.stderr)
+                    out = outputs.pop(doc_index, None)
+                    if out is not None:
+                        out.close()
+                        jobs[doc_index][1].unlink(missing_ok=True)
+                    written.pop(doc_index, None)
+                    remaining -= 1
+                continue
+            if doc_index in failed:
+                continue  # pages of a PDF that already failed
+            if kind == "doc":
+                output_txt = jobs[doc_index][1]
+                output_txt.parent.mkdir(parents=True, exist_ok=True)
+                outputs[doc_index] = output_txt.open("w", encoding="utf-8")
+                written[doc_index] = []
+                page_counts[doc_index] = payload
+                done[doc_index] = {}
+                next_page[doc_index] = 1
+            else:
+                i, text, info = payload
+                done[doc_index][i] = (text, info)
+            # Flush every page that is now contiguous with what was already written
+            out = outputs[doc_index]
+            while next_page[doc_index] in done[doc_index]:
+                i = next_page[doc_index]
+                text, info = done[doc_index].pop(i)
+                with stage_timing.stage("write", file=jobs[doc_index][0], page=i, bytes=len(text.encode("utf-8"))):
+                    out.write(f"===== PAGE {i} =====\n\n{text}\n")
+                if corpus is not None:
+                    written[doc_index].append(f"===== PAGE {i} =====\n\n{text}\n")
+                name = f"{jobs[doc_index][0].name}: " if len(jobs) > 1 else ""
+                print(f"{name}OCR page {i}/{page_counts[doc_index]} (psm={psm}, oem={oem}, dpi={info['dpi']}, "
+                      f"regions={info['regions']}, {info['pixels'] / 1e6:.2f} MP)")
+                reports.append({"file": str(jobs[doc_index][0]), "page": i, **info})
+                next_page[doc_index] += 1
+            if next_page[doc_index] > page_counts[doc_index]:
+                out.close()
+                if corpus is not None:
+                    corpus.add_text(document_name(jobs[doc_index][0], corpus_root), "".join(written.pop(doc_index)))
+                remaining -= 1
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
+        for out in outputs.values():
+            out.close()
+        ocr.close()
+    if failed:
+        print(f"❌ {len(failed)}/{len(jobs)} PDF(s) failed")
+    if cache is not None:
+        removed, freed = cache.evict()
+        print(f"♻️  OCR cache: {cache.hits} hit(s), {cache.misses} OCR'd"
+              + (f", {removed} old entries evicted ({freed / 1e6:.1f} MB)" if removed else ""))
+    return reports
+
+def ocr_pdf(input_pdf: Path, output_txt: Path, dpi: int = 400, lang: str = "fra", psm: int = 6, oem: int = 1,
+            workers: int | None = None, render_options: dict | None = None, engine: str = "auto"):
+    return ocr_documents([(input_pdf, output_txt)], dpi=dpi, lang=lang, psm=psm, oem=oem, workers=workers,
+                         render_options=render_options, engine=engine)
+
+def print_pixel_summary(reports: list[dict], dpi: int):
+    """Compare the pixels sent to Tesseract with full pages rendered at the fixed DPI."""
+    ocr_pixels = sum(r["pixels"] for r in reports)
+    full_pixels = sum(r["full_page_pixels"] for r in reports) or 1
+    dpis = sorted(r["dpi"] for r in reports)
+    print(f"\n📐 {len(reports)} page(s), DPI {dpis[0]}-{dpis[-1]} (median {dpis[len(dpis) // 2]})" if dpis else "\n📐 0 page(s)")
+    print(f"🖼️  Pixels OCR'd: {ocr_pixels / 1e6:.1f} MP, {100 * ocr_pixels / full_pixels:.0f}% of full pages at {dpi} DPI "
+          f"({full_pixels / 1e6:.1f} MP)")
 
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--input", required=True)
-    ap.add_argument("--output", required=True)
+    ap.add_argument("--input", required=True, help="PDF file, or directory of PDFs (searched recursively)")
+    ap.add_argument("--output", required=True, help="Output .txt file, or output directory when --input is a directory")
     ap.add_argument("--dpi", type=int, default=400)
     ap.add_argument("--lang", default="fra")
     ap.add_argument("--psm", type=int, default=6, help="Tesseract page segmentation mode")
     ap.add_argument("--oem", type=int, default=1, help="Tesseract OCR engine mode")
+    ap.add_argument("--workers", type=int, default=None, help="Concurrent Tesseract workers (default: CPU count)")
+    ap.add_argument("--engine", choices=ENGINES, default="auto",
+                    help="Tesseract backend: persistent tesserocr/libtesseract engines, or a pytesseract process per page")
+    ap.add_argument("--queue-size", type=int, default=None, help="Max rendered pages waiting for OCR (default: workers)")
+    ap.add_argument("--gray", action="store_true", help="Render pages directly in grayscale (implied by --adaptive)")
+    ap.add_argument("--adaptive", action="store_true",
+                    help="Probe each page at low resolution, OCR only its text regions at a DPI fitted to the text size (--dpi is the maximum)")
+    ap.add_argument("--regions", choices=("page", "blocks", "columns"), default="blocks",
+                    help="Adaptive mode: OCR one box around all text, text blocks, or blocks split into columns")
+    ap.add_argument("--min-dpi", type=int, default=150, help="Adaptive mode: lowest DPI used")
+    ap.add_argument("--target-line-px", type=int, default=40, help="Adaptive mode: text line height aimed for, in pixels")
+    ap.add_argument("--probe-dpi", type=int, default=72, help="Adaptive mode: resolution of the layout probe")
+    ap.add_argument("--report", help="Write the per-page DPI/regions/pixels/confidence report to this JSON file")
+    ap.add_argument("--cache-dir", help="OCR result cache directory (default: <output dir>/.ocr-cache)")
+    ap.add_argument("--no-cache", action="store_true", help="Disable the OCR result cache")
+    ap.add_argument("--refresh-cache", action="store_true", help="OCR every page again and overwrite cached results")
+    ap.add_argument("--corpus", help="Also add the OCR text to this corpus store (see corpus_store.py)")
+    ap.add_argument("--cache-max-mb", type=int, default=1024, help="Evict least recently used cache entries beyond this size")
+    stage_timing.add_arguments(ap)
     args = ap.parse_args()
 
-    ocr_pdf(Path(args.input), Path(args.output), dpi=args.dpi, lang=args.lang, psm=args.psm, oem=args.oem)
+    inp = Path(args.input)
+    out = Path(args.output)
+    if inp.is_dir():
+        jobs = [(pdf, out / pdf.relative_to(inp).with_suffix(".txt")) for pdf in sorted(inp.rglob("*.pdf"))]
+    else:
+        jobs = [(inp, out)]
+
+    render_options = {"gray": args.gray}
+    if args.adaptive:
+        render_options = {"adaptive": True, "regions": args.regions, "min_dpi": args.min_dpi,
+                          "probe_dpi": args.probe_dpi, "target_line_px": args.target_line_px}
+    cache_dir = None
+    if not args.no_cache:
+        cache_dir = Path(args.cache_dir) if args.cache_dir else (out if inp.is_dir() else out.parent) / ".ocr-cache"
+    corpus = CorpusWriter(Path(args.corpus)) if args.corpus else None
+    with stage_timing.instrumented(args):
+        reports = ocr_documents(jobs, dpi=args.dpi, lang=args.lang, psm=args.psm, oem=args.oem,
+                                workers=args.workers, queue_size=args.queue_size, render_options=render_options,
+                                engine=args.engine, cache_dir=cache_dir, cache_max_mb=args.cache_max_mb,
+                                refresh_cache=args.refresh_cache, corpus=corpus,
+                                corpus_root=inp if inp.is_dir() else None)
+    if corpus is not None:
+        corpus.close()
+        print(f"📦 Corpus {args.corpus}: {corpus.added} document(s) added, {corpus.unchanged} unchanged")
+    print_pixel_summary(reports, args.dpi)
+    if args.report:
+        Path(args.report).write_text(json.dumps(reports, indent=2), encoding="utf-8")
 
 if __name__ == "__main__":
     main()
@@ -6,6 +6,22 @@ suitable for the app's questionnaire schema (id, label, type, options, etc.).
 Usage examples:
   python scripts/parse_questionnaires.py --input "data/questionnaires/ocr/Mode de vie/questionnaire-contextuel-mode-de-vie-pro-def.pdf" --outdir data/questionnaires/generated
   python scripts/parse_questionnaires.py --input "data/questionnaires/raw/extracted/Mode de vie/questionnaire-contextuel-mode-de-vie-pro-def.txt" --outdir data/questionnaires/generated
+  python scripts/parse_questionnaires.py --input data/questionnaires/extracted --outdir data/questionnaires/generated --workers 4
+  python scripts/parse_questionnaires.py --input "data/questionnaires/extracted/**/*.txt" --outdir data/questionnaires/generated --summary parse-summary.json
+  python scripts/parse_questionnaires.py --corpus data/questionnaires/corpus --input "Mode de vie/*" --outdir data/questionnaires/generated
+  python scripts/parse_questionnaires.py --input data/questionnaires/ocr --outdir data/questionnaires/generated --layout
+
+Batch mode: --input accepts several files, directories (searched recursively for .txt/.pdf)
+and glob patterns; all inputs are parsed in one process, or across --workers processes.
+--corpus reads the documents of a corpus store (see corpus_store.py) instead of .txt files,
+without re-reading and re-splitting whole files.
+--layout parses PDF inputs from pdfplumber word boxes instead of extract_text(): each page's
+words are grouped into rows and cells (runs of words separated by a column gap) geometrically,
+and option rows are split on those cells rather than on runs of spaces. Cells are also matched
+to page columns, so a Likert header row ("Jamais  Parfois  Souvent") gives its options to the
+question rows below whose answer marks sit under the same columns.
+--trace/--timings break each file down into read, normalize, parse and JSON write stages
+(see stage_timing.py).
 
 Heuristics:
 - Section detection: lines in ALL CAPS or lines starting with digits like "1.", "2." as top headers
@@ -19,15 +35,20 @@ Note: This is a best-effort heuristic; expect manual review.
 """
 
 import argparse
+import bisect
+import fnmatch
+import glob
 import json
 import os
 import re
-from pathlib import Path
+import sys
+import time
+from contextlib import nullcontext
+from pathlib import Path, PurePosixPath
 
-try:
-    import pdfplumber  # type: ignore
-except Exception:
-    pdfplumber = None  # fallback to text-only if missing
+import stage_timing
+from corpus_store import Corpus
+from pdf_document import PdfDocument
 
 SECTION_RE = re.compile(r"^Votre\s.+$", re.IGNORECASE)
 QUESTION_MARK_RE = re.compile(r"\?\s*$")
@@ -35,38 +56,202 @@ QUESTION_START_RE = re.compile(r"^(Estimez|Avez|Comment|Combien|Le soir|Dans vot
 QUESTION_NUM_RE = re.compile(r"^\s*(\d+)[\.)]\s+(.*)")
 BULLET_RE = re.compile(r"^\s*([\-•–*o])\s+(.*)")
 POINTS_RE = re.compile(r"\((\d+)\s*pt[s]?\)\s*$", re.IGNORECASE)
+PAGE_MARKER_RE = re.compile(r"^===== PAGE \d+ =====$")
+NUMERIC_ROW_RE = re.compile(r"^\s*(?:[0-9]+[\s|]+){2,}[0-9]+\s*$")
+COLUMN_GAP_RE = re.compile(r"\s{2,}")
+LEADING_BULLET_RE = re.compile(r"^[\-•–*o]\s*")
+TRAILING_NUMBER_RE = re.compile(r"\s+[0-9]+\s*$")
+WHITESPACE_RE = re.compile(r"\s+")
+SLUG_RE = re.compile(r"[^a-z0-9]+")
 SCORE_BREAKERS = (
     "Votre score",
     "Additionnez les points",
     "Le score pour les Professionnels",
 )
+_SCORE_BREAKERS_LOW = tuple(b.lower() for b in SCORE_BREAKERS)
+# --layout: words further apart than this many word heights are in different cells
+LAYOUT_GAP = 1.0
+
+# Likert option normalization, tried in order: an option whose lowercased text contains all
+# the "all" keywords (and is shorter than "max_len", if set) is replaced by "label".
+# Can be overridden with --likert-table (a JSON file with the same structure).
+DEFAULT_LIKERT_TABLE = [
+    {"all": ["jamais"], "max_len": 10, "label": "Jamais"},
+    {"all": ["rarement"], "max_len": 12, "label": "Rarement"},
+    {"all": ["occasionnelle"], "max_len": 20, "label": "Occasionnellement"},
+    {"all": ["fréquemment"], "max_len": None, "label": "Fréquemment"},
+    {"all": ["toujours"], "max_len": 12, "label": "Toujours"},
+    {"all": ["pas du tout"], "max_len": 15, "label": "Pas du tout"},
+    {"all": ["plutôt", "satisfaisant"], "max_len": None, "label": "Plutôt satisfaisant"},
+    {"all": ["tout à fait", "satisfaisant"], "max_len": None, "label": "Tout à fait satisfaisant"},
+    {"all": ["excellent"], "max_len": 12, "label": "Excellent"},
+]
+
+
+class LikertNormalizer:
+    """Maps OCR'd option fragments to canonical Likert labels using a synonym table.
+
+    All keywords of the table are compiled into one regex, so the keywords present in an
+    option are found in a single scan instead of one substring test per rule.
+    """
+
+    def __init__(self, table: list[dict]):
+        self.rules = [(tuple(r["all"]), r.get("max_len"), r["label"]) for r in table]
+        keywords = sorted({k for needed, _, _ in self.rules for k in needed}, key=len, reverse=True)
+        # Longest keyword first: a keyword also implies the keywords that are prefixes of it
+        self._implied = {k: frozenset(j for j in keywords if k.startswith(j)) for k in keywords}
+        self._keywords_re = re.compile("(?=(" + "|".join(re.escape(k) for k in keywords) + "))") if keywords else None
+
+    def normalize(self, option: str) -> str:
+        if self._keywords_re is None:
+            return option
+        found: set[str] = set()
+        for m in self._keywords_re.finditer(option.lower()):
+            found |= self._implied[m.group(1)]
+        if not found:
+            return option
+        for needed, max_len, label in self.rules:
+            if (max_len is None or len(option) < max_len) and all(k in found for k in needed):
+                return label
+        return option
+
+
+def load_likert_table(path: Path) -> list[dict]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+likert_normalizer = LikertNormalizer(DEFAULT_LIKERT_TABLE)
+
 
+def read_text_from_pdf(pdf_path: Path, doc: PdfDocument | None = None) -> str:
+    """Text of a PDF with ===== PAGE i ===== markers, from doc if the caller already opened it.
 
-def read_text_from_pdf(pdf_path: Path) -> str:
-    if pdfplumber is None:
-        raise RuntimeError("pdfplumber not installed. Install with: pip install pdfplumber")
+    pdfplumber is only imported when a PDF is read, so .txt inputs do not pay for it.
+    """
     out = []
-    with pdfplumber.open(str(pdf_path)) as pdf:
-        for i, page in enumerate(pdf.pages, start=1):
-            txt = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
+    with (nullcontext(doc) if doc is not None else PdfDocument(pdf_path, "pdfplumber")) as doc:
+        for i in range(1, doc.page_count + 1):
+            with stage_timing.stage("text_extract", file=pdf_path, page=i) as timing:
+                txt = doc.page_text(i - 1, x_tolerance=2, y_tolerance=2)
+                timing["bytes"] = len(txt.encode("utf-8"))
             out.append(f"===== PAGE {i} =====\n\n{txt}\n")
     return "\n".join(out)
 
 
+class LayoutLine(str):
+    """A line rebuilt from word boxes (--layout): its text, its cells and the page column of each cell.
+
+    The text is the cells joined by two spaces, so the text heuristics still apply; option
+    splitting uses the cells directly. A column is -1 for a cell outside every page column.
+    """
+
+    def __new__(cls, cells: list[str], columns: list[int], page: int):
+        line = super().__new__(cls, "  ".join(cells))
+        line.cells = tuple(cells)
+        line.columns = tuple(columns)
+        line.page = page
+        return line
+
+    def __getnewargs__(self):
+        return list(self.cells), list(self.columns), self.page
+
+
+def layout_rows(words: list[dict]) -> list[list[dict]]:
+    """Group word boxes into rows, top to bottom, each sorted left to right.
+
+    One sweep over the words sorted by top: a word joins the current row while its vertical
+    center is above the row's bottom.
+    """
+    rows: list[list[dict]] = []
+    bottom = None
+    for w in sorted(words, key=lambda w: (w["top"], w["x0"])):
+        if bottom is None or (w["top"] + w["bottom"]) / 2 > bottom:
+            rows.append([])
+            bottom = w["bottom"]
+        rows[-1].append(w)
+        bottom = max(bottom, w["bottom"])
+    for row in rows:
+        row.sort(key=lambda w: w["x0"])
+    return rows
+
+
+def row_cells(row: list[dict], gap: float = LAYOUT_GAP) -> list[tuple[str, float, float]]:
+    """(text, x0, x1) of the runs of words of a row separated by more than gap word heights."""
+    heights = sorted(w["bottom"] - w["top"] for w in row)
+    min_gap = gap * heights[len(heights) // 2]
+    cells: list[list] = []
+    for w in row:
+        if cells and w["x0"] - cells[-1][2] <= min_gap:
+            cells[-1][0].append(w["text"])
+            cells[-1][2] = max(cells[-1][2], w["x1"])
+        else:
+            cells.append([[w["text"]], w["x0"], w["x1"]])
+    return [(" ".join(texts), x0, x1) for texts, x0, x1 in cells]
+
+
+def page_columns(rows_cells: list[list[tuple[str, float, float]]]) -> list[tuple[float, float]]:
+    """Column intervals of a page: the x-extents of every cell after the first of a row, merged
+    where they overlap (one sweep over the intervals sorted by x0)."""
+    spans = sorted((x0, x1) for cells in rows_cells for _, x0, x1 in cells[1:])
+    columns: list[list[float]] = []
+    for x0, x1 in spans:
+        if columns and x0 <= columns[-1][1]:
+            columns[-1][1] = max(columns[-1][1], x1)
+        else:
+            columns.append([x0, x1])
+    return [(x0, x1) for x0, x1 in columns]
+
+
+def layout_lines(words: list[dict], page: int, gap: float = LAYOUT_GAP) -> list[LayoutLine]:
+    """LayoutLines of one page from its pdfplumber words (dicts with text, x0, x1, top, bottom)."""
+    rows_cells = [row_cells(row, gap) for row in layout_rows(words)]
+    columns = page_columns(rows_cells)
+    starts = [x0 for x0, _ in columns]
+    lines = []
+    for cells in rows_cells:
+        indices = []
+        for _, x0, x1 in cells:
+            center = (x0 + x1) / 2
+            i = bisect.bisect_right(starts, center) - 1
+            indices.append(i if i >= 0 and center <= columns[i][1] else -1)
+        lines.append(LayoutLine([text for text, _, _ in cells], indices, page))
+    return lines
+
+
+def read_layout_from_pdf(pdf_path: Path, gap: float = LAYOUT_GAP, doc: PdfDocument | None = None) -> list[LayoutLine]:
+    """Lines of a PDF rebuilt from pdfplumber word boxes (extract_words once per page), see --layout."""
+    lines: list[LayoutLine] = []
+    with (nullcontext(doc) if doc is not None else PdfDocument(pdf_path, "pdfplumber")) as doc:
+        for i in range(1, doc.page_count + 1):
+            with stage_timing.stage("words_extract", file=pdf_path, page=i):
+                words = doc.words(i - 1, x_tolerance=2, y_tolerance=2)
+            with stage_timing.stage("layout", file=pdf_path, page=i):
+                lines.extend(layout_lines(words, i, gap))
+    return lines
+
+
 def read_text(input_path: Path) -> str:
     if input_path.suffix.lower() == ".txt":
-        return input_path.read_text(encoding="utf-8", errors="ignore")
+        with stage_timing.stage("read", file=input_path) as timing:
+            text = input_path.read_text(encoding="utf-8", errors="ignore")
+            timing["bytes"] = len(text.encode("utf-8"))
+        return text
     if input_path.suffix.lower() == ".pdf":
         return read_text_from_pdf(input_path)
     raise ValueError(f"Unsupported input: {input_path}")
 
 
 def normalize_lines(text: str) -> list[str]:
-    raw_lines = [ln.rstrip("\n\r") for ln in text.splitlines()]
+    return clean_lines(text.splitlines())
+
+
+def clean_lines(raw_lines: list[str]) -> list[str]:
+    """normalize_lines() for text already split into lines (e.g. read from a corpus store)."""
+    raw_lines = [ln.rstrip("\n\r") for ln in raw_lines]
     lines: list[str] = []
     for ln in raw_lines:
         # Skip page markers inserted by OCR script
-        if re.match(r"^===== PAGE \d+ =====$", ln.strip()):
+        if PAGE_MARKER_RE.match(ln.strip()):
             continue
         # Keep original spacing as much as possible (useful to detect columns/options)
         ln = ln.replace("\t", "    ")
@@ -78,37 +263,107 @@ def normalize_lines(text: str) -> list[str]:
 
 def slugify(s: str) -> str:
     s = s.lower()
-    s = re.sub(r"[^a-z0-9]+", "-", s)
+    s = SLUG_RE.sub("-", s)
     s = re.sub(r"-+", "-", s).strip("-")
     return s or "item"
 
 
-def parse_text(lines: list[str]) -> dict:
-    data = {
-        "title": None,
-        "sections": []
-    }
-    current_section = None
-    current_question = None
-    pending_option_lines: list[str] = []
+def is_breaker(ln: str) -> bool:
+    if not ln:
+        return False
+    low = ln.lower()
+    return any(b in low for b in _SCORE_BREAKERS_LOW)
+
+
+def is_numeric_row(ln: str) -> bool:
+    # Matches rows with only digits separated by spaces/pipes (e.g., "0  1  2  3  4")
+    return bool(NUMERIC_ROW_RE.match(ln))
 
-    def start_section(title: str):
-        nonlocal current_section, current_question, pending_option_lines
-        if current_section:
+
+def is_option_header_like(ln: str) -> bool:
+    if not ln or '?' in ln:
+        return False
+    if is_breaker(ln) or SECTION_RE.match(ln):
+        return False
+    if is_numeric_row(ln):
+        return False
+    # OCR often produces rows with many spaces between tokens or pipes (Jamais | Rarement | ...)
+    if '|' in ln:
+        return True
+    if isinstance(ln, LayoutLine):
+        return len(ln.cells) >= 3
+    # Count sequences of 2+ spaces (column gaps)
+    return len(COLUMN_GAP_RE.findall(ln)) >= 2
+
+
+def split_options(ln: str, normalizer: LikertNormalizer | None = None) -> list[str]:
+    normalizer = normalizer or likert_normalizer
+    # First split by pipe if present, else by 2+ spaces
+    if '|' in ln:
+        parts = [p.strip() for p in ln.split('|')]
+    elif isinstance(ln, LayoutLine):
+        parts = list(ln.cells)
+    else:
+        parts = [p.strip() for p in COLUMN_GAP_RE.split(ln) if p.strip()]
+    cleaned = []
+    for p in parts:
+        # Strip leading bullets/dashes
+        p = LEADING_BULLET_RE.sub("", p)
+        # Strip trailing isolated digits (score columns)
+        p = TRAILING_NUMBER_RE.sub("", p).strip()
+        # Strip leading/trailing punctuation noise
+        p = p.strip("- •–*:;.,")
+        if not p or len(p) <= 1:
+            continue
+        # remove trailing "Votre score" token often glued at end
+        if p.lower().startswith("votre score"):
+            continue
+        # Skip very short fragments that are likely OCR noise
+        if len(p) <= 2 and not p.isalpha():
+            continue
+        # Normalize common French Likert options to standard forms
+        cleaned.append(normalizer.normalize(p))
+    # Dedup while preserving order
+    seen = set()
+    result = []
+    for c in cleaned:
+        if c.lower() not in seen:
+            seen.add(c.lower())
+            result.append(c)
+    return result
+
+
+class _QuestionnaireBuilder:
+    """Accumulates sections and questions while parse_text walks the lines."""
+
+    def __init__(self, normalizer: LikertNormalizer):
+        self.normalizer = normalizer
+        self.data = {
+            "title": None,
+            "sections": []
+        }
+        self.current_section = None
+        self.current_question = None
+        self.pending_option_lines: list[str] = []
+        # --layout: last option header row, reused by the question rows aligned under it
+        self.grid_header: LayoutLine | None = None
+
+    def start_section(self, title: str):
+        if self.current_section:
             # finalize any open question
-            if current_question:
-                current_section["questions"].append(current_question)
-                current_question = None
-            data["sections"].append(current_section)
-        current_section = {"title": title, "questions": []}
-        pending_option_lines = []
-
-    def start_question(q_label: str):
-        nonlocal current_question, pending_option_lines
+            if self.current_question:
+                self.current_section["questions"].append(self.current_question)
+                self.current_question = None
+            self.data["sections"].append(self.current_section)
+        self.current_section = {"title": title, "questions": []}
+        self.pending_option_lines = []
+        self.grid_header = None
+
+    def start_question(self, q_label: str):
         # close previous
-        if current_question:
-            current_section["questions"].append(current_question)
-        current_question = {
+        if self.current_question:
+            self.current_section["questions"].append(self.current_question)
+        self.current_question = {
             "id": slugify(q_label)[:64],
             "label": q_label,
             "type": "select",  # default guess; manual fix later if needed
@@ -116,86 +371,35 @@ def parse_text(lines: list[str]) -> dict:
             "rawOptions": []
         }
         # If we buffered option header lines before the question (common OCR artifact), attach them now
-        for ol in pending_option_lines:
-            for opt in split_options(ol):
-                current_question["rawOptions"].append(opt)
-                current_question["options"].append(opt)
-        pending_option_lines = []
+        for ol in self.pending_option_lines:
+            self.add_split_options(ol)
+            if isinstance(ol, LayoutLine):
+                self.grid_header = ol
+        self.pending_option_lines = []
 
-    def is_breaker(ln: str) -> bool:
-        low = ln.lower()
-        if not ln:
-            return False
-        return any(b.lower() in low for b in SCORE_BREAKERS)
-
-    def is_numeric_row(ln: str) -> bool:
-        # Matches rows with only digits separated by spaces/pipes (e.g., "0  1  2  3  4")
-        return bool(re.match(r"^\s*(?:[0-9]+[\s|]+){2,}[0-9]+\s*$", ln))
-
-    def is_option_header_like(ln: str) -> bool:
-        if not ln or '?' in ln:
-            return False
-        if is_breaker(ln) or SECTION_RE.match(ln):
-            return False
-        if is_numeric_row(ln):
-            return False
-        # OCR often produces rows with many spaces between tokens or pipes (Jamais | Rarement | ...)
-        if '|' in ln:
-            return True
-        # Count sequences of 2+ spaces (column gaps)
-        return len(re.findall(r"\s{2,}", ln)) >= 2
-
-    def split_options(ln: str) -> list[str]:
-        # First split by pipe if present, else by 2+ spaces
-        if '|' in ln:
-            parts = [p.strip() for p in ln.split('|')]
-        else:
-            parts = [p.strip() for p in re.split(r"\s{2,}", ln) if p.strip()]
-        cleaned = []
-        for p in parts:
-            # Strip leading bullets/dashes
-            p = re.sub(r"^[\-•–*o]\s*", "", p)
-            # Strip trailing isolated digits (score columns)
-            p = re.sub(r"\s+[0-9]+\s*$", "", p).strip()
-            # Strip leading/trailing punctuation noise
-            p = p.strip("- •–*:;.,")
-            if not p or len(p) <= 1:
-                continue
-            # remove trailing "Votre score" token often glued at end
-            if p.lower().startswith("votre score") or p.lower() == "votre score":
-                continue
-            # Skip very short fragments that are likely OCR noise
-            if len(p) <= 2 and not p.isalpha():
-                continue
-            # Normalize common French Likert options to standard forms
-            p_low = p.lower()
-            if "jamais" in p_low and len(p) < 10:
-                p = "Jamais"
-            elif "rarement" in p_low and len(p) < 12:
-                p = "Rarement"
-            elif "occasionnelle" in p_low and len(p) < 20:
-                p = "Occasionnellement"
-            elif "fréquemment" in p_low or "fréquemment" in p_low and len(p) < 18:
-                p = "Fréquemment"
-            elif "toujours" in p_low and len(p) < 12:
-                p = "Toujours"
-            elif "pas du tout" in p_low and len(p) < 15:
-                p = "Pas du tout"
-            elif "plutôt" in p_low and "satisfaisant" in p_low:
-                p = "Plutôt satisfaisant"
-            elif "tout à fait" in p_low and "satisfaisant" in p_low:
-                p = "Tout à fait satisfaisant"
-            elif "excellent" in p_low and len(p) < 12:
-                p = "Excellent"
-            cleaned.append(p)
-        # Dedup while preserving order
-        seen = set()
-        result = []
-        for c in cleaned:
-            if c.lower() not in seen:
-                seen.add(c.lower())
-                result.append(c)
-        return result
+    def add_split_options(self, ln: str):
+        for opt in split_options(ln, self.normalizer):
+            self.current_question["rawOptions"].append(opt)
+            self.current_question["options"].append(opt)
+
+    def add_grid_options(self, row: LayoutLine):
+        """Options of the header row when the answer cells of this question row sit under its columns."""
+        header = self.grid_header
+        marks = {c for c in row.columns[1:] if c >= 0}
+        if header is not None and marks and marks <= set(header.columns) and not self.current_question["options"]:
+            self.add_split_options(header)
+
+    def finish(self) -> dict:
+        if self.current_question and self.current_section:
+            self.current_section["questions"].append(self.current_question)
+        if self.current_section:
+            self.data["sections"].append(self.current_section)
+        return self.data
+
+
+def parse_text(lines: list[str], normalizer: LikertNormalizer | None = None) -> dict:
+    b = _QuestionnaireBuilder(normalizer or likert_normalizer)
+    data = b.data
 
     for ln in lines:
         # Title: pick explicit questionnaire title if present
@@ -210,27 +414,34 @@ def parse_text(lines: list[str]) -> dict:
             continue
         # Section (e.g., "Votre sommeil")
         if SECTION_RE.match(ln) and len(ln) > 3:
-            start_section(re.sub(r"\s+", " ", ln).strip())
+            b.start_section(WHITESPACE_RE.sub(" ", ln).strip())
             continue
         # Option header that may precede a question line (due to OCR reordering)
-        if is_option_header_like(ln) and current_question is None:
-            pending_option_lines.append(ln)
+        if b.current_question is None and is_option_header_like(ln):
+            b.pending_option_lines.append(ln)
+            continue
+        # Question row of a grid (--layout): question text, then answer cells under the header columns
+        if isinstance(ln, LayoutLine) and len(ln.cells) > 1 and (
+                QUESTION_MARK_RE.search(ln.cells[0]) or QUESTION_START_RE.match(ln.cells[0])):
+            b.start_question(WHITESPACE_RE.sub(" ", ln.cells[0]).strip())
+            b.add_grid_options(ln)
             continue
         # Start of question: line ending with a question mark or typical French question lead-in
         if QUESTION_MARK_RE.search(ln) or QUESTION_START_RE.match(ln):
-            start_question(re.sub(r"\s+", " ", ln).strip())
+            b.start_question(WHITESPACE_RE.sub(" ", ln).strip())
             continue
         # Question with leading number (fallback)
         m_q = QUESTION_NUM_RE.match(ln)
         if m_q:
-            start_question(m_q.group(2))
+            b.start_question(m_q.group(2))
             continue
         # Bullet option
         m_b = BULLET_RE.match(ln)
+        current_question = b.current_question
         if m_b and current_question is not None:
             opt = m_b.group(2).strip()
             # strip trailing isolated digits commonly mis-OCR'd as inline scores
-            opt = re.sub(r"\s+[0-9]+\s*$", "", opt).strip()
+            opt = TRAILING_NUMBER_RE.sub("", opt).strip()
             if opt and len(opt) > 2:
                 current_question["rawOptions"].append(opt)
                 current_question["options"].append(opt)
@@ -242,49 +453,220 @@ def parse_text(lines: list[str]) -> dict:
                 continue
             # Option-like lines within a question: split into tokens
             if is_option_header_like(ln):
-                for opt in split_options(ln):
-                    current_question["rawOptions"].append(opt)
-                    current_question["options"].append(opt)
+                b.add_split_options(ln)
                 continue
             # Heuristic: treat short non-empty lines (that don't look like sections) as options, but avoid numeric-only rows
             if not SECTION_RE.match(ln) and not is_numeric_row(ln):
-                txt = re.sub(r"\s+[0-9]+\s*$", "", ln).strip("- •–*").strip()
+                txt = TRAILING_NUMBER_RE.sub("", ln).strip("- •–*").strip()
                 if txt and len(txt) > 2 and txt != current_question["label"] and not txt.lower().startswith("votre score"):
                     current_question["options"].append(txt)
                 continue
         else:
             # If not inside a question and see a likely options header, buffer it
             if is_option_header_like(ln):
-                pending_option_lines.append(ln)
+                b.pending_option_lines.append(ln)
                 continue
         # Otherwise ignore line
 
     # finalize
-    if current_question and current_section:
-        current_section["questions"].append(current_question)
-    if current_section:
-        data["sections"].append(current_section)
+    return b.finish()
+
+
+INPUT_SUFFIXES = (".txt", ".pdf")
+
+
+def expand_inputs(specs: list[str], suffixes: tuple[str, ...] = INPUT_SUFFIXES) -> list[Path]:
+    """Resolve --input values (files, directories, glob patterns) to a sorted, de-duplicated file list."""
+    files: list[Path] = []
+    for spec in specs:
+        path = Path(spec)
+        if path.is_dir():
+            files.extend(p for p in sorted(path.rglob("*")) if p.suffix.lower() in suffixes)
+        elif glob.has_magic(spec):
+            files.extend(Path(p) for p in sorted(glob.glob(spec, recursive=True)) if Path(p).is_file())
+        else:
+            files.append(path)
+    seen = set()
+    return [p for p in files if not (p in seen or seen.add(p))]
+
+
+def parse_to_json(inp: Path, out: Path, normalizer: LikertNormalizer | None = None, layout: bool = False) -> dict:
+    """Read, parse and write one input to `out`, timing each stage; returns the parsed data.
+
+    With layout, PDF inputs are read with read_layout_from_pdf instead of as text.
+    """
+    if layout and inp.suffix.lower() == ".pdf":
+        return write_parsed(read_layout_from_pdf(inp), out, normalizer, inp)
+    text = read_text(inp)
+    with stage_timing.stage("normalize", file=inp):
+        lines = normalize_lines(text)
+    return write_parsed(lines, out, normalizer, inp)
+
+
+def write_parsed(lines: list[str], out: Path, normalizer: LikertNormalizer | None, source) -> dict:
+    with stage_timing.stage("parse", file=source):
+        data = parse_text(lines, normalizer)
+    with stage_timing.stage("json_write", file=source) as timing:
+        payload = json.dumps(data, ensure_ascii=False, indent=2)
+        out.write_text(payload, encoding="utf-8")
+        timing["bytes"] = len(payload.encode("utf-8"))
     return data
 
 
+def parse_document(corpus: Corpus, name: str, outdir: Path, normalizer: LikertNormalizer | None = None) -> dict:
+    """Parse one document of a corpus store (see corpus_store.py), like parse_file."""
+    out = outdir / f"{slugify(PurePosixPath(name).name)}.json"
+
+    def convert() -> dict:
+        with stage_timing.stage("read", file=name, bytes=corpus.size(name)):
+            raw_lines = corpus.lines(name)
+        with stage_timing.stage("normalize", file=name):
+            lines = clean_lines(raw_lines)
+        return write_parsed(lines, out, normalizer, name)
+
+    return summary_record(f"{corpus.path}:{name}", out, convert)
+
+
+def parse_file(inp: Path, outdir: Path, normalizer: LikertNormalizer | None = None, layout: bool = False) -> dict:
+    """Parse one input into <outdir>/<slug>.json; returns a summary record (never raises)."""
+    out = outdir / f"{slugify(inp.stem)}.json"
+    return summary_record(str(inp), out, lambda: parse_to_json(inp, out, normalizer, layout))
+
+
+def summary_record(label: str, out: Path, convert) -> dict:
+    """Run convert() (which returns the parsed data) and summarize it, catching any error."""
+    start = time.perf_counter()
+    record = {"input": label, "output": str(out), "sections": 0, "questions": 0, "error": None}
+    try:
+        data = convert()
+        record["sections"] = len(data["sections"])
+        record["questions"] = sum(len(sec["questions"]) for sec in data["sections"])
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = round(time.perf_counter() - start, 4)
+    return record
+
+
+_corpora: dict[str, Corpus] = {}
+
+
+def open_corpus(path: str) -> Corpus:
+    """Corpus store opened once per process (worker processes map it on their first job)."""
+    if path not in _corpora:
+        _corpora[path] = Corpus(Path(path))
+    return _corpora[path]
+
+
+def _parse_file_job(job: tuple[Path | str, Path, LikertNormalizer | None, bool, str | None, bool]) -> dict:
+    inp, outdir, normalizer, trace, corpus_path, layout = job
+    if trace:
+        stage_timing.enable()
+    if corpus_path is None:
+        record = parse_file(inp, outdir, normalizer, layout)
+    else:
+        record = parse_document(open_corpus(corpus_path), inp, outdir, normalizer)
+    if trace:
+        record["events"] = stage_timing.collect()
+    return record
+
+
+def run_batch(inputs: list[Path] | list[str], outdir: Path, workers: int = 1, normalizer: LikertNormalizer | None = None,
+              corpus_path: Path | None = None, layout: bool = False) -> list[dict]:
+    """Parse all inputs, in this process or across a process pool; records follow input order.
+
+    With corpus_path, inputs are the names of documents of that corpus store. With layout,
+    PDF inputs are parsed from word boxes (see read_layout_from_pdf).
+    """
+    corpus_path = str(corpus_path) if corpus_path is not None else None
+    if workers <= 1:
+        return [_parse_file_job((inp, outdir, normalizer, False, corpus_path, layout)) for inp in inputs]
+    # Worker processes send their stage timings back in their records
+    jobs = [(inp, outdir, normalizer, stage_timing.is_enabled(), corpus_path, layout) for inp in inputs]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        records = list(pool.map(_parse_file_job, jobs))
+    for record in records:
+        stage_timing.merge(record.pop("events", []))
+    return records
+
+
+def select_documents(corpus: Corpus, patterns: list[str] | None) -> list[str]:
+    """Names of the corpus documents matching any of the glob patterns (all documents if none)."""
+    names = sorted(corpus.names())
+    if not patterns:
+        return names
+    return [name for name in names if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)]
+
+
+def print_summary(records: list[dict], wall_seconds: float):
+    failures = [r for r in records if r["error"]]
+    print(f"\n{'seconds':>8} {'questions':>9}  input")
+    for r in records:
+        status = f"FAILED ({r['error']})" if r["error"] else ""
+        print(f"{r['seconds']:8.3f} {r['questions']:9d}  {r['input']} {status}")
+    print(f"\nParsed {len(records) - len(failures)}/{len(records)} file(s), "
+          f"{sum(r['questions'] for r in records)} questions, {wall_seconds:.2f}s wall time")
+
+
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--input", required=True, help="PDF or TXT path")
+    ap.add_argument("--input", nargs="+", help="PDF or TXT path(s), directories or glob patterns; "
+                                                 "with --corpus, glob patterns of document names (default: all)")
+    ap.add_argument("--corpus", help="Parse documents of this corpus store (see corpus_store.py) instead of files")
     ap.add_argument("--outdir", required=True, help="Output directory for JSON")
+    ap.add_argument("--workers", type=int, default=1, help="Worker processes for batch mode (default: 1, in-process)")
+    ap.add_argument("--summary", help="Also write the per-file summary (timings, question counts, errors) to this JSON file")
+    ap.add_argument("--likert-table", help="JSON synonym table replacing the built-in Likert option normalization")
+    ap.add_argument("--layout", action="store_true",
+                    help="Parse PDF inputs from pdfplumber word boxes (rows/columns by geometry) instead of extracted text")
+    stage_timing.add_arguments(ap)
     args = ap.parse_args()
+    if not args.input and not args.corpus:
+        ap.error("--input or --corpus is required")
+    with stage_timing.instrumented(args):
+        return run(args)
+
+
+def run(args: argparse.Namespace) -> int:
+    normalizer = LikertNormalizer(load_likert_table(args.likert_table)) if args.likert_table else None
 
-    inp = Path(args.input)
     outdir = Path(args.outdir)
     outdir.mkdir(parents=True, exist_ok=True)
 
-    text = read_text(inp)
-    lines = normalize_lines(text)
-    data = parse_text(lines)
+    if args.corpus:
+        with Corpus(Path(args.corpus)) as corpus:
+            inputs = select_documents(corpus, args.input)
+        if not inputs:
+            print(f"No document matching {' '.join(args.input or ['*'])} in {args.corpus}", file=sys.stderr)
+            return 1
+        stems = [PurePosixPath(name).name for name in inputs]
+    else:
+        inputs = expand_inputs(args.input)
+        if len(inputs) == 1 and len(args.input) == 1 and Path(args.input[0]).is_file():
+            inp = inputs[0]
+            slug = slugify(inp.stem)
+            out = outdir / f"{slug}.json"
+            parse_to_json(inp, out, normalizer, args.layout)
+            print(f"Written: {out}")
+            return 0
+
+        if not inputs:
+            print(f"No .txt/.pdf input found in: {' '.join(args.input)}", file=sys.stderr)
+            return 1
+        stems = [inp.stem for inp in inputs]
+    outputs: dict[str, Path | str] = {}
+    for inp, stem in zip(inputs, stems):
+        slug = slugify(stem)
+        if slug in outputs:
+            print(f"Warning: {inp} and {outputs[slug]} both write {slug}.json (last one wins)", file=sys.stderr)
+        outputs[slug] = inp
 
-    slug = slugify(inp.stem)
-    out = outdir / f"{slug}.json"
-    out.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"Written: {out}")
+    start = time.perf_counter()
+    records = run_batch(inputs, outdir, args.workers, normalizer, args.corpus, args.layout)
+    print_summary(records, time.perf_counter() - start)
+    if args.summary:
+        Path(args.summary).write_text(json.dumps(records, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 1 if any(r["error"] for r in records) else 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+One handle per PDF, shared by the extraction stages of a run.
+
+PdfDocument maps the file once (read-only mmap) and parses it with each PDF library at
+most once, on first use:
+
+  text    page_text(i): text layer of the backend chosen when opening
+          (pdfplumber, pymupdf or pypdf2)
+  words   words(i): word boxes {text, x0, x1, top, bottom} (pdfplumber, or PyMuPDF for
+          the pymupdf backend)
+  raster  fitz_page(i): PyMuPDF page, for ocr_pdf_pymupdf.render_page / render_regions
+  meta    page_count, size, and sha256 hashed from the mapping (for the extraction caches)
+
+Page texts and words are kept on the handle. A stage that comes back to a page (cache
+lookup, text, OCR of the pages without usable text, page count for the .meta.json) does
+not read or parse the PDF again. pdfplumber and PyPDF2 read from their own view of the
+mapping. PyMuPDF is opened by path, because it cannot parse from an mmap without copying
+it first.
+
+Used by extract_questionnaires.py, extract-pdf-text.py, extract_pdf_hybrid.py,
+ocr_pdf_pymupdf.py, parse_questionnaires.py and questionnaire_pipeline.py.
+
+Usage:
+    with PdfDocument(path, "pdfplumber") as doc:
+        digest = doc.sha256
+        pages = [doc.page_text(i) for i in range(doc.page_count)]
+"""
+
+import hashlib
+import mmap
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import stage_timing
+
+BACKENDS = ("pdfplumber", "pymupdf", "pypdf2")
+_DISTRIBUTIONS = {"pdfplumber": "pdfplumber", "pymupdf": "pymupdf", "pypdf2": "PyPDF2"}
+
+
+def _import(backend: str):
+    try:
+        if backend == "pdfplumber":
+            import pdfplumber
+            return pdfplumber
+        if backend == "pymupdf":
+            import fitz
+            return fitz
+        import PyPDF2
+        return PyPDF2
+    except ImportError:
+        raise RuntimeError(f"{_DISTRIBUTIONS[backend]} not installed. Install with: pip install {_DISTRIBUTIONS[backend]}")
+
+
+class PdfDocument:
+    """A PDF opened once: see module docstring. Use as a context manager, or call close()."""
+
+    def __init__(self, path, backend: str = "pdfplumber"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown PDF backend {backend!r} (expected one of {', '.join(BACKENDS)})")
+        self.path = Path(path)
+        self.backend = backend
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{self.path} is empty")
+        self._views: List[mmap.mmap] = []
+        self._sha256: Optional[str] = None
+        self._plumber = None
+        self._fitz = None
+        self._pypdf2 = None
+        self._texts: Dict[tuple, str] = {}
+        self._words: Dict[tuple, List[Dict]] = {}
+
+    def __enter__(self) -> "PdfDocument":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._plumber is not None:
+            self._plumber.close()
+            self._plumber = None
+        if self._fitz is not None:
+            self._fitz.close()
+            self._fitz = None
+        self._pypdf2 = None
+        for view in self._views + [self._map]:
+            try:
+                view.close()
+            except BufferError:
+                pass  # still referenced by a parser object; released with it
+        self._views = []
+        self._file.close()
+
+    def _view(self) -> mmap.mmap:
+        """A mapping of the file with its own read position, for a parser reading it as a stream."""
+        view = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views.append(view)
+        return view
+
+    @property
+    def size(self) -> int:
+        return len(self._map)
+
+    @property
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self._map).hexdigest()
+        return self._sha256
+
+    @property
+    def plumber(self):
+        """The pdfplumber PDF, opened on first use."""
+        if self._plumber is None:
+            pdfplumber = _import("pdfplumber")
+            with stage_timing.stage("pdf_open", file=self.path, backend="pdfplumber"):
+                self._plumber = pdfplumber.open(self._view())
+        return self._plumber
+
+    @property
+    def fitz(self):
+        """The PyMuPDF document, opened on first use."""
+        if self._fitz is None:
+            fitz = _import("pymupdf")
+            with stage_timing.stage("pdf_open", file=self.path, backend="pymupdf"):
+                self._fitz = fitz.open(str(self.path))
+        return self._fitz
+
+    @property
+    def pypdf2(self):
+        """The PyPDF2 reader, opened on first use."""
+        if self._pypdf2 is None:
+            PyPDF2 = _import("pypdf2")
+            with stage_timing.stage("pdf_open", file=self.path, backend="pypdf2"):
+                self._pypdf2 = PyPDF2.PdfReader(self._view())
+        return self._pypdf2
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages, from whichever library already parsed the file (the text backend otherwise)."""
+        if self._plumber is not None or (self.backend == "pdfplumber" and self._fitz is None and self._pypdf2 is None):
+            return len(self.plumber.pages)
+        if self._fitz is not None or (self.backend == "pymupdf" and self._pypdf2 is None):
+            return len(self.fitz)
+        return len(self.pypdf2.pages)
+
+    def page_text(self, index: int, **options) -> str:
+        """Text layer of page `index` (0-based) with the text backend; options go to pdfplumber's extract_text."""
+        key = (index, tuple(sorted(options.items())))
+        text = self._texts.get(key)
+        if text is None:
+            if self.backend == "pdfplumber":
+                text = self.plumber.pages[index].extract_text(**options) or ""
+            elif self.backend == "pymupdf":
+                text = self.fitz[index].get_text()
+            else:
+                text = self.pypdf2.pages[index].extract_text() or ""
+            self._texts[key] = text
+        return text
+
+    def page_texts(self) -> List[str]:
+        return [self.page_text(i) for i in range(self.page_count)]
+
+    def words(self, index: int, **options) -> List[Dict]:
+        """Word boxes of page `index` (0-based): dicts with text, x0, x1, top and bottom in PDF points.
+
+        pdfplumber's extract_words (options are passed to it), or PyMuPDF's words for the
+        pymupdf backend.
+        """
+        key = (index, tuple(sorted(options.items())))
+        words = self._words.get(key)
+        if words is None:
+            if self.backend == "pymupdf":
+                words = [{"text": w[4], "x0": w[0], "x1": w[2], "top": w[1], "bottom": w[3]}
+                         for w in self.fitz[index].get_text("words")]
+            else:
+                words = self.plumber.pages[index].extract_words(**options)
+            self._words[key] = words
+        return words
+
+    def fitz_page(self, index: int):
+        """PyMuPDF page `index` (0-based), for rasterization."""
+        return self.fitz[index]
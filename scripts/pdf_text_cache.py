@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Persistent, content-addressed cache for the PDF -> text extraction stage.
+
+Each entry holds the extracted page texts of one PDF and is keyed on the SHA-256 of the
+PDF bytes plus an extractor signature (library name, version and options such as the
+x/y tolerances). A manifest remembers (size, mtime) and the content hash of every source
+file, so an unchanged file is recognised from a single stat() call without re-hashing.
+
+Layout:
+  <cache_dir>/manifest.json
+  <cache_dir>/objects/ab/abcdef....json   {"pages": ["page 1 text", ...]}
+
+Used by extract-pdf-text.py and extract_questionnaires.py.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+CACHE_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def extractor_signature(name: str, version: str, options: Optional[Dict] = None) -> str:
+    """Build the stable string identifying an extractor configuration."""
+    return json.dumps(
+        {"format": CACHE_FORMAT, "extractor": name, "version": version, "options": options or {}},
+        sort_keys=True,
+    )
+
+
+class ExtractionCache:
+    """On-disk cache of extracted page texts, see module docstring.
+
+    With force=True lookups always miss, but fresh results are still stored.
+    Call save() once the run is over to persist the manifest.
+    """
+
+    def __init__(self, cache_dir: Path, force: bool = False):
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / "objects"
+        self.manifest_path = self.cache_dir / MANIFEST_NAME
+        self.force = force
+        self.hits = 0
+        self.misses = 0
+        self._files: Dict[str, Dict] = self._load_manifest()
+        self._dirty = False
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("format") != CACHE_FORMAT:
+            return {}
+        return manifest.get("files", {})
+
+    @staticmethod
+    def _source_key(pdf_path: Path) -> str:
+        return Path(pdf_path).resolve().as_posix()
+
+    def _file_entry(self, pdf_path: Path, digest: Optional[Callable[[], str]] = None) -> Dict:
+        """Return the manifest entry of a source file, re-hashing it only if it changed on disk.
+
+        digest, if given, returns the SHA-256 of the file without reading it again (e.g. from
+        an open pdf_document.PdfDocument).
+        """
+        source = self._source_key(pdf_path)
+        st = os.stat(pdf_path)
+        entry = self._files.get(source)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry
+        sha = digest() if digest is not None else file_sha256(pdf_path)
+        if entry is None or entry["sha256"] != sha:
+            entry = {"sha256": sha, "objects": {}}
+        entry["size"] = st.st_size
+        entry["mtime_ns"] = st.st_mtime_ns
+        self._files[source] = entry
+        self._dirty = True
+        return entry
+
+    def _object_path(self, key: str) -> Path:
+        return self.objects_dir / key[:2] / f"{key}.json"
+
+    def get(self, pdf_path: Path, signature: str, digest: Optional[Callable[[], str]] = None) -> Optional[List[str]]:
+        """Return the cached page texts of pdf_path for this extractor, or None on a miss."""
+        if self.force:
+            self.misses += 1
+            return None
+        key = self._file_entry(pdf_path, digest)["objects"].get(signature)
+        if key is not None:
+            try:
+                pages = json.loads(self._object_path(key).read_text(encoding="utf-8"))["pages"]
+                self.hits += 1
+                return pages
+            except (OSError, ValueError, KeyError):
+                pass
+        self.misses += 1
+        return None
+
+    def put(self, pdf_path: Path, signature: str, pages: List[str], digest: Optional[Callable[[], str]] = None) -> None:
+        """Store the page texts extracted from pdf_path with the given extractor."""
+        entry = self._file_entry(pdf_path, digest)
+        key = hashlib.sha256(f"{entry['sha256']}\0{signature}".encode("utf-8")).hexdigest()
+        path = self._object_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"pages": pages}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+        entry["objects"][signature] = key
+        self._dirty = True
+
+    def prune(self, root: Path) -> int:
+        """Forget source files under root that no longer exist and delete unreferenced objects.
+
+        Returns the number of object files removed.
+        """
+        prefix = self._source_key(root).rstrip("/") + "/"
+        for source in list(self._files):
+            if source.startswith(prefix) and not os.path.exists(source):
+                del self._files[source]
+                self._dirty = True
+        referenced = {key for entry in self._files.values() for key in entry["objects"].values()}
+        removed = 0
+        if self.objects_dir.exists():
+            for path in self.objects_dir.glob("*/*.json"):
+                if path.stem not in referenced:
+                    path.unlink()
+                    removed += 1
+        return removed
+
+    def save(self) -> None:
+        """Write the manifest atomically if anything changed."""
+        if not self._dirty:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"format": CACHE_FORMAT, "files": self._files}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+        self._dirty = False
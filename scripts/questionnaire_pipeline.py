@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the questionnaire pipeline: extract -> parse -> review.
+
+Each subcommand runs one stage of the existing scripts. `run` chains all the stages in one
+process and hands the extracted text and the parsed questionnaire from stage to stage in
+memory. Only the final JSON and review markdown are written, plus the intermediate .txt
+files when --keep-intermediates is given.
+
+  extract   PDF -> <slug>.txt
+  parse     .txt/.pdf -> <slug>.json               (parse_questionnaires.py)
+  convert   Mode de vie .md -> mode-de-vie-clean.json (convert_mode_de_vie_to_json.py)
+  review    .json -> <stem>-review.md              (generate_review_markdown.py)
+  run       .pdf/.txt/.md -> <slug>.json + <slug>-review.md
+
+Output names follow output_names(), which watch_questionnaires.py uses too: <slug> is the
+slugified source stem, and the markdown structures convert_mode_de_vie_to_json.py handles
+(its OUTPUT_NAMES) keep the names that script is run with. Other .md files are skipped.
+Each file is reported with its stage durations, recorded by stage_timing.py (which also
+provides --trace/--timings/--profile).
+
+PDF text extraction methods (--method):
+  pdfplumber  pdfplumber text layer, as parse_questionnaires.py reads PDFs (default)
+  text        PyPDF2 text layer, as extract-pdf-text.py
+  hybrid      PyMuPDF text layer, Tesseract OCR for pages without usable text (extract_pdf_hybrid.py)
+  ocr         Tesseract OCR of every page (ocr_pdf_pymupdf.py rendering/preprocessing)
+
+Usage:
+  python scripts/questionnaire_pipeline.py run data/questionnaires/raw --outdir data/questionnaires/generated
+  python scripts/questionnaire_pipeline.py run "data/questionnaires/raw/Mode de vie" --method hybrid --keep-intermediates data/questionnaires/extracted
+  python scripts/questionnaire_pipeline.py extract data/questionnaires/raw --outdir data/questionnaires/extracted --method ocr
+  python scripts/questionnaire_pipeline.py parse data/questionnaires/extracted --outdir data/questionnaires/generated
+  python scripts/questionnaire_pipeline.py review data/questionnaires/generated/mode-de-vie.json
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import stage_timing
+from convert_mode_de_vie_to_json import OUTPUT_NAMES, parse_markdown_to_json
+from generate_review_markdown import generate_markdown
+from ocr_engines import ENGINES, LazyOcr
+from parse_questionnaires import (LikertNormalizer, expand_inputs, load_likert_table, normalize_lines, parse_text,
+                                  read_text_from_pdf, slugify)
+from pdf_document import PdfDocument
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+METHODS = ("pdfplumber", "text", "hybrid", "ocr")
+BACKENDS = {"pdfplumber": "pdfplumber", "text": "pypdf2", "hybrid": "pymupdf", "ocr": "pymupdf"}
+SOURCE_SUFFIXES = (".pdf", ".txt", ".md")
+
+REVIEW_NAMES = dict(OUTPUT_NAMES.values())
+
+_scripts: dict[str, object] = {}
+
+
+def is_source(path: Path) -> bool:
+    """Whether a .pdf/.txt/.md file is a questionnaire source (.md: only the structures convert_mode_de_vie_to_json handles)."""
+    suffix = path.suffix.lower()
+    return suffix in (".pdf", ".txt") or (suffix == ".md" and path.name in OUTPUT_NAMES)
+
+
+def output_names(source: Path) -> tuple[str, str]:
+    """(JSON, review markdown) file names written for a source."""
+    if source.suffix.lower() == ".md" and source.name in OUTPUT_NAMES:
+        return OUTPUT_NAMES[source.name]
+    slug = slugify(source.stem)
+    return f"{slug}.json", f"{slug}-review.md"
+
+
+def review_name(json_path: Path) -> str:
+    """Review markdown file name of a questionnaire JSON."""
+    return REVIEW_NAMES.get(json_path.name, f"{json_path.stem}-review.md")
+
+
+def load_script(name: str):
+    """Import a sibling script whose file name is not a valid module name (e.g. extract-pdf-text.py)."""
+    if name not in _scripts:
+        spec = importlib.util.spec_from_file_location(name.replace("-", "_"), SCRIPTS_DIR / f"{name}.py")
+        module = importlib.util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(module)
+        except SystemExit:
+            # The script exits at import time when its PDF library is missing
+            raise RuntimeError(f"{name}.py could not be loaded (missing dependency?)")
+        _scripts[name] = module
+    return _scripts[name]
+
+
+class Pipeline:
+    """Stage functions working on in-memory values; callers decide what gets written to disk."""
+
+    def __init__(self, method: str = "pdfplumber", normalizer: LikertNormalizer | None = None, dpi: int = 300,
+                 lang: str = "fra", workers: int | None = None, engine: str = "auto"):
+        self.method = method
+        self.normalizer = normalizer
+        self.dpi = dpi
+        self.lang = lang
+        self.workers = workers or os.cpu_count() or 1
+        # Thread pool and Tesseract engine shared by every OCR'd PDF of the run, created on first use
+        self._ocr = LazyOcr(engine, lang, 6, 1, self.workers)
+
+    def close(self):
+        self._ocr.close()
+
+    def extract(self, pdf_path: Path) -> str:
+        """PDF -> text with ===== PAGE i ===== markers.
+
+        The PDF is opened once (see pdf_document.py) with the library of the method, and the
+        handle is handed to the stage script.
+        """
+        with PdfDocument(pdf_path, BACKENDS[self.method]) as doc:
+            if self.method == "pdfplumber":
+                return read_text_from_pdf(pdf_path, doc)
+            if self.method == "text":
+                extract_pdf_text = load_script("extract-pdf-text")
+                return extract_pdf_text.format_pages(extract_pdf_text.extract_page_texts(pdf_path, doc))
+            from extract_pdf_hybrid import extract_pdf, format_text
+
+            # The OCR engine is only loaded once a page needs it
+            texts, _ = extract_pdf(pdf_path, self._ocr, self.workers, dpi=self.dpi, force_ocr=self.method == "ocr",
+                                   doc=doc)
+            return format_text(texts)
+
+    def parse(self, text: str) -> dict:
+        return parse_text(normalize_lines(text), self.normalizer)
+
+    def convert(self, md_content: str) -> dict:
+        return parse_markdown_to_json(md_content)
+
+    def review(self, data: dict) -> str:
+        return generate_markdown(data)
+
+    def to_questionnaire(self, source: Path) -> tuple[dict, str | None]:
+        """Run the stages turning a .pdf/.txt/.md source into questionnaire data.
+
+        Returns (data, extracted_text); the text is None for .txt and .md sources.
+        """
+        suffix = source.suffix.lower()
+        if suffix == ".md":
+            if source.name not in OUTPUT_NAMES:
+                raise ValueError(f"{source.name} is not a markdown structure convert_mode_de_vie_to_json.py handles")
+            with stage_timing.stage("read", file=source):
+                md_content = source.read_text(encoding="utf-8")
+            with stage_timing.stage("convert", file=source):
+                return self.convert(md_content), None
+        if suffix == ".pdf":
+            text = self.extract(source)
+        elif suffix == ".txt":
+            with stage_timing.stage("read", file=source):
+                text = source.read_text(encoding="utf-8", errors="ignore")
+        else:
+            raise ValueError(f"Unsupported input: {source}")
+        with stage_timing.stage("parse", file=source):
+            data = self.parse(text)
+        return data, text if suffix == ".pdf" else None
+
+    def write_review(self, path: Path, data: dict, source: Path) -> Path:
+        with stage_timing.stage("review", file=source):
+            review = self.review(data)
+        return write_text(path, review, source)
+
+
+def write_text(path: Path, content: str, source: Path | None = None) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with stage_timing.stage("write", file=source or path, bytes=len(content.encode("utf-8"))):
+        path.write_text(content, encoding="utf-8")
+    return path
+
+
+def write_json(path: Path, data: dict, source: Path | None = None) -> Path:
+    return write_text(path, json.dumps(data, ensure_ascii=False, indent=2), source)
+
+
+def process(inputs: list[Path], handle) -> int:
+    """Apply handle(path) -> written paths to every input, reporting each file with its stage timings;
+    returns an exit code."""
+    failures = 0
+    start = time.perf_counter()
+    for path in inputs:
+        position = stage_timing.mark()
+        try:
+            written = handle(path)
+        except Exception as e:
+            print(f"❌ {path}: {type(e).__name__}: {e}", file=sys.stderr)
+            failures += 1
+            continue
+        stages = ", ".join(f"{stage} {seconds * 1000:.0f} ms"
+                           for stage, seconds in stage_timing.totals(stage_timing.since(position)).items())
+        print(f"✅ {path} -> {', '.join(p.name for p in written)} ({stages})")
+    print(f"\n📊 {len(inputs) - failures}/{len(inputs)} file(s) in {time.perf_counter() - start:.2f}s")
+    return 1 if failures else 0
+
+
+def warn_slug_collisions(inputs: list[Path]):
+    seen: dict[str, Path] = {}
+    for inp in inputs:
+        name = output_names(inp)[0]
+        if name in seen:
+            print(f"⚠️  {inp} and {seen[name]} both write {name} (last one wins)", file=sys.stderr)
+        seen[name] = inp
+
+
+def source_inputs(specs: list[str], suffixes: tuple[str, ...]) -> list[Path]:
+    """expand_inputs() without the .md files that are not questionnaire sources (see is_source)."""
+    inputs = expand_inputs(specs, suffixes)
+    sources = [p for p in inputs if is_source(p)]
+    if len(sources) < len(inputs):
+        print(f"⏭️  {len(inputs) - len(sources)} .md file(s) skipped: not a structure convert_mode_de_vie_to_json.py handles")
+    return sources
+
+
+def cmd_extract(pipeline: Pipeline, args) -> int:
+    outdir = Path(args.outdir)
+
+    def handle(pdf: Path) -> list[Path]:
+        text = pipeline.extract(pdf)
+        return [write_text(outdir / f"{slugify(pdf.stem)}.txt", text, pdf)]
+
+    return process(expand_inputs(args.inputs, (".pdf",)), handle)
+
+
+def cmd_parse(pipeline: Pipeline, args) -> int:
+    outdir = Path(args.outdir)
+
+    def handle(source: Path) -> list[Path]:
+        data, _ = pipeline.to_questionnaire(source)
+        return [write_json(outdir / output_names(source)[0], data, source)]
+
+    suffixes = (".md",) if args.command == "convert" else (".txt", ".pdf")
+    return process(source_inputs(args.inputs, suffixes), handle)
+
+
+def cmd_review(pipeline: Pipeline, args) -> int:
+    def handle(json_path: Path) -> list[Path]:
+        with stage_timing.stage("read", file=json_path):
+            data = json.loads(json_path.read_text(encoding="utf-8"))
+        outdir = Path(args.outdir) if args.outdir else json_path.parent
+        return [pipeline.write_review(outdir / review_name(json_path), data, json_path)]
+
+    return process(expand_inputs(args.inputs, (".json",)), handle)
+
+
+def cmd_run(pipeline: Pipeline, args) -> int:
+    outdir = Path(args.outdir)
+    keep = Path(args.keep_intermediates) if args.keep_intermediates else None
+
+    def handle(source: Path) -> list[Path]:
+        json_name, review = output_names(source)
+        data, text = pipeline.to_questionnaire(source)
+        written = []
+        if keep is not None and text is not None:
+            written.append(write_text(keep / f"{slugify(source.stem)}.txt", text, source))
+        written.append(write_json(outdir / json_name, data, source))
+        written.append(pipeline.write_review(outdir / review, data, source))
+        return written
+
+    inputs = source_inputs(args.inputs, SOURCE_SUFFIXES)
+    warn_slug_collisions(inputs)
+    return process(inputs, handle)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Questionnaire pipeline: extract -> parse -> review.")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    def add_command(name: str, help: str, outdir_default: str | None, pdf_options: bool):
+        p = sub.add_parser(name, help=help)
+        p.add_argument("inputs", nargs="+", help="Files, directories (searched recursively) or glob patterns")
+        p.add_argument("--outdir", default=outdir_default, help=f"Output directory (default: {outdir_default or 'next to each input'})")
+        if pdf_options:
+            p.add_argument("--method", choices=METHODS, default="pdfplumber", help="PDF text extraction method")
+            p.add_argument("--dpi", type=int, default=300, help="Rendering resolution for OCR'd pages")
+            p.add_argument("--lang", default="fra", help="Tesseract language")
+            p.add_argument("--workers", type=int, default=None, help="Concurrent Tesseract workers (default: CPU count)")
+            p.add_argument("--engine", choices=ENGINES, default="auto",
+                           help="Tesseract backend (see ocr_engines.py)")
+        if name in ("parse", "run"):
+            p.add_argument("--likert-table", help="JSON synonym table replacing the built-in Likert option normalization")
+        stage_timing.add_arguments(p)
+        return p
+
+    add_command("extract", "Extract PDF text to .txt files", "data/questionnaires/extracted", True)
+    add_command("parse", "Parse .txt/.pdf files to questionnaire JSON", "data/questionnaires/generated", True)
+    add_command("convert", "Convert the Mode de vie markdown structure to JSON", "data/questionnaires/generated", False)
+    add_command("review", "Generate review markdown from questionnaire JSON", None, False)
+    run = add_command("run", "Chain extract -> parse -> review in one process", "data/questionnaires/generated", True)
+    run.add_argument("--keep-intermediates", metavar="DIR", help="Also write the extracted text of each PDF to DIR/<slug>.txt")
+    args = ap.parse_args(argv)
+
+    likert_table = getattr(args, "likert_table", None)
+    pipeline = Pipeline(
+        method=getattr(args, "method", "pdfplumber"),
+        normalizer=LikertNormalizer(load_likert_table(likert_table)) if likert_table else None,
+        dpi=getattr(args, "dpi", 300),
+        lang=getattr(args, "lang", "fra"),
+        workers=getattr(args, "workers", None),
+        engine=getattr(args, "engine", "auto"),
+    )
+    commands = {"extract": cmd_extract, "parse": cmd_parse, "convert": cmd_parse, "review": cmd_review, "run": cmd_run}
+    # Always recorded: every file is reported with its stage durations
+    stage_timing.enable()
+    try:
+        with stage_timing.instrumented(args):
+            return commands[args.command](pipeline, args)
+    finally:
+        pipeline.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Bulk scoring of questionnaire responses with NumPy lookup tables.
+
+A questionnaire JSON with per-question `points` lists (convert_mode_de_vie_to_json.py
+sections format, or the flat `questions` list of extract_questionnaires.py) is compiled
+once into dense arrays:
+
+  table     (questions, max options) points of each option (0 past the last option, and for
+            options whose points are unknown); float32 when every point is an integer and
+            sums stay exact in float32 (the usual case), float64 otherwise
+  counts    (questions,) number of options of each question
+  sections  (sections, questions) bool membership mask
+
+Questions without points (free text, or `points` all null) are not part of the table.
+A batch of responses is an int array (respondents, questions) of 0-based option indices
+in `question_ids` order, -1 meaning unanswered (0 points). Scoring is one gather into the
+flattened table plus one matrix product with the section mask, done in chunks of rows so
+millions of respondents stay within a few hundred MB.
+
+Responses are read from .npy (memory-mapped), .csv (one column per question id, cells
+holding an option index or the option text, empty when unanswered) or .jsonl
+({"id": ..., "answers": {question_id: index or option text}}). Scores are written as .csv
+(id, total, one column per section, answered) or .npz.
+
+Usage:
+  python scripts/score_questionnaires.py data/questionnaires/generated/mode-de-vie-clean.json --describe
+  python scripts/score_questionnaires.py data/questionnaires/generated/mode-de-vie-clean.json --responses answers.csv --output scores.csv
+  python scripts/score_questionnaires.py data/questionnaires/generated/mode-de-vie-clean.json --responses answers.npy --output scores.npz --chunk-size 500000
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+UNANSWERED = -1
+
+_np = None
+
+
+def get_numpy():
+    """Import numpy on first use, so the module stays cheap to import without it."""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError("numpy is required for scoring (pip install numpy)") from None
+        _np = numpy
+    return _np
+
+
+def scored_sections(questionnaire: dict) -> list[tuple[str, list[dict]]]:
+    """(section id, questions with points) in document order.
+
+    A flat questionnaire (no `sections`) is one section named after its id.
+    """
+    if questionnaire.get("sections"):
+        groups = [(s.get("id") or f"section-{i}", s.get("questions") or [])
+                  for i, s in enumerate(questionnaire["sections"], 1)]
+    else:
+        groups = [(questionnaire.get("id") or "total", questionnaire.get("questions") or [])]
+    result = []
+    for section_id, questions in groups:
+        questions = [q for q in questions if any(p is not None for p in q.get("points") or [])]
+        if questions:
+            result.append((section_id, questions))
+    return result
+
+
+class CompiledScorer:
+    """Dense scoring tables of one questionnaire; see the module docstring for the layout."""
+
+    def __init__(self, questionnaire: dict):
+        np = get_numpy()
+        groups = scored_sections(questionnaire)
+        if not groups:
+            raise ValueError(f"{questionnaire.get('id', '?')}: no question has points")
+        self.questionnaire_id = questionnaire.get("id", "")
+        self.section_ids = [section_id for section_id, _ in groups]
+        questions = [(i, q) for i, (_, qs) in enumerate(groups) for q in qs]
+        self.question_ids = [q.get("id") or f"q{n}" for n, (_, q) in enumerate(questions, 1)]
+        self.options = [[str(o) for o in q.get("options") or []] for _, q in questions]
+
+        points = [q["points"] for _, q in questions]
+        width = max(len(p) for p in points)
+        self.table = np.zeros((len(points), width), dtype=np.float64)
+        for row, values in enumerate(points):
+            self.table[row, :len(values)] = [0 if v is None else v for v in values]
+        self.counts = np.array([len(p) for p in points], dtype=np.int64)
+        self.sections = np.zeros((len(groups), len(questions)), dtype=bool)
+        self.sections[[i for i, _ in questions], np.arange(len(questions))] = True
+        self.max_points = (self.table.max(axis=1) @ self.sections.T)
+
+        exact = (self.table == np.round(self.table)).all() and np.abs(self.table).max(axis=1).sum() < 2 ** 24
+        self.dtype = np.float32 if exact else np.float64
+
+        # Gather index: row r, option k -> r * (width + 1) + k + 1; column 0 of each row is
+        # the 0 points of an unanswered question (-1), so no masking is needed in the gather
+        self._flat = np.pad(self.table, ((0, 0), (1, 0))).ravel().astype(self.dtype)
+        index_type = np.int16 if self._flat.size <= np.iinfo(np.int16).max else np.int32
+        self._offsets = (np.arange(len(points)) * (width + 1) + 1).astype(index_type)
+        self._mask = self.sections.T.astype(self.dtype)
+        self._option_index = [{self._option_key(o): k for k, o in enumerate(opts)} for opts in self.options]
+
+    @staticmethod
+    def _option_key(text: str) -> str:
+        return " ".join(text.split()).casefold()
+
+    def __len__(self) -> int:
+        return len(self.question_ids)
+
+    def describe(self) -> str:
+        lines = [f"{self.questionnaire_id}: {len(self)} scored question(s), {len(self.section_ids)} section(s), "
+                 f"table {self.table.shape[0]}x{self.table.shape[1]}"]
+        for s, section_id in enumerate(self.section_ids):
+            lines.append(f"  {section_id:30} {int(self.sections[s].sum()):3} question(s)  max {self.max_points[s]:g} pts")
+        lines.append(f"  {'total':30} {len(self):3} question(s)  max {self.max_points.sum():g} pts")
+        return "\n".join(lines)
+
+    def option_code(self, question: int, value) -> int:
+        """Option index of an answer given as an index, its text or None/'' (unanswered)."""
+        if value is None or value == "":
+            return UNANSWERED
+        if isinstance(value, int):
+            return value
+        text = str(value).strip()
+        if text.lstrip("-").isdigit():
+            return int(text)
+        try:
+            return self._option_index[question][self._option_key(text)]
+        except KeyError:
+            raise ValueError(f"{self.question_ids[question]}: unknown option {text!r}") from None
+
+    def encode(self, answers: dict) -> list[int]:
+        """Response row for {question_id: answer}; missing questions are unanswered."""
+        return [self.option_code(q, answers.get(qid)) for q, qid in enumerate(self.question_ids)]
+
+    def score(self, responses, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+        """Score an int array (respondents, questions) of option indices (-1 = unanswered).
+
+        Returns {"total": (n,), "sections": (n, sections), "answered": (n,)}, scores in
+        `dtype`. Raises ValueError on an index outside a question's options.
+        """
+        np = get_numpy()
+        responses = np.asarray(responses)
+        if responses.ndim == 1:
+            responses = responses.reshape(1, -1)
+        if not np.issubdtype(responses.dtype, np.integer):
+            raise ValueError(f"responses must be option indices, got {responses.dtype} values")
+        if responses.ndim != 2 or responses.shape[1] != len(self):
+            raise ValueError(f"expected responses of shape (n, {len(self)}), got {responses.shape}")
+        n = responses.shape[0]
+        totals = np.empty(n, dtype=self.dtype)
+        sections = np.empty((n, len(self.section_ids)), dtype=self.dtype)
+        answered = np.empty(n, dtype=np.int32)
+        for start in range(0, n, chunk_size):
+            chunk = np.asarray(responses[start:start + chunk_size])
+            if (chunk.min(axis=0) < UNANSWERED).any() or (chunk.max(axis=0) >= self.counts).any():
+                row, col = np.argwhere((chunk < UNANSWERED) | (chunk >= self.counts))[0]
+                raise ValueError(f"respondent {start + row + 1}, {self.question_ids[col]}: "
+                                 f"option {chunk[row, col]} out of range (0-{self.counts[col] - 1})")
+            stop = start + len(chunk)
+            points = np.take(self._flat, chunk + self._offsets)
+            np.matmul(points, self._mask, out=sections[start:stop])
+            answered[start:stop] = len(self) - np.count_nonzero(chunk == UNANSWERED, axis=1)
+        # Every scored question belongs to exactly one section
+        np.sum(sections, axis=1, out=totals)
+        return {"total": totals, "sections": sections, "answered": answered}
+
+
+def load_questionnaire(path: Path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compile_questionnaire(source) -> CompiledScorer:
+    """CompiledScorer from a questionnaire dict or the path of its JSON."""
+    if not isinstance(source, dict):
+        source = load_questionnaire(Path(source))
+    return CompiledScorer(source)
+
+
+def read_responses(path: Path, scorer: CompiledScorer, id_column: str = "id") -> tuple[list[str] | None, object]:
+    """(respondent ids or None, int array (n, questions)) from a .npy, .csv or .jsonl file."""
+    np = get_numpy()
+    suffix = path.suffix.lower()
+    if suffix == ".npy":
+        return None, np.load(path, mmap_mode="r")
+    ids, rows = [], []
+    if suffix == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            for n, line in enumerate(f, 1):
+                if line.strip():
+                    record = json.loads(line)
+                    ids.append(str(record.get(id_column, n)))
+                    rows.append(scorer.encode(record.get("answers") or {}))
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            columns = {name: i for i, name in enumerate(header)}
+            unknown = [qid for qid in scorer.question_ids if qid not in columns]
+            if len(unknown) == len(scorer):
+                raise ValueError(f"{path}: no column matches a scored question id")
+            id_at = columns.get(id_column)
+            picks = [(q, columns[qid]) for q, qid in enumerate(scorer.question_ids) if qid in columns]
+            for n, row in enumerate(reader, 1):
+                codes = [UNANSWERED] * len(scorer)
+                for q, col in picks:
+                    if col < len(row):
+                        codes[q] = scorer.option_code(q, row[col])
+                ids.append(row[id_at] if id_at is not None and id_at < len(row) else str(n))
+                rows.append(codes)
+    return ids, np.array(rows, dtype=np.int16).reshape(len(rows), len(scorer))
+
+
+def write_scores(path: Path, scorer: CompiledScorer, scores: dict, ids: list[str] | None = None):
+    np = get_numpy()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == ".npz":
+        np.savez(path, section_ids=np.array(scorer.section_ids), **scores)
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "total", *scorer.section_ids, "answered"])
+        for n, (total, sections, answered) in enumerate(zip(scores["total"].tolist(), scores["sections"].tolist(),
+                                                            scores["answered"].tolist())):
+            writer.writerow([ids[n] if ids else n + 1, f"{total:g}", *(f"{s:g}" for s in sections), answered])
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("questionnaire", help="Questionnaire JSON with per-question points")
+    ap.add_argument("--responses", help="Responses (.npy, .csv or .jsonl)")
+    ap.add_argument("--output", help="Scores (.csv or .npz; default: print a summary)")
+    ap.add_argument("--id-column", default="id", help="Respondent id column / key (default: id)")
+    ap.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Respondents scored per pass")
+    ap.add_argument("--describe", action="store_true", help="Print the compiled tables")
+    args = ap.parse_args()
+
+    try:
+        scorer = compile_questionnaire(args.questionnaire)
+    except (RuntimeError, ValueError, OSError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    if args.describe or not args.responses:
+        print(scorer.describe())
+        if not args.responses:
+            return 0
+
+    try:
+        ids, responses = read_responses(Path(args.responses), scorer, args.id_column)
+        scores = scorer.score(responses, chunk_size=args.chunk_size)
+    except (ValueError, OSError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    n = len(scores["total"])
+    if args.output:
+        write_scores(Path(args.output), scorer, scores, ids)
+        print(f"✅ {n} respondent(s) scored -> {args.output}")
+    else:
+        print(f"✅ {n} respondent(s) scored")
+        if n:
+            print(f"  {'total':30} mean {scores['total'].mean():8.2f} / {scorer.max_points.sum():g}")
+            for s, section_id in enumerate(scorer.section_ids):
+                print(f"  {section_id:30} mean {scores['sections'][:, s].mean():8.2f} / {scorer.max_points[s]:g}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Offline full-text search over the extracted questionnaires: "which questionnaires ask about X?"
+
+The index is a SQLite file built from the JSON written by extract_questionnaires.py
+(<id>.json files or its --jsonl stream) and parse_questionnaires.py (<slug>.json). Every
+question is indexed as a unit (label, options and section title), plus one unit per
+questionnaire for its title and category. Postings map a term to the units containing it,
+weighted by field, and queries are ranked with BM25.
+
+Text is tokenized for French: lowercased, accents folded (é -> e, œ -> oe), split on
+non-letters (so l'alcool -> l, alcool), stop words dropped, then reduced by a light
+suffix-stripping stemmer (sommeils -> sommeil, alimentation/alimentaire -> aliment). Queries
+go through the same pipeline; a trailing * matches every indexed term starting with the (folded, stemmed) prefix.
+
+Updates are incremental: `index` skips questionnaires whose JSON is unchanged (SHA-256),
+replaces the units of the ones that changed and, with --prune, drops those whose source
+file is gone. Re-extracting one questionnaire and re-running `index` only reindexes it.
+
+Usage:
+  python scripts/search_index.py index packages/shared-questionnaires/extracted data/questionnaires/generated
+  python scripts/search_index.py search "troubles du sommeil"
+  python scripts/search_index.py search "douleur*" --by question --category rhumatologie --limit 20
+  python scripts/search_index.py search "tabac cannabis" --all --json
+  python scripts/search_index.py stats
+"""
+import argparse
+import hashlib
+import json
+import math
+import re
+import sqlite3
+import sys
+import time
+import unicodedata
+from pathlib import Path
+
+DEFAULT_DB = "data/questionnaires/search-index.sqlite"
+# Bump when tokenization changes: existing indexes must then be rebuilt
+TOKENIZER_VERSION = 1
+
+# Field weights: a term's frequency in a unit is the weighted sum of its occurrences
+FIELD_WEIGHTS = {"title": 2.0, "category": 1.0, "label": 1.0, "section": 0.5, "options": 0.5}
+BM25_K1 = 1.2
+BM25_B = 0.75
+# A questionnaire's score is the sum of its best unit scores
+QUESTIONNAIRE_TOP_UNITS = 3
+
+TOKEN_RE = re.compile(r"[^\W_]+")
+FOLD_TABLE = str.maketrans({"œ": "oe", "æ": "ae", "’": "'", "ß": "ss"})
+STOP_WORDS = frozenset("""
+a ai au aux avec c ce ces cet cette d dans de des du elle elles en est et etc etes etre eu il ils j je l la le les
+leur leurs lui m ma mais me mes moi mon n ne ni nos notre nous on ou par pas pour qu que quel quelle quelles quels
+qui s sa se ses si son sur t ta te tes toi ton tu un une vos votre vous y
+""".split())
+# Longest first; only stripped when at least 4 characters remain
+LIGHT_SUFFIXES = ("issements", "issement", "atrices", "atrice", "ateurs", "ateur", "ations", "ation", "ements",
+                  "ement", "ments", "ment", "euses", "euse", "aires", "aire", "iques", "ique", "ismes", "isme",
+                  "istes", "iste", "ites", "ite", "ives", "ive", "eux")
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents."""
+    text = unicodedata.normalize("NFKD", text.casefold().translate(FOLD_TABLE))
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def stem(token: str) -> str:
+    """Light French stemmer: plural, derivational suffix, then final -r/-e and doubled letter."""
+    if len(token) < 5 or not token.isalpha():
+        return token
+    if token.endswith("aux"):
+        token = token[:-3] + "al"  # chevaux -> cheval
+    elif token[-1] in "sx":
+        token = token[:-1]
+    for suffix in LIGHT_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            token = token[:-len(suffix)]
+            break
+    for final in "re":
+        if len(token) > 4 and token[-1] == final:
+            token = token[:-1]
+    if len(token) > 4 and token[-1] == token[-2]:
+        token = token[:-1]
+    return token
+
+
+def tokenize(text: str | None) -> list[str]:
+    if not text:
+        return []
+    return [stem(t) for t in TOKEN_RE.findall(fold(text)) if t not in STOP_WORDS and (len(t) > 1 or t.isdigit())]
+
+
+def questionnaire_units(data: dict) -> list[dict]:
+    """Searchable units of a questionnaire JSON (either output format): the questionnaire itself, then each question."""
+    units = [{"section": None, "question_id": None, "label": data.get("title") or data.get("id") or "",
+              "fields": {"title": data.get("title"), "category": data.get("category")}}]
+    if "sections" in data:
+        questions = [(sec.get("title"), q) for sec in data["sections"] for q in sec.get("questions", [])]
+    else:
+        questions = [(None, q) for q in data.get("questions", [])]
+    for section, q in questions:
+        units.append({"section": section, "question_id": q.get("id"), "label": q.get("label") or "",
+                      "fields": {"label": q.get("label"), "section": section,
+                                 "options": " ".join(o for o in q.get("options") or [] if isinstance(o, str))}})
+    return units
+
+
+def weighted_terms(fields: dict) -> tuple[dict[str, float], float]:
+    """(term -> weighted frequency, weighted length) of a unit."""
+    tf: dict[str, float] = {}
+    for field, text in fields.items():
+        weight = FIELD_WEIGHTS[field]
+        for term in tokenize(text):
+            tf[term] = tf.get(term, 0.0) + weight
+    return tf, sum(tf.values())
+
+
+def load_questionnaires(path: Path) -> list[tuple[str, str, dict]]:
+    """(key, digest, questionnaire) entries of a JSON or JSONL output file; other JSON files yield nothing."""
+    if path.suffix.lower() == ".jsonl":
+        # Keys are <file>#<category>/<id> (ids are PDF stems, repeated across category folders);
+        # a key still seen twice gets the record's line number, so no record replaces another
+        entries = []
+        seen = set()
+        with open(path, "rb") as f:
+            for line, raw in enumerate(f, 1):
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    continue  # incomplete last line of a stream being written
+                if isinstance(record, dict) and "questions" in record:
+                    name = f"{record['category']}/{record.get('id')}" if record.get("category") else f"{record.get('id')}"
+                    key = f"{path.as_posix()}#{name}"
+                    if key in seen:
+                        print(f"⚠️  {path}:{line}: questionnaire {name} already in this file, indexed as #{name}@{line}",
+                              file=sys.stderr)
+                        key = f"{key}@{line}"
+                    seen.add(key)
+                    entries.append((key, hashlib.sha256(raw.strip()).hexdigest(), record))
+        return entries
+    raw = path.read_bytes()
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return []
+    if not isinstance(data, dict) or not ("questions" in data or "sections" in data):
+        return []  # index.json, --summary files, ...
+    data.setdefault("id", path.stem)
+    return [(path.as_posix(), hashlib.sha256(raw).hexdigest(), data)]
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS questionnaires (key TEXT PRIMARY KEY, source TEXT, digest TEXT, id TEXT, title TEXT,
+                                           category TEXT);
+CREATE TABLE IF NOT EXISTS units (unit INTEGER PRIMARY KEY, key TEXT, section TEXT, question_id TEXT, label TEXT,
+                                  length REAL);
+CREATE INDEX IF NOT EXISTS units_key ON units (key);
+CREATE TABLE IF NOT EXISTS postings (term TEXT, unit INTEGER, tf REAL, PRIMARY KEY (term, unit)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_unit ON postings (unit);
+"""
+
+
+class SearchIndex:
+    """SQLite inverted index, see module docstring."""
+
+    def __init__(self, db_path: Path, rebuild: bool = False):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        if rebuild and self.db_path.exists():
+            self.db_path.unlink()
+        self.db = sqlite3.connect(self.db_path)
+        self.db.executescript(SCHEMA)
+        version = self._meta("tokenizer")
+        if version is None:
+            self._set_meta("tokenizer", TOKENIZER_VERSION)
+            self.db.commit()
+        elif int(version) != TOKENIZER_VERSION:
+            raise RuntimeError(f"{self.db_path} was built with tokenizer v{version} (now v{TOKENIZER_VERSION}): "
+                               "rebuild it with `index --rebuild`")
+
+    def close(self) -> None:
+        self.db.close()
+
+    def _meta(self, key: str) -> str | None:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value) -> None:
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _remove(self, key: str) -> None:
+        self.db.execute("DELETE FROM postings WHERE unit IN (SELECT unit FROM units WHERE key = ?)", (key,))
+        self.db.execute("DELETE FROM units WHERE key = ?", (key,))
+        self.db.execute("DELETE FROM questionnaires WHERE key = ?", (key,))
+
+    def update(self, paths: list[Path], prune: bool = False) -> dict:
+        """Index the questionnaires of these JSON/JSONL files; returns counts of added/unchanged/removed."""
+        counts = {"indexed": 0, "unchanged": 0, "removed": 0}
+        known = dict(self.db.execute("SELECT key, digest FROM questionnaires"))
+        sources = {}
+        for path in paths:
+            entries = load_questionnaires(path)
+            sources[path.as_posix()] = {key for key, _, _ in entries}
+            for key, digest, data in entries:
+                if known.get(key) == digest:
+                    counts["unchanged"] += 1
+                    continue
+                self._remove(key)
+                self.db.execute("INSERT INTO questionnaires (key, source, digest, id, title, category) "
+                                "VALUES (?, ?, ?, ?, ?, ?)",
+                                (key, path.as_posix(), digest, data.get("id"), data.get("title"), data.get("category")))
+                for unit in questionnaire_units(data):
+                    tf, length = weighted_terms(unit["fields"])
+                    unit_id = self.db.execute(
+                        "INSERT INTO units (key, section, question_id, label, length) VALUES (?, ?, ?, ?, ?)",
+                        (key, unit["section"], unit["question_id"], unit["label"], length)).lastrowid
+                    self.db.executemany("INSERT INTO postings (term, unit, tf) VALUES (?, ?, ?)",
+                                        [(term, unit_id, weight) for term, weight in tf.items()])
+                counts["indexed"] += 1
+        # Questionnaires that disappeared from a file that was reindexed (e.g. JSONL records),
+        # or, with prune, whose source file is gone
+        for key, source in self.db.execute("SELECT key, source FROM questionnaires").fetchall():
+            if (source in sources and key not in sources[source]) or (prune and not Path(source).exists()):
+                self._remove(key)
+                counts["removed"] += 1
+        units, total_length = self.db.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM units").fetchone()
+        self._set_meta("units", units)
+        self._set_meta("total_length", total_length)
+        self.db.commit()
+        return counts
+
+    def _postings(self, term: str) -> list[tuple[int, float]]:
+        if term.endswith("*"):
+            words = TOKEN_RE.findall(fold(term[:-1]))
+            if not words:
+                return []
+            prefix = stem(words[-1])
+            # Prefix range scan on the clustered (term, unit) key, tf summed over the matching terms
+            rows = self.db.execute("SELECT unit, SUM(tf) FROM postings WHERE term >= ? AND term < ? GROUP BY unit",
+                                   (prefix, prefix + "\uffff"))
+            return rows.fetchall()
+        return self.db.execute("SELECT unit, tf FROM postings WHERE term = ?", (term,)).fetchall()
+
+    def query_terms(self, query: str) -> list[str]:
+        terms = []
+        for word in query.split():
+            if word.endswith("*"):
+                terms.append(word)
+            else:
+                terms.extend(tokenize(word))
+        return list(dict.fromkeys(terms))
+
+    def search(self, query: str, by: str = "questionnaire", limit: int = 10, category: str | None = None,
+               require_all: bool = False) -> list[dict]:
+        """Ranked hits for a query: questionnaires (with their best matching questions) or questions."""
+        terms = self.query_terms(query)
+        n_units = int(self._meta("units") or 0)
+        if not terms or not n_units:
+            return []
+        avg_length = float(self._meta("total_length")) / n_units or 1.0
+        lengths: dict[int, float] = {}
+        scores: dict[int, float] = {}
+        matched: dict[int, int] = {}
+        for term in terms:
+            postings = self._postings(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_units - len(postings) + 0.5) / (len(postings) + 0.5))
+            missing = [unit for unit, _ in postings if unit not in lengths]
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                lengths.update(self.db.execute(
+                    f"SELECT unit, length FROM units WHERE unit IN ({','.join('?' * len(chunk))})", chunk))
+            for unit, tf in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[unit] / avg_length)
+                scores[unit] = scores.get(unit, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+                matched[unit] = matched.get(unit, 0) + 1
+        if require_all:
+            scores = {unit: s for unit, s in scores.items() if matched[unit] == len(terms)}
+        if not scores:
+            return []
+
+        details = {}
+        ranked_units = sorted(scores, key=scores.get, reverse=True)
+        for start in range(0, len(ranked_units), 500):
+            chunk = ranked_units[start:start + 500]
+            rows = self.db.execute(
+                "SELECT u.unit, u.key, u.section, u.question_id, u.label, q.id, q.title, q.category, q.source "
+                f"FROM units u JOIN questionnaires q ON q.key = u.key WHERE u.unit IN ({','.join('?' * len(chunk))})",
+                chunk)
+            for unit, key, section, question_id, label, qid, title, cat, source in rows:
+                details[unit] = {"key": key, "id": qid, "title": title, "category": cat, "source": source,
+                                 "section": section, "question_id": question_id, "label": label}
+        hits = [{**details[unit], "score": scores[unit]} for unit in ranked_units
+                if category is None or details[unit]["category"] == category]
+        if by == "question":
+            return [h for h in hits if h["question_id"] is not None][:limit]
+
+        questionnaires: dict[str, dict] = {}
+        for hit in hits:
+            q = questionnaires.setdefault(hit["key"], {k: hit[k] for k in ("id", "title", "category", "source")}
+                                          | {"score": 0.0, "units": 0, "questions": []})
+            if q["units"] < QUESTIONNAIRE_TOP_UNITS:
+                q["score"] += hit["score"]
+            q["units"] += 1
+            if hit["question_id"] is not None and len(q["questions"]) < 3:
+                q["questions"].append({"id": hit["question_id"], "section": hit["section"], "label": hit["label"],
+                                       "score": hit["score"]})
+        return sorted(questionnaires.values(), key=lambda q: q["score"], reverse=True)[:limit]
+
+    def stats(self) -> dict:
+        def count(sql: str) -> int:
+            return self.db.execute(sql).fetchone()[0]
+
+        return {"questionnaires": count("SELECT COUNT(*) FROM questionnaires"),
+                "units": count("SELECT COUNT(*) FROM units"),
+                "terms": count("SELECT COUNT(DISTINCT term) FROM postings"),
+                "postings": count("SELECT COUNT(*) FROM postings"),
+                "bytes": self.db_path.stat().st_size}
+
+
+def expand_json_inputs(specs: list[str]) -> list[Path]:
+    files: list[Path] = []
+    for spec in map(Path, specs):
+        if spec.is_dir():
+            files.extend(p for p in sorted(spec.rglob("*")) if p.suffix.lower() in (".json", ".jsonl"))
+        else:
+            files.append(spec)
+    return files
+
+
+def snippet(text: str, terms: list[str], width: int = 100) -> str:
+    """About width characters of text, starting shortly before the first word matching a query term."""
+    text = " ".join(text.split())
+    if len(text) <= width:
+        return text
+    start = 0
+    for match in TOKEN_RE.finditer(text):
+        words = tokenize(match.group())
+        if words and any(words[0] == t or (t.endswith("*") and words[0].startswith(stem(fold(t[:-1]))))
+                         for t in terms):
+            start = max(0, match.start() - width // 4)
+            break
+    prefix = "…" if start else ""
+    end = start + width - len(prefix)
+    return prefix + text[start:end] + ("…" if end < len(text) else "")
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--db", default=DEFAULT_DB, help=f"Index file (default: {DEFAULT_DB})")
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("index", help="Add or update questionnaires from JSON/JSONL files or directories")
+    p.add_argument("inputs", nargs="+")
+    p.add_argument("--prune", action="store_true", help="Remove questionnaires whose source file no longer exists")
+    p.add_argument("--rebuild", action="store_true", help="Start from an empty index")
+    p = sub.add_parser("search", help="Ranked search")
+    p.add_argument("query", nargs="+")
+    p.add_argument("--by", choices=("questionnaire", "question"), default="questionnaire")
+    p.add_argument("--category", help="Only questionnaires of this category")
+    p.add_argument("--all", action="store_true", help="Only hits matching every query term")
+    p.add_argument("--limit", type=int, default=10)
+    p.add_argument("--json", action="store_true", help="Print the hits as JSON")
+    sub.add_parser("stats", help="Index size")
+    args = ap.parse_args(argv)
+
+    if args.command != "index" and not Path(args.db).exists():
+        print(f"❌ No index at {args.db}: run `search_index.py index ...` first", file=sys.stderr)
+        return 1
+    try:
+        index = SearchIndex(Path(args.db), rebuild=args.command == "index" and args.rebuild)
+    except RuntimeError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    try:
+        if args.command == "index":
+            start = time.perf_counter()
+            counts = index.update(expand_json_inputs(args.inputs), prune=args.prune)
+            print(f"🔎 {counts['indexed']} questionnaire(s) indexed, {counts['unchanged']} unchanged, "
+                  f"{counts['removed']} removed in {time.perf_counter() - start:.2f}s -> {args.db}")
+            return 0
+        if args.command == "stats":
+            for key, value in index.stats().items():
+                print(f"{key:15} {value}")
+            return 0
+
+        start = time.perf_counter()
+        hits = index.search(" ".join(args.query), by=args.by, limit=args.limit, category=args.category,
+                            require_all=args.all)
+        elapsed = (time.perf_counter() - start) * 1000
+        terms = index.query_terms(" ".join(args.query))
+        if args.json:
+            print(json.dumps(hits, ensure_ascii=False, indent=2))
+            return 0
+        for rank, hit in enumerate(hits, 1):
+            if args.by == "question":
+                section = f" [{hit['section']}]" if hit["section"] else ""
+                print(f"{rank:3}. {hit['score']:6.2f}  {hit['id']}{section}: {snippet(hit['label'], terms)}")
+                continue
+            print(f"{rank:3}. {hit['score']:6.2f}  {hit['title']} ({hit['category'] or '-'}, {hit['units']} match(es))  {hit['source']}")
+            for q in hit["questions"]:
+                print(f"              - {snippet(q['label'], terms)}")
+        print(f"\n{len(hits)} hit(s) for {' '.join(terms)} in {elapsed:.1f} ms")
+        return 0
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Stage-level timing instrumentation shared by the extraction scripts.
+
+Code marks its stages (PDF open, text extraction, rasterization, preprocessing, Tesseract,
+parsing, JSON writing...) with:
+
+    with stage_timing.stage("tesseract", file=pdf_path, page=i) as s:
+        text = ...
+        s["bytes"] = len(text)
+
+Stages are leaves: they should not nest, so that their durations add up. Nothing is
+recorded until enable() is called (by the --trace/--timings options below); otherwise
+stage() returns a shared no-op context manager.
+
+Events are kept per process. A worker process enables recording when its parent does,
+sends collect() back with its results, and the parent merge()s them.
+
+Options added by add_arguments(), handled by instrumented():
+  --trace run.jsonl   one JSON object per stage: stage, file, page, ts (epoch s), dur (s), bytes, pid, tid
+  --trace run.json    Chrome trace format (chrome://tracing or https://ui.perfetto.dev)
+  --timings           print the per-stage totals and the slowest files at the end of the run
+  --profile run.prof  cProfile the whole run (pstats/snakeviz); sampling profilers need no
+                      hook: py-spy record -o run.svg -- python scripts/<script>.py ...
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+_events: List[Dict] = []
+_lock = threading.Lock()
+_enabled = False
+
+
+class _Stage:
+    __slots__ = ("fields", "start", "wall")
+
+    def __init__(self, fields: Dict):
+        self.fields = fields
+
+    def __enter__(self) -> Dict:
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        return self.fields
+
+    def __exit__(self, exc_type, exc, tb):
+        self.fields.update(ts=self.wall, dur=time.perf_counter() - self.start, pid=os.getpid(),
+                           tid=threading.get_ident())
+        if exc_type is not None:
+            self.fields["error"] = exc_type.__name__
+        with _lock:
+            _events.append(self.fields)
+        return False
+
+
+class _NullStage:
+    def __enter__(self) -> Dict:
+        return {}
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def stage(name: str, file=None, page: Optional[int] = None, **fields):
+    """Context manager timing one stage; yields a dict where extra fields (e.g. "bytes") can be set."""
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage({"stage": name, "file": str(file) if file is not None else None, "page": page, **fields})
+
+
+def collect() -> List[Dict]:
+    """Remove and return the events recorded by this process (for a worker to send to its parent).
+
+    Events inherited from the parent through fork() are left out.
+    """
+    pid = os.getpid()
+    with _lock:
+        mine = [e for e in _events if e["pid"] == pid]
+        _events[:] = [e for e in _events if e["pid"] != pid]
+    return mine
+
+
+def merge(events: List[Dict]) -> None:
+    """Add events recorded by a worker process."""
+    with _lock:
+        _events.extend(events)
+
+
+def mark() -> int:
+    """Position in the events recorded by this process, for since()."""
+    with _lock:
+        return len(_events)
+
+
+def since(position: int) -> List[Dict]:
+    """Events recorded after mark() returned position (e.g. the stages of one file)."""
+    with _lock:
+        return _events[position:]
+
+
+def totals(recorded: List[Dict]) -> Dict[str, float]:
+    """Seconds per stage of these events, in the order the stages first appear."""
+    result: Dict[str, float] = {}
+    for e in recorded:
+        result[e["stage"]] = result.get(e["stage"], 0.0) + e["dur"]
+    return result
+
+
+def events() -> List[Dict]:
+    with _lock:
+        return sorted(_events, key=lambda e: e["ts"])
+
+
+def write_trace(path: Path) -> None:
+    """Write the events as JSON lines (.jsonl) or in Chrome trace format (any other suffix)."""
+    path = Path(path)
+    recorded = events()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == ".jsonl":
+        with open(path, "w", encoding="utf-8") as f:
+            for e in recorded:
+                f.write(json.dumps(e, ensure_ascii=False) + "\n")
+        return
+    origin = recorded[0]["ts"] if recorded else 0.0
+    trace = [{
+        "name": e["stage"], "cat": "stage", "ph": "X", "pid": e["pid"], "tid": e["tid"],
+        "ts": round((e["ts"] - origin) * 1e6, 1), "dur": round(e["dur"] * 1e6, 1),
+        "args": {k: v for k, v in e.items() if k not in ("stage", "pid", "tid", "ts", "dur") and v is not None},
+    } for e in recorded]
+    path.write_text(json.dumps({"traceEvents": trace, "displayTimeUnit": "ms"}, ensure_ascii=False), encoding="utf-8")
+
+
+def print_summary(top: int = 10, out=None) -> None:
+    """Per-stage totals, then the files with the most recorded time."""
+    out = out or sys.stdout
+    recorded = events()
+    if not recorded:
+        return
+    stages: Dict[str, Dict] = {}
+    files: Dict[str, Dict] = {}
+    for e in recorded:
+        s = stages.setdefault(e["stage"], {"count": 0, "total": 0.0, "max": 0.0, "bytes": 0})
+        s["count"] += 1
+        s["total"] += e["dur"]
+        s["max"] = max(s["max"], e["dur"])
+        s["bytes"] += e.get("bytes") or 0
+        if e["file"] is not None:
+            f = files.setdefault(e["file"], {"total": 0.0, "pages": set(), "stages": {}})
+            f["total"] += e["dur"]
+            if e["page"] is not None:
+                f["pages"].add(e["page"])
+            f["stages"][e["stage"]] = f["stages"].get(e["stage"], 0.0) + e["dur"]
+
+    grand_total = sum(s["total"] for s in stages.values()) or 1.0
+    print(f"\n⏱️  Stage timings ({len(recorded)} events, time summed over all threads/processes)", file=out)
+    print(f"   {'stage':16} {'count':>7} {'total s':>9} {'share':>6} {'mean ms':>9} {'max ms':>9} {'MB':>9} {'MB/s':>8}", file=out)
+    for name, s in sorted(stages.items(), key=lambda item: -item[1]["total"]):
+        mb = s["bytes"] / 1e6
+        rate = f"{mb / s['total']:8.1f}" if s["bytes"] and s["total"] else f"{'':8}"
+        print(f"   {name:16} {s['count']:7d} {s['total']:9.3f} {s['total'] / grand_total:6.1%} "
+              f"{s['total'] / s['count'] * 1000:9.2f} {s['max'] * 1000:9.2f} {mb:9.2f} {rate}", file=out)
+
+    if files:
+        print(f"\n🐢 Slowest files (top {min(top, len(files))})", file=out)
+        print(f"   {'total s':>9} {'pages':>5}  {'slowest stage':24} file", file=out)
+        for name, f in sorted(files.items(), key=lambda item: -item[1]["total"])[:top]:
+            slowest, seconds = max(f["stages"].items(), key=lambda item: item[1])
+            print(f"   {f['total']:9.3f} {len(f['pages']) or '':>5}  {f'{slowest} ({seconds:.3f}s)':24} {name}", file=out)
+
+
+def add_arguments(ap) -> None:
+    group = ap.add_argument_group("timing")
+    group.add_argument("--trace", help="Record stage timings to this file (.jsonl: JSON lines, .json: Chrome trace format)")
+    group.add_argument("--timings", action="store_true", help="Print per-stage totals and the slowest files at the end")
+    group.add_argument("--profile", help="Run under cProfile and write the stats to this file")
+
+
+@contextmanager
+def instrumented(args):
+    """Apply the add_arguments() options around the body of a script's main()."""
+    if args.trace or args.timings:
+        enable()
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"🔬 cProfile stats written to {args.profile} (python -m pstats {args.profile})")
+        if args.trace:
+            write_trace(Path(args.trace))
+            print(f"🧭 Stage trace written to {args.trace}")
+        if args.timings:
+            print_summary()
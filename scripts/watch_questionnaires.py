@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Watch the questionnaire sources and regenerate only what an edit affects.
+
+Runs as a long-lived process with the parser modules already imported, so each edit costs
+the parse itself rather than a Python startup per script. File events are debounced, then
+each changed file is routed to the stage(s) that depend on it:
+
+  *.pdf, *.txt (outside --outdir)  -> parse_questionnaires  -> <outdir>/<slug>.json -> review
+  Mode de vie .md (outside --outdir) -> convert_mode_de_vie_to_json -> <outdir>/mode-de-vie-clean.json -> review
+  *.json (inside --outdir)         -> generate_review_markdown -> <outdir>/<stem>-review.md
+
+Other .md files are not questionnaire sources and are ignored. Sources and output names are
+those of questionnaire_pipeline.py (is_source, output_names, review_name). A warning is printed when two sources (e.g. a
+.pdf and its extracted .txt) write the same JSON: the last one regenerated wins.
+
+Uses inotify on Linux (through ctypes, no extra dependency) and falls back to polling
+elsewhere or with --poll.
+
+Usage:
+  python scripts/watch_questionnaires.py
+  python scripts/watch_questionnaires.py --root data/questionnaires --outdir data/questionnaires/generated --initial
+"""
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+from convert_mode_de_vie_to_json import parse_markdown_to_json
+from generate_review_markdown import generate_markdown
+from parse_questionnaires import normalize_lines, parse_text, read_text
+from questionnaire_pipeline import is_source, output_names, review_name
+
+SOURCE_SUFFIXES = {".pdf", ".txt", ".md"}
+
+
+def is_ignored(path: Path) -> bool:
+    """Hidden files/directories (caches, editor swap files) and editor backups."""
+    return any(part.startswith(".") for part in path.parts) or path.name.endswith("~")
+
+
+class PollingWatcher:
+    """Detect changed files by comparing (mtime, size) snapshots of the watched trees."""
+
+    def __init__(self, roots: list[Path], interval: float = 0.5):
+        self.roots = roots
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        for root in self.roots:
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+                for name in filenames:
+                    path = Path(dirpath) / name
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def poll(self, timeout: float | None) -> set[Path]:
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        snapshot = self._scan()
+        changed = {p for p, sig in snapshot.items() if self._snapshot.get(p) != sig}
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Recursive inotify watcher (Linux) reporting files that were written or moved in."""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self, roots: list[Path]):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, Path] = {}
+        for root in roots:
+            self._add_tree(root)
+
+    def _add_tree(self, root: Path) -> list[Path]:
+        """Watch root and its sub-directories; returns the files already inside (for new directories)."""
+        files = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), self.MASK)
+            if wd >= 0:
+                self._dirs[wd] = Path(dirpath)
+            files.extend(Path(dirpath) / name for name in filenames)
+        return files
+
+    def poll(self, timeout: float | None) -> set[Path]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self._fd, 64 * 1024)
+        changed: set[Path] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                # Events were lost: report everything under the watched directories
+                for directory in list(self._dirs.values()):
+                    changed.update(p for p in directory.iterdir() if p.is_file())
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    changed.update(self._add_tree(path))
+            elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+def make_watcher(roots: list[Path], force_polling: bool = False, interval: float = 0.5):
+    if not force_polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(roots, interval)
+
+
+class Regenerator:
+    """Routes changed files to the parse/convert/review stages, all in this process."""
+
+    def __init__(self, outdir: Path):
+        self.outdir = outdir
+        # Files we wrote ourselves, so their events do not trigger a second regeneration
+        self._written: dict[Path, int] = {}
+        # Source each JSON output was last generated from, to report two sources writing the same file
+        self._sources: dict[Path, Path] = {}
+
+    def _write(self, path: Path, content: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+        self._written[path.resolve()] = path.stat().st_mtime_ns
+
+    def _is_own_write(self, path: Path) -> bool:
+        mtime = self._written.get(path.resolve())
+        try:
+            return mtime is not None and path.stat().st_mtime_ns == mtime
+        except OSError:
+            return False
+
+    def _in_outdir(self, path: Path) -> bool:
+        return self.outdir.resolve() in path.resolve().parents
+
+    def affected(self, path: Path) -> bool:
+        if is_ignored(path) or not path.is_file() or self._is_own_write(path):
+            return False
+        if self._in_outdir(path):
+            return path.suffix.lower() == ".json"
+        return is_source(path)
+
+    def review(self, json_path: Path, data: dict) -> Path:
+        out = json_path.with_name(review_name(json_path))
+        self._write(out, generate_markdown(data))
+        return out
+
+    def regenerate(self, path: Path) -> list[Path]:
+        """Run the stages affected by a change to path; returns the files written."""
+        suffix = path.suffix.lower()
+        if self._in_outdir(path):
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return [self.review(path, data)]
+        if suffix == ".md":
+            data = parse_markdown_to_json(path.read_text(encoding="utf-8"))
+        else:
+            data = parse_text(normalize_lines(read_text(path)))
+        json_path = self.outdir / output_names(path)[0]
+        previous = self._sources.get(json_path)
+        if previous is not None and previous != path and previous.exists():
+            print(f"⚠️  {path} and {previous} both write {json_path.name}, keeping {path.name}'s", file=sys.stderr)
+        self._sources[json_path] = path
+        self._write(json_path, json.dumps(data, ensure_ascii=False, indent=2))
+        return [json_path, self.review(json_path, data)]
+
+    def process(self, paths: set[Path]):
+        for path in sorted(paths):
+            if not self.affected(path):
+                continue
+            start = time.perf_counter()
+            try:
+                written = self.regenerate(path)
+            except Exception as e:
+                print(f"❌ {path}: {e}", file=sys.stderr)
+                continue
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"✅ {path} -> {', '.join(p.name for p in written)} ({elapsed_ms:.1f} ms)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Watch questionnaire sources and regenerate JSON/review files on change.")
+    ap.add_argument("--root", default="data/questionnaires", help="Directory tree to watch")
+    ap.add_argument("--outdir", default="data/questionnaires/generated", help="Output directory for JSON and review markdown")
+    ap.add_argument("--debounce", type=float, default=0.3, help="Seconds without new events before regenerating")
+    ap.add_argument("--poll", action="store_true", help="Use polling instead of inotify")
+    ap.add_argument("--interval", type=float, default=0.5, help="Polling interval in seconds")
+    ap.add_argument("--initial", action="store_true", help="Regenerate every source once at startup")
+    args = ap.parse_args()
+
+    root = Path(args.root)
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    regenerator = Regenerator(outdir)
+
+    watch_roots = [root] if outdir.resolve() == root.resolve() or root.resolve() in outdir.resolve().parents else [root, outdir]
+    if args.initial:
+        regenerator.process({p for p in root.rglob("*") if p.suffix.lower() in SOURCE_SUFFIXES and not regenerator._in_outdir(p)})
+
+    watcher = make_watcher(watch_roots, force_polling=args.poll, interval=args.interval)
+    print(f"👀 Watching {', '.join(str(r) for r in watch_roots)} ({type(watcher).__name__}), Ctrl+C to stop")
+    pending: set[Path] = set()
+    try:
+        while True:
+            changed = watcher.poll(args.debounce if pending else None)
+            if changed:
+                pending |= changed
+                continue
+            if pending:
+                regenerator.process(pending)
+                pending = set()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    main()